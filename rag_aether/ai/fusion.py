@@ -0,0 +1,130 @@
+"""Rank fusion for hybrid retrieval."""
+
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+from ..errors import SearchError
+
+# Candidate list from one retriever: (document indices, scores), best first
+Candidates = Tuple[np.ndarray, np.ndarray]
+
+FUSION_METHODS = ('rrf', 'zscore', 'convex')
+
+class ScoreFusion:
+    """Fuses top-k candidate lists from several retrievers.
+
+    Supported methods:
+
+    * ``rrf`` - reciprocal rank fusion, ``weight / (rrf_k + rank)``, with
+      tied scores sharing a rank
+    * ``zscore`` - weighted sum of per-list z-scores
+    * ``convex`` - weighted sum of per-list min-max normalized scores
+
+    Only the candidates each retriever returned are scored, so fusion
+    costs O(k) per retriever. A document missing from a list receives
+    that list's lowest normalized score. Lists with constant scores are
+    handled without dividing by zero.
+    """
+
+    def __init__(self,
+                 method: str = 'rrf',
+                 weights: Optional[Sequence[float]] = None,
+                 rrf_k: int = 60):
+        """Initialize the fusion engine.
+
+        Args:
+            method: One of 'rrf', 'zscore' or 'convex'
+            weights: Optional weight per retriever (defaults to equal)
+            rrf_k: Rank offset for reciprocal rank fusion
+        """
+        if method not in FUSION_METHODS:
+            raise ValueError(f"Unknown fusion method '{method}', expected one of {FUSION_METHODS}")
+        if rrf_k < 0:
+            raise ValueError("rrf_k must be non-negative")
+
+        self.method = method
+        self.weights = list(weights) if weights is not None else None
+        self.rrf_k = rrf_k
+
+    def _normalize(self, scores: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Normalize one list's scores; returns (normalized, floor)."""
+        if self.method == 'rrf':
+            # Tied scores share the best rank among them
+            ranks = np.searchsorted(-scores, -scores, side='left') + 1.0
+            return 1.0 / (self.rrf_k + ranks), 0.0
+
+        if self.method == 'zscore':
+            std = scores.std()
+            if std == 0:
+                return np.zeros_like(scores), 0.0
+            normalized = (scores - scores.mean()) / std
+            return normalized, float(normalized.min())
+
+        # Convex combination of min-max normalized scores
+        spread = scores.max() - scores.min()
+        if spread == 0:
+            return np.ones_like(scores), 0.0
+        return (scores - scores.min()) / spread, 0.0
+
+    def fuse(self,
+             candidates: List[Candidates],
+             top_k: Optional[int] = None) -> Candidates:
+        """Fuse candidate lists into a single ranking.
+
+        Args:
+            candidates: One (indices, scores) pair per retriever, each
+                sorted best first
+            top_k: Optional number of fused results to keep
+
+        Returns:
+            Tuple of (document indices, fused scores), best first
+        """
+        weights = self.weights or [1.0] * len(candidates)
+        if len(weights) != len(candidates):
+            raise SearchError("Number of weights must match number of candidate lists")
+
+        ids_parts, gain_parts = [], []
+        baseline = 0.0
+        for (ids, scores), weight in zip(candidates, weights):
+            ids = np.asarray(ids, dtype=np.int64)
+            scores = np.asarray(scores, dtype=np.float64)
+            if ids.shape != scores.shape:
+                raise SearchError("Candidate indices and scores must have the same shape")
+            if not len(ids):
+                continue
+
+            normalized, floor = self._normalize(scores)
+            # Every document gets the floor; listed ones gain above it
+            baseline += weight * floor
+            ids_parts.append(ids)
+            gain_parts.append(weight * (normalized - floor))
+
+        if not ids_parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        doc_ids, inverse = np.unique(np.concatenate(ids_parts), return_inverse=True)
+        fused = np.bincount(inverse, weights=np.concatenate(gain_parts)) + baseline
+
+        order = np.argsort(-fused, kind='stable')
+        if top_k is not None:
+            order = order[:top_k]
+        return doc_ids[order], fused[order]
+
+def fuse(candidates: List[Candidates],
+         method: str = 'rrf',
+         weights: Optional[Sequence[float]] = None,
+         top_k: Optional[int] = None,
+         rrf_k: int = 60) -> Candidates:
+    """Fuse candidate lists with the given method.
+
+    Args:
+        candidates: One (indices, scores) pair per retriever
+        method: One of 'rrf', 'zscore' or 'convex'
+        weights: Optional weight per retriever
+        top_k: Optional number of fused results to keep
+        rrf_k: Rank offset for reciprocal rank fusion
+
+    Returns:
+        Tuple of (document indices, fused scores), best first
+    """
+    return ScoreFusion(method, weights, rrf_k).fuse(candidates, top_k)
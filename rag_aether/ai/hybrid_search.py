@@ -1,10 +1,12 @@
 """Hybrid search combining vector and keyword search."""
 
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 import numpy as np
 from sentence_transformers import SentenceTransformer
 import faiss
 
+from .fusion import ScoreFusion
+from .keyword_index import BM25Index
 from .vector_search import OptimizedVectorSearch
 from ..errors import SearchError
 
@@ -15,7 +17,9 @@ class HybridRetriever:
                  model_name: str = "all-MiniLM-L6-v2",
                  vector_weight: float = 0.7,
                  keyword_weight: float = 0.3,
-                 top_k: int = 5):
+                 top_k: int = 5,
+                 fusion_method: str = 'convex',
+                 candidate_k: Optional[int] = None):
         """Initialize the hybrid retriever.
         
         Args:
@@ -23,6 +27,9 @@ class HybridRetriever:
             vector_weight: Weight for vector similarity scores (0-1)
             keyword_weight: Weight for keyword match scores (0-1)
             top_k: Number of results to return
+            fusion_method: Fusion method: 'convex', 'zscore' or 'rrf'
+            candidate_k: Candidates taken from each retriever (defaults
+                to four times the number of results)
         """
         if not 0 <= vector_weight <= 1 or not 0 <= keyword_weight <= 1:
             raise ValueError("Weights must be between 0 and 1")
@@ -32,8 +39,11 @@ class HybridRetriever:
         self.vector_weight = vector_weight
         self.keyword_weight = keyword_weight
         self.top_k = top_k
+        self.candidate_k = candidate_k
+        self.fusion = ScoreFusion(fusion_method, weights=[vector_weight, keyword_weight])
         
         self.vector_search = OptimizedVectorSearch(model_name)
+        self.keyword_index = BM25Index()
         self.documents: List[Dict] = []
         self.document_texts: List[str] = []
         
@@ -52,26 +62,33 @@ class HybridRetriever:
             self.documents.extend(documents)
             self.document_texts.extend(texts)
             
-            # Update vector index
+            # Update vector and keyword indexes
             self.vector_search.add_documents(documents)
+            self.keyword_index.add_documents(texts)
             
         except Exception as e:
             raise SearchError(f"Failed to add documents: {e}")
             
-    def _compute_keyword_scores(self, query: str) -> np.ndarray:
-        """Compute keyword match scores for the query."""
-        query_terms = set(query.lower().split())
-        scores = []
+    def _keyword_candidates(self, query: str, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the top-k BM25 keyword matches as (indices, scores), best first."""
+        return self.keyword_index.search(query, k)
         
-        for doc_text in self.document_texts:
-            doc_terms = set(doc_text.lower().split())
-            # Use Jaccard similarity for keyword matching
-            intersection = len(query_terms & doc_terms)
-            union = len(query_terms | doc_terms)
-            score = intersection / union if union > 0 else 0
-            scores.append(score)
-            
-        return np.array(scores)
+    @staticmethod
+    def _complete(union: np.ndarray,
+                  ids: np.ndarray,
+                  scores: np.ndarray,
+                  score_missing: Callable[[np.ndarray], np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """Extend one retriever's candidates to the union, best first.
+        
+        Only documents the retriever did not return are scored.
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        missing = np.setdiff1d(union, ids, assume_unique=True)
+        if len(missing):
+            ids = np.concatenate([ids, missing])
+            scores = np.concatenate([scores, score_missing(missing)])
+        order = np.argsort(-scores, kind='stable')
+        return ids[order], scores[order]
         
     def search(self, query: str, top_k: Optional[int] = None) -> List[Dict]:
         """Search for documents using hybrid approach.
@@ -89,28 +106,28 @@ class HybridRetriever:
         k = top_k or self.top_k
         
         try:
-            # Get vector search results
-            vector_results = self.vector_search.search(query, k=len(self.documents))
-            vector_scores = np.array([r['score'] for r in vector_results])
-            
-            # Compute keyword scores
-            keyword_scores = self._compute_keyword_scores(query)
-            
-            # Normalize scores to 0-1 range
-            vector_scores = (vector_scores - vector_scores.min()) / (vector_scores.max() - vector_scores.min())
-            keyword_scores = (keyword_scores - keyword_scores.min()) / (keyword_scores.max() - keyword_scores.min())
-            
-            # Combine scores
-            combined_scores = (self.vector_weight * vector_scores + 
-                             self.keyword_weight * keyword_scores)
+            # Take top candidates from each retriever and fuse their union,
+            # so cost scales with the candidate count, not the corpus
+            candidate_k = self.candidate_k or k * 4
+            query_embedding = self.vector_search.encode_query(query)
+            vector_ids, vector_scores = self.vector_search.search_candidates(
+                query, k=candidate_k, query_embedding=query_embedding
+            )
+            keyword_ids, keyword_scores = self._keyword_candidates(query, candidate_k)
             
-            # Get top k results
-            top_indices = np.argsort(combined_scores)[-k:][::-1]
+            union = np.union1d(vector_ids, keyword_ids)
+            doc_ids, scores = self.fusion.fuse([
+                self._complete(union, vector_ids, vector_scores,
+                               lambda ids: self.vector_search.score_documents(query_embedding, ids)),
+                self._complete(union, keyword_ids, keyword_scores,
+                               lambda ids: self.keyword_index.score(query, ids))
+            ], top_k=k)
             
             results = []
-            for idx in top_indices:
+            for idx, score in zip(doc_ids, scores):
                 doc = self.documents[idx].copy()
-                doc['score'] = float(combined_scores[idx])
+                doc['score'] = float(score)
+                doc['doc_index'] = int(idx)
                 results.append(doc)
                 
             return results
@@ -122,4 +139,5 @@ class HybridRetriever:
         """Clear all documents from the retriever."""
         self.documents.clear()
         self.document_texts.clear()
+        self.keyword_index.clear()
         self.vector_search.clear() 
\ No newline at end of file
@@ -0,0 +1,314 @@
+"""Inverted index with BM25 scoring for keyword retrieval."""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+import math
+import re
+import numpy as np
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+def _grow(buffer: np.ndarray, size: int, needed: int) -> np.ndarray:
+    """Return buffer, or a larger copy of its first size items if needed."""
+    if needed <= len(buffer):
+        return buffer
+    grown = np.empty(max(needed, 2 * len(buffer)), dtype=buffer.dtype)
+    grown[:size] = buffer[:size]
+    return grown
+
+class _Postings:
+    """Postings of one term with the bounds of its contributions."""
+
+    __slots__ = ('doc_ids', 'freqs', 'size', 'max_tf', 'min_length')
+
+    def __init__(self):
+        self.doc_ids = np.empty(4, dtype=np.int32)
+        self.freqs = np.empty(4, dtype=np.int32)
+        self.size = 0
+        self.max_tf = 0
+        self.min_length = np.iinfo(np.int32).max
+
+    def extend(self, doc_ids: List[int], freqs: List[int], lengths: List[int]) -> None:
+        """Append postings for documents numbered after the existing ones."""
+        size, needed = self.size, self.size + len(doc_ids)
+        self.doc_ids = _grow(self.doc_ids, size, needed)
+        self.freqs = _grow(self.freqs, size, needed)
+        self.doc_ids[size:needed] = doc_ids
+        self.freqs[size:needed] = freqs
+        self.max_tf = max(self.max_tf, max(freqs))
+        self.min_length = min(self.min_length, min(lengths))
+        # Publish the new postings only once they are written
+        self.size = needed
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(document indices, term frequencies) views."""
+        size = self.size
+        return self.doc_ids[:size], self.freqs[:size]
+
+class BM25Index:
+    """Inverted index scored with Okapi BM25.
+
+    Each term maps to a postings list of document indices and term
+    frequencies in int32 numpy buffers with spare capacity. Documents get
+    consecutive indices as they are added, so postings are sorted by
+    document. A query only reads the postings of its own terms; documents
+    sharing no term with it are never touched. Growing a buffer replaces
+    it, so views taken by a running search stay valid while documents are
+    added.
+
+    Top-k search prunes with MaxScore. Alongside each postings list the
+    index keeps the term's highest frequency and shortest document, which
+    bound any single contribution of the term. Terms are visited from the
+    highest bound down; once the bounds of the terms left cannot lift a
+    new document past the current k-th score, those terms only look up
+    the remaining candidates in their postings instead of scoring every
+    posting. Common terms have low bounds, so their long postings are
+    mostly skipped.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """Initialize the index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization strength (0-1)
+        """
+        if k1 < 0:
+            raise ValueError("k1 must be non-negative")
+        if not 0 <= b <= 1:
+            raise ValueError("b must be between 0 and 1")
+
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, _Postings] = {}
+        self._doc_lengths = np.empty(0, dtype=np.int32)
+        self.num_docs = 0
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        """Number of indexed documents."""
+        return self.num_docs
+
+    @property
+    def doc_lengths(self) -> np.ndarray:
+        """Length in tokens of each indexed document."""
+        return self._doc_lengths[:self.num_docs]
+
+    @property
+    def avg_doc_length(self) -> float:
+        """Mean document length in tokens."""
+        return self.total_length / self.num_docs if self.num_docs else 0.0
+
+    def add_documents(self, texts: Iterable[str]) -> None:
+        """Index texts, numbering them after the documents already indexed.
+
+        Args:
+            texts: Document texts
+        """
+        # Collect the batch per term, then append each postings list once
+        batch: Dict[str, Tuple[List[int], List[int], List[int]]] = {}
+        lengths: List[int] = []
+        for doc_id, text in enumerate(texts, start=self.num_docs):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            for term, count in Counter(tokens).items():
+                entry = batch.get(term)
+                if entry is None:
+                    entry = batch[term] = ([], [], [])
+                entry[0].append(doc_id)
+                entry[1].append(count)
+                entry[2].append(len(tokens))
+        if not lengths:
+            return
+
+        # Lengths first, so a concurrent search never reads a posting whose
+        # document length is missing
+        needed = self.num_docs + len(lengths)
+        self._doc_lengths = _grow(self._doc_lengths, self.num_docs, needed)
+        self._doc_lengths[self.num_docs:needed] = lengths
+        for term, (doc_ids, freqs, term_lengths) in batch.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = _Postings()
+            postings.extend(doc_ids, freqs, term_lengths)
+            self.postings[term] = postings
+        self.total_length += sum(lengths)
+        self.num_docs = needed
+
+    def _idf(self, df: int, num_docs: int) -> float:
+        """BM25 inverse document frequency of a term in df of num_docs documents."""
+        return math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+
+    def idf(self, term: str) -> float:
+        """BM25 inverse document frequency (0 for unknown terms)."""
+        postings = self.postings.get(term)
+        if postings is None:
+            return 0.0
+        return self._idf(postings.size, self.num_docs)
+
+    def _bound(self, postings: _Postings, idf: float, avg_length: float) -> float:
+        """Highest contribution of a term given its idf and the mean length."""
+        norm = self.k1 * (1 - self.b + self.b * postings.min_length / avg_length)
+        return idf * postings.max_tf * (self.k1 + 1) / (postings.max_tf + norm)
+
+    def upper_bound(self, term: str) -> float:
+        """Highest BM25 contribution any document can get from a term."""
+        return self._bound(self.postings[term], self.idf(term), self.avg_doc_length)
+
+    def _snapshot(self, query: str) -> Tuple[int, float, Dict[str, _Postings], Dict[str, Tuple[np.ndarray, np.ndarray]]]:
+        """Consistent view of the index for one query.
+
+        Postings are cut at the number of documents published when the
+        query starts, so documents added meanwhile are not seen.
+
+        Returns:
+            Tuple of (document count, mean length, postings per matched
+            term, (document indices, frequencies) views per matched term)
+        """
+        num_docs = self.num_docs
+        avg_length = self.total_length / num_docs if num_docs else 0.0
+        postings: Dict[str, _Postings] = {}
+        views: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term in dict.fromkeys(tokenize(query)):
+            term_postings = self.postings.get(term)
+            if term_postings is None:
+                continue
+            doc_ids, freqs = term_postings.arrays()
+            end = int(np.searchsorted(doc_ids, num_docs))
+            if end:
+                postings[term] = term_postings
+                views[term] = (doc_ids[:end], freqs[:end])
+        return num_docs, avg_length, postings, views
+
+    def _contributions(self,
+                       doc_ids: np.ndarray,
+                       freqs: np.ndarray,
+                       idf: float,
+                       avg_length: float) -> np.ndarray:
+        """BM25 contributions of one term to the given postings."""
+        tf = freqs.astype(np.float64)
+        lengths = self._doc_lengths[doc_ids]
+        norm = self.k1 * (1 - self.b + self.b * lengths / avg_length)
+        return idf * tf * (self.k1 + 1) / (tf + norm)
+
+    @staticmethod
+    def _lookup(postings: np.ndarray, doc_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Binary-search documents in sorted postings.
+
+        Returns:
+            Tuple of (mask of documents found, their positions in postings)
+        """
+        positions = np.searchsorted(postings, doc_ids)
+        found = positions < len(postings)
+        found[found] = postings[positions[found]] == doc_ids[found]
+        return found, positions[found]
+
+    def score(self, query: str, doc_ids: np.ndarray) -> np.ndarray:
+        """BM25 scores of given documents, found by binary search in postings.
+
+        Args:
+            query: Query text
+            doc_ids: Document indices
+
+        Returns:
+            Scores aligned with doc_ids (0 for documents matching no term)
+        """
+        doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        scores = np.zeros(len(doc_ids), dtype=np.float64)
+        if not len(doc_ids):
+            return scores
+        num_docs, avg_length, _, views = self._snapshot(query)
+        for term, (term_ids, freqs) in views.items():
+            found, positions = self._lookup(term_ids, doc_ids)
+            if len(positions):
+                idf = self._idf(len(term_ids), num_docs)
+                scores[found] += self._contributions(term_ids[positions], freqs[positions], idf, avg_length)
+        return scores
+
+    def search(self, query: str, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the top-k documents for a query.
+
+        Args:
+            query: Query text
+            k: Number of results
+
+        Returns:
+            Tuple of (document indices, BM25 scores), best first; only
+            documents matching at least one query term are returned
+        """
+        num_docs, avg_length, postings, views = self._snapshot(query)
+        if not views or k <= 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+
+        idfs = {term: self._idf(len(ids), num_docs) for term, (ids, _) in views.items()}
+        bounds = {term: self._bound(postings[term], idfs[term], avg_length) for term in views}
+        terms = sorted(views, key=bounds.get, reverse=True)
+        # remaining[i]: the most terms i and after can add to any score
+        remaining = np.cumsum([bounds[term] for term in reversed(terms)])[::-1]
+
+        doc_ids = np.array([], dtype=np.int32)
+        scores = np.array([], dtype=np.float64)
+        # Dense scores by document, allocated at most once per query when
+        # candidates get numerous; it then stays in sync with doc_ids/scores
+        # and every candidate has a positive entry
+        dense: Optional[np.ndarray] = None
+        for i, term in enumerate(terms):
+            term_ids, freqs = views[term]
+            # Partial scores are lower bounds, so the k-th is a safe threshold
+            threshold = np.partition(scores, len(scores) - k)[len(scores) - k] if len(scores) >= k else 0.0
+            if remaining[i] > threshold:
+                # A document matching only this term and later ones can
+                # still reach the top k: score every posting
+                contributions = self._contributions(term_ids, freqs, idfs[term], avg_length)
+                if dense is None and (len(doc_ids) + len(term_ids)) * 8 >= num_docs:
+                    dense = np.zeros(num_docs)
+                    dense[doc_ids] = scores
+                if dense is None:
+                    doc_ids, inverse = np.unique(np.concatenate([doc_ids, term_ids]), return_inverse=True)
+                    scores = np.bincount(inverse, weights=np.concatenate([scores, contributions]))
+                else:
+                    # Postings of one term are unique, so plain indexing adds
+                    previous = dense[term_ids]
+                    dense[term_ids] = previous + contributions
+                    doc_ids = np.concatenate([doc_ids, term_ids[previous == 0]])
+                    scores = dense[doc_ids]
+                continue
+
+            # No new document can enter; drop candidates that cannot make
+            # it and look the rest up in this term's postings
+            keep = scores + remaining[i] > threshold
+            if dense is not None:
+                dense[doc_ids[~keep]] = 0
+            doc_ids, scores = doc_ids[keep], scores[keep]
+            if dense is not None and len(doc_ids) * 8 >= len(term_ids):
+                # Few postings per candidate left: checking each posting
+                # against the dense scores beats a binary search per candidate
+                hit = dense[term_ids] > 0
+                dense[term_ids[hit]] += self._contributions(
+                    term_ids[hit], freqs[hit], idfs[term], avg_length
+                )
+                scores = dense[doc_ids]
+                continue
+            found, positions = self._lookup(term_ids, doc_ids)
+            if len(positions):
+                scores[found] += self._contributions(
+                    term_ids[positions], freqs[positions], idfs[term], avg_length
+                )
+                if dense is not None:
+                    dense[doc_ids[found]] = scores[found]
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return doc_ids[top].astype(np.int64), scores[top]
+
+    def clear(self) -> None:
+        """Remove all documents."""
+        self.postings = {}
+        self._doc_lengths = np.empty(0, dtype=np.int32)
+        self.num_docs = 0
+        self.total_length = 0
@@ -1,13 +1,14 @@
 """Query expansion and preprocessing system."""
 
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 import re
+from collections import OrderedDict
 from dataclasses import dataclass
-import numpy as np
 from sentence_transformers import SentenceTransformer
 import spacy
 from spacy.tokens import Doc
 
+from .reranking import Reranker
 from ..errors import QueryError
 
 @dataclass
@@ -34,42 +35,95 @@ class ExpandedQuery:
         return cls(**data)
 
 class QueryPreprocessor:
-    """Handles query preprocessing and normalization."""
+    """Handles query preprocessing and normalization.
     
-    def __init__(self):
-        """Initialize the preprocessor."""
+    Each query is parsed once and the resulting ``Doc`` is shared by
+    ``preprocess``, ``extract_entities`` and ``extract_keywords``. Parsed
+    docs are kept in a small LRU cache, batches of queries go through
+    ``nlp.pipe``, and pipeline components none of the extractors use
+    (the dependency parser) are disabled.
+    """
+    
+    # Components not needed for stopwords, lemmas, POS tags and entities
+    DISABLED_COMPONENTS = ['parser']
+    
+    def __init__(self,
+                 model_name: str = "en_core_web_sm",
+                 cache_size: int = 1024,
+                 batch_size: int = 64):
+        """Initialize the preprocessor.
+        
+        Args:
+            model_name: Name of the installed spaCy pipeline
+            cache_size: Maximum number of parsed queries to keep
+            batch_size: Batch size for ``nlp.pipe``
+        """
         try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            # Download if not available
-            import subprocess
-            subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"])
-            self.nlp = spacy.load("en_core_web_sm")
-            
-    def preprocess(self, query: str) -> str:
-        """Preprocess and normalize a query."""
-        # Basic cleaning
-        query = query.strip().lower()
-        query = re.sub(r'\s+', ' ', query)
+            self.nlp = spacy.load(model_name, disable=self.DISABLED_COMPONENTS)
+        except OSError as e:
+            raise QueryError(
+                f"spaCy model '{model_name}' is not installed; "
+                f"run 'python -m spacy download {model_name}'"
+            ) from e
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self._docs: 'OrderedDict[str, Doc]' = OrderedDict()
         
-        # Process with spaCy
-        doc = self.nlp(query)
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Collapse whitespace and strip a query."""
+        return re.sub(r'\s+', ' ', query).strip()
         
-        # Remove stopwords and punctuation
-        tokens = [token.text for token in doc 
-                 if not token.is_stop and not token.is_punct]
+    def _cache_doc(self, key: str, doc: Doc) -> None:
+        """Store a parsed doc, evicting the least recently used."""
+        self._docs[key] = doc
+        self._docs.move_to_end(key)
+        while len(self._docs) > self.cache_size:
+            self._docs.popitem(last=False)
+            
+    def parse(self, query: Union[str, Doc]) -> Doc:
+        """Parse a query, reusing a cached doc when available."""
+        if isinstance(query, Doc):
+            return query
+        return self.parse_many([query])[0]
         
-        # Lemmatize
-        lemmas = [token.lemma_ for token in doc 
-                 if not token.is_stop and not token.is_punct]
+    def parse_many(self, queries: List[str]) -> List[Doc]:
+        """Parse several queries, batching the uncached ones through ``nlp.pipe``."""
+        keys = [self.normalize(q) for q in queries]
+        docs: Dict[str, Doc] = {}
+        missing = []
+        for key in keys:
+            if key in self._docs:
+                self._docs.move_to_end(key)
+                docs[key] = self._docs[key]
+            elif key not in docs:
+                docs[key] = None
+                missing.append(key)
+                
+        if missing:
+            for key, doc in zip(missing, self.nlp.pipe(missing, batch_size=self.batch_size)):
+                docs[key] = doc
+                self._cache_doc(key, doc)
+            
+        return [docs[key] for key in keys]
+            
+    def preprocess(self, query: Union[str, Doc]) -> str:
+        """Preprocess and normalize a query."""
+        doc = self.parse(query)
         
-        # Combine original tokens and lemmas
-        processed = ' '.join(set(tokens + lemmas))
-        return processed
+        # Lowercased tokens and lemmas, without stopwords or punctuation
+        terms = []
+        for token in doc:
+            if not token.is_stop and not token.is_punct:
+                terms.append(token.lower_)
+                terms.append(token.lemma_.lower())
+                
+        # Deduplicate, keeping first occurrence order
+        return ' '.join(dict.fromkeys(terms))
         
-    def extract_entities(self, query: str) -> Dict[str, List[str]]:
+    def extract_entities(self, query: Union[str, Doc]) -> Dict[str, List[str]]:
         """Extract named entities from query."""
-        doc = self.nlp(query)
+        doc = self.parse(query)
         entities = {}
         
         for ent in doc.ents:
@@ -79,9 +133,9 @@ class QueryPreprocessor:
             
         return entities
         
-    def extract_keywords(self, query: str) -> List[str]:
+    def extract_keywords(self, query: Union[str, Doc]) -> List[str]:
         """Extract important keywords from query."""
-        doc = self.nlp(query)
+        doc = self.parse(query)
         
         # Get nouns and verbs
         keywords = [token.text for token in doc 
@@ -95,16 +149,19 @@ class QueryExpander:
     
     def __init__(self, 
                  model_name: str = "all-MiniLM-L6-v2",
-                 min_similarity: float = 0.7):
+                 min_similarity: float = 0.7,
+                 cross_encoder_model: Optional[str] = None):
         """Initialize the expander.
         
         Args:
             model_name: Name of the sentence transformer model
             min_similarity: Minimum similarity for semantic variations
+            cross_encoder_model: Optional cross-encoder for re-ranking
         """
         self.model = SentenceTransformer(model_name)
         self.min_similarity = min_similarity
         self.preprocessor = QueryPreprocessor()
+        self.reranker = Reranker(self.model, cross_encoder_model=cross_encoder_model)
         
     def expand_query(self, 
                     query: str,
@@ -119,8 +176,11 @@ class QueryExpander:
             ExpandedQuery object with variations
         """
         try:
+            # Parse once and share the doc across all extractors
+            doc = self.preprocessor.parse(query)
+            
             # Preprocess query
-            processed_query = self.preprocessor.preprocess(query)
+            processed_query = self.preprocessor.preprocess(doc)
             
             # Generate variations
             variations = []
@@ -136,7 +196,7 @@ class QueryExpander:
                 weights.append(0.9)
                 
             # Add entity-based variations
-            entities = self.preprocessor.extract_entities(query)
+            entities = self.preprocessor.extract_entities(doc)
             for entity_type, entity_list in entities.items():
                 for entity in entity_list:
                     variation = f"{entity_type.lower()}: {entity}"
@@ -144,7 +204,7 @@ class QueryExpander:
                     weights.append(0.8)
                     
             # Add keyword-based variations
-            keywords = self.preprocessor.extract_keywords(query)
+            keywords = self.preprocessor.extract_keywords(doc)
             if keywords:
                 variation = ' AND '.join(keywords)
                 variations.append(variation)
@@ -169,6 +229,25 @@ class QueryExpander:
         except Exception as e:
             raise QueryError(f"Failed to expand query: {e}")
             
+    def expand_queries(self,
+                       queries: List[str],
+                       context: Optional[Dict[str, Any]] = None) -> List[ExpandedQuery]:
+        """Expand several queries, parsing them in one ``nlp.pipe`` batch.
+        
+        Args:
+            queries: Original query strings
+            context: Optional context information
+            
+        Returns:
+            One ExpandedQuery per query
+        """
+        try:
+            # Warm the parse cache so each expansion reuses its doc
+            self.preprocessor.parse_many(queries)
+        except Exception as e:
+            raise QueryError(f"Failed to parse queries: {e}")
+        return [self.expand_query(query, context) for query in queries]
+            
     def _generate_semantic_variations(self, query: str) -> List[str]:
         """Generate semantic variations of the query."""
         try:
@@ -190,6 +269,41 @@ class QueryExpander:
         except Exception as e:
             raise QueryError(f"Failed to generate semantic variations: {e}")
             
+    def search(self,
+               query: str,
+               vector_search: Any,
+               k: int = 5,
+               threshold: Optional[float] = None,
+               context: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """Expand a query and retrieve fused results for all variations.
+        
+        Instead of one embedding and one search per variation, the
+        variations are searched together through
+        ``OptimizedVectorSearch.search_variations``, so expansion costs
+        about as much as a single query.
+        
+        Args:
+            query: Original query string
+            vector_search: OptimizedVectorSearch to retrieve from
+            k: Number of results to return
+            threshold: Optional per-variation similarity threshold
+            context: Optional context information
+            
+        Returns:
+            Combined results ranked by weighted score
+        """
+        expanded = self.expand_query(query, context)
+        try:
+            return vector_search.search_variations(
+                expanded.expanded_queries,
+                expanded.weights,
+                k=k,
+                threshold=threshold,
+                fetch_k=k * 2
+            )
+        except Exception as e:
+            raise QueryError(f"Failed to search expanded query: {e}")
+            
     def combine_results(self, 
                        expanded_query: ExpandedQuery,
                        results: List[List[Dict]]) -> List[Dict]:
@@ -237,50 +351,21 @@ class QueryExpander:
     def rerank_results(self, 
                       query: str,
                       results: List[Dict],
-                      top_k: Optional[int] = None) -> List[Dict]:
+                      top_k: Optional[int] = None,
+                      vector_search: Optional[Any] = None) -> List[Dict]:
         """Rerank results using semantic similarity.
         
         Args:
             query: Original query
             results: List of results to rerank
             top_k: Optional limit on number of results
+            vector_search: Optional OptimizedVectorSearch the results came
+                from; its stored vectors are reused instead of re-encoding
             
         Returns:
             Reranked results
         """
         try:
-            if not results:
-                return []
-                
-            # Encode query and documents
-            query_embedding = self.model.encode([query])[0]
-            doc_embeddings = self.model.encode(
-                [r['text'] for r in results]
-            )
-            
-            # Compute similarities
-            similarities = []
-            for doc_embedding in doc_embeddings:
-                similarity = np.dot(query_embedding, doc_embedding) / (
-                    np.linalg.norm(query_embedding) * np.linalg.norm(doc_embedding)
-                )
-                similarities.append(float(similarity))
-                
-            # Update scores and sort
-            for result, similarity in zip(results, similarities):
-                result['semantic_score'] = similarity
-                # Combine with original score
-                result['final_score'] = (
-                    0.7 * result['score'] + 
-                    0.3 * result['semantic_score']
-                )
-                
-            results.sort(key=lambda x: x['final_score'], reverse=True)
-            
-            if top_k:
-                results = results[:top_k]
-                
-            return results
-            
+            return self.reranker.rerank(query, results, vector_search=vector_search, top_k=top_k)
         except Exception as e:
-            raise QueryError(f"Failed to rerank results: {e}") 
\ No newline at end of file
+            raise QueryError(f"Failed to rerank results: {e}")
@@ -0,0 +1,157 @@
+"""Re-ranking of retrieved documents."""
+
+from typing import Any, Dict, List, Optional
+import logging
+import time
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from ..errors import SearchError
+
+logger = logging.getLogger(__name__)
+
+class Reranker:
+    """Rescores retrieved documents with a bi-encoder and a cross-encoder.
+
+    The bi-encoder pass reuses the vectors already stored in the search
+    index (looked up by each result's ``doc_index``), so rescoring is one
+    embedding of the query and one matrix-vector product. Results without
+    a stored vector are encoded together in a single batch.
+
+    The optional cross-encoder pass scores only the top ``cross_top_n``
+    results, in batches, and stops once ``latency_budget`` seconds are
+    spent. Results it reached are reordered by cross-encoder score ahead
+    of the rest.
+    """
+
+    def __init__(self,
+                 model: SentenceTransformer,
+                 semantic_weight: float = 0.3,
+                 cross_encoder_model: Optional[str] = None,
+                 cross_top_n: int = 20,
+                 cross_batch_size: int = 8,
+                 latency_budget: float = 0.05):
+        """Initialize the reranker.
+
+        Args:
+            model: Bi-encoder used to build the index
+            semantic_weight: Weight of the semantic score against the
+                retrieval score (0-1)
+            cross_encoder_model: Optional cross-encoder model name
+            cross_top_n: Number of top results the cross-encoder scores
+            cross_batch_size: Query-document pairs per cross-encoder call
+            latency_budget: Seconds the cross-encoder pass may take
+        """
+        if not 0 <= semantic_weight <= 1:
+            raise ValueError("semantic_weight must be between 0 and 1")
+
+        self.model = model
+        self.semantic_weight = semantic_weight
+        self.cross_encoder_model = cross_encoder_model
+        self.cross_top_n = cross_top_n
+        self.cross_batch_size = max(1, cross_batch_size)
+        self.latency_budget = latency_budget
+        self._cross_encoder = None
+
+    @property
+    def cross_encoder(self) -> Optional[Any]:
+        """Cross-encoder, loaded on first use."""
+        if self._cross_encoder is None and self.cross_encoder_model:
+            from sentence_transformers import CrossEncoder
+            self._cross_encoder = CrossEncoder(self.cross_encoder_model)
+        return self._cross_encoder
+
+    def _document_embeddings(self,
+                             results: List[Dict],
+                             vector_search: Optional[Any]) -> np.ndarray:
+        """Stored vectors for results, encoding only those without one."""
+        embeddings = np.empty((len(results), self.model.get_sentence_embedding_dimension()),
+                              dtype=np.float32)
+        stored = [] if vector_search is None else [
+            i for i, r in enumerate(results) if r.get('doc_index') is not None
+        ]
+        if stored:
+            embeddings[stored] = vector_search.get_embeddings(
+                [results[i]['doc_index'] for i in stored]
+            )
+
+        missing = sorted(set(range(len(results))) - set(stored))
+        if missing:
+            embeddings[missing] = self.model.encode(
+                [results[i]['text'] for i in missing],
+                convert_to_numpy=True
+            )
+        return embeddings
+
+    def rerank(self,
+               query: str,
+               results: List[Dict],
+               vector_search: Optional[Any] = None,
+               top_k: Optional[int] = None,
+               query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
+        """Rerank results for a query.
+
+        Args:
+            query: Original query
+            results: Results to rerank, each with 'score' and 'text'
+            vector_search: Optional OptimizedVectorSearch holding the
+                results' stored vectors
+            top_k: Optional limit on number of results
+            query_embedding: Optional precomputed query embedding
+
+        Returns:
+            Reranked results with 'semantic_score' and 'final_score'
+        """
+        if not results:
+            return []
+
+        try:
+            if query_embedding is None:
+                query_embedding = self.model.encode([query], convert_to_numpy=True)[0]
+            doc_embeddings = self._document_embeddings(results, vector_search)
+
+            # Cosine similarity in one matrix-vector product
+            norms = np.linalg.norm(doc_embeddings, axis=1) * np.linalg.norm(query_embedding)
+            similarities = doc_embeddings @ query_embedding / np.maximum(norms, 1e-12)
+
+            retrieval = np.array([r['score'] for r in results], dtype=np.float64)
+            final = (1 - self.semantic_weight) * retrieval + self.semantic_weight * similarities
+
+            for result, similarity, score in zip(results, similarities, final):
+                result['semantic_score'] = float(similarity)
+                result['final_score'] = float(score)
+
+            order = np.argsort(-final, kind='stable')
+            results = [results[i] for i in order]
+
+            if self.cross_encoder is not None:
+                results = self._cross_rerank(query, results)
+
+            if top_k:
+                results = results[:top_k]
+
+            return results
+
+        except SearchError:
+            raise
+        except Exception as e:
+            raise SearchError(f"Failed to rerank results: {e}")
+
+    def _cross_rerank(self, query: str, results: List[Dict]) -> List[Dict]:
+        """Reorder the head of the results by cross-encoder score."""
+        head = results[:self.cross_top_n]
+        start = time.perf_counter()
+        scored = 0
+
+        for offset in range(0, len(head), self.cross_batch_size):
+            if scored and time.perf_counter() - start > self.latency_budget:
+                logger.debug(f"Cross-encoder budget spent after {scored} results")
+                break
+            batch = head[offset:offset + self.cross_batch_size]
+            scores = self.cross_encoder.predict([(query, r['text']) for r in batch])
+            for result, score in zip(batch, scores):
+                result['cross_score'] = float(score)
+            scored += len(batch)
+
+        reordered = sorted(results[:scored], key=lambda r: r['cross_score'], reverse=True)
+        return reordered + results[scored:]
@@ -137,6 +137,7 @@ class OptimizedVectorSearch:
                     
                 doc = self.documents[idx].copy()
                 doc['score'] = float(score)
+                doc['doc_index'] = int(idx)
                 results.append(doc)
                 
             return results
@@ -144,6 +145,76 @@ class OptimizedVectorSearch:
         except Exception as e:
             raise SearchError(f"Search failed: {e}")
             
+    def encode_query(self, query: str) -> np.ndarray:
+        """Encode a query into a (1, dimension) array."""
+        try:
+            return self.model.encode([query], convert_to_numpy=True)
+        except Exception as e:
+            raise SearchError(f"Failed to encode query: {e}")
+            
+    def search_candidates(self,
+                          query: str,
+                          k: int = 5,
+                          query_embedding: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the top-k document indices and scores for a query.
+        
+        Args:
+            query: Search query
+            k: Number of candidates
+            query_embedding: Optional precomputed query embedding
+            
+        Returns:
+            Tuple of (document indices, scores), best first
+        """
+        if not self.documents:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            
+        try:
+            if query_embedding is None:
+                query_embedding = self.encode_query(query)
+            query_embedding = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+            scores, indices = self.index.search(query_embedding, min(k, self.index.ntotal))
+            valid = (indices[0] >= 0) & (indices[0] < len(self.documents))
+            return indices[0][valid].astype(np.int64), scores[0][valid]
+            
+        except Exception as e:
+            raise SearchError(f"Candidate search failed: {e}")
+            
+    def get_embeddings(self, indices: List[int]) -> np.ndarray:
+        """Get stored embeddings by document index without re-encoding.
+        
+        Args:
+            indices: Document indices
+            
+        Returns:
+            Array of shape (len(indices), dimension)
+        """
+        ids = np.asarray(indices, dtype=np.int64)
+        if not len(ids):
+            return np.empty((0, self.dimension), dtype=np.float32)
+            
+        try:
+            # IVF indexes need a direct map before vectors can be reconstructed
+            if hasattr(self.index, 'make_direct_map') and not self.index.direct_map.type:
+                self.index.make_direct_map()
+            return self.index.reconstruct_batch(ids)
+            
+        except Exception as e:
+            raise SearchError(f"Failed to get embeddings: {e}")
+            
+    def score_documents(self, query_embedding: np.ndarray, indices: List[int]) -> np.ndarray:
+        """Similarity of a query to given documents, from stored embeddings.
+        
+        Args:
+            query_embedding: Query embedding
+            indices: Document indices
+            
+        Returns:
+            Inner-product scores aligned with indices, as the index computes them
+        """
+        embeddings = self.get_embeddings(indices)
+        return embeddings @ np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        
     def batch_search(self,
                     queries: List[str],
                     k: int = 5,
@@ -186,6 +257,7 @@ class OptimizedVectorSearch:
                         
                     doc = self.documents[idx].copy()
                     doc['score'] = float(score)
+                    doc['doc_index'] = int(idx)
                     results.append(doc)
                     
                 all_results.append(results)
@@ -195,6 +267,89 @@ class OptimizedVectorSearch:
         except Exception as e:
             raise SearchError(f"Batch search failed: {e}")
             
+    def search_variations(self,
+                          queries: List[str],
+                          weights: List[float],
+                          k: int = 5,
+                          threshold: Optional[float] = None,
+                          fetch_k: Optional[int] = None) -> List[Dict]:
+        """Search several weighted query variations as one query.
+        
+        All variations are encoded in one batch and searched with a single
+        multi-query FAISS call. Each document's fused score is the sum of
+        its per-variation scores times the variation weights, as in
+        ``QueryExpander.combine_results``, computed with NumPy. Repeated
+        variations are searched once.
+        
+        Args:
+            queries: Query variations
+            weights: Weight of each variation
+            k: Number of fused results to return
+            threshold: Optional similarity threshold applied per variation
+            fetch_k: Candidates retrieved per variation (defaults to k)
+            
+        Returns:
+            Fused results with 'score' and 'matched_queries'
+        """
+        if not self.documents or not queries:
+            return []
+        if len(queries) != len(weights):
+            raise SearchError("Number of weights must match number of queries")
+            
+        # Search a repeated variation once with its weights summed; the
+        # fused scores are the same
+        merged: Dict[str, float] = {}
+        for query, weight in zip(queries, weights):
+            merged[query] = merged.get(query, 0.0) + weight
+        queries, weights = list(merged), list(merged.values())
+            
+        try:
+            # One encode call and one search for every variation
+            query_embeddings = self.model.encode(
+                queries,
+                batch_size=len(queries),
+                convert_to_numpy=True
+            )
+            scores, indices = self.index.search(
+                query_embeddings,
+                min(fetch_k or k, self.index.ntotal)
+            )
+            
+            # Flatten (variation, rank) hits, dropping padding and weak matches
+            variation_ids = np.repeat(np.arange(len(queries)), indices.shape[1])
+            indices = indices.ravel()
+            scores = scores.ravel()
+            valid = (indices >= 0) & (indices < len(self.documents))
+            if threshold:
+                valid &= scores >= threshold
+            if not valid.any():
+                return []
+            indices = indices[valid]
+            weighted = scores[valid] * np.asarray(weights, dtype=scores.dtype)[variation_ids[valid]]
+            variation_ids = variation_ids[valid]
+            
+            # Sum weighted scores per document
+            doc_ids, inverse = np.unique(indices, return_inverse=True)
+            fused = np.bincount(inverse, weights=weighted)
+            matched = np.zeros((len(doc_ids), len(queries)), dtype=bool)
+            matched[inverse, variation_ids] = True
+            
+            top = np.argsort(-fused, kind='stable')[:k]
+            results = []
+            for position in top:
+                doc = self.documents[doc_ids[position]].copy()
+                doc['score'] = float(fused[position])
+                doc['doc_index'] = int(doc_ids[position])
+                doc['matched_queries'] = [queries[i] for i in np.flatnonzero(matched[position])]
+                results.append(doc)
+                
+            return results
+            
+        except SearchError:
+            raise
+        except Exception as e:
+            raise SearchError(f"Variation search failed: {e}")
+            
     def clear(self) -> None:
         """Clear all documents from the index."""
         try:
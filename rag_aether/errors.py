@@ -0,0 +1,29 @@
+"""Custom exceptions for the retrieval components."""
+
+class AetherError(Exception):
+    """Base class for retrieval component exceptions."""
+    pass
+
+class SearchError(AetherError):
+    """Raised when indexing or searching documents fails."""
+    pass
+
+class QueryError(AetherError):
+    """Raised when query preprocessing or expansion fails."""
+    pass
+
+class IntegrationError(AetherError):
+    """Raised when a data source integration fails."""
+    pass
+
+class PersonaError(AetherError):
+    """Raised when persona handling fails."""
+    pass
+
+class QualityError(AetherError):
+    """Raised when quality evaluation fails."""
+    pass
+
+class PerformanceError(AetherError):
+    """Raised when performance monitoring fails."""
+    pass
@@ -2,5 +2,7 @@
 
 from .rag_system import RAGSystem
 from .batch_processor import BatchProcessor, BatchStats
+from .pipeline import IngestionPipeline, StageStats
+from .parsers import iter_sections, parse_files
 
-__all__ = ["RAGSystem", "BatchProcessor", "BatchStats"] 
\ No newline at end of file
+__all__ = ["RAGSystem", "BatchProcessor", "BatchStats", "IngestionPipeline", "StageStats", "iter_sections", "parse_files"] 
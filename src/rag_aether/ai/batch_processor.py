@@ -1,13 +1,17 @@
-from typing import List, Dict, Any, Generator, Optional
+from typing import List, Dict, Any, AsyncIterable, AsyncIterator, Iterable, Optional, Set, Union
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 import logging
 from dataclasses import dataclass
 import psutil
 import time
-from statistics import mean
 
 from .rag_system import RAGSystem
+from .journal import IngestionJournal, document_key, INDEXED, FAILED
+from .concurrency import ConcurrencyController, MAX_CONCURRENCY
+
+# Marks the end of a document stream in the processing queue
+_STREAM_END = object()
 
 @dataclass
 class BatchStats:
@@ -20,6 +24,10 @@ class BatchStats:
     docs_per_minute: float
     current_batch_size: int
     active_workers: int
+    concurrency_limit: int = 0
+    p95_latency: float = 0.0
+    error_rate: float = 0.0
+    controller_action: str = ""
 
 class BatchProcessor:
     def __init__(
@@ -31,7 +39,8 @@ class BatchProcessor:
         max_retries: int = 3,
         memory_pause_time: float = 1.0,
         min_batch_size: int = 50,
-        max_batch_size: int = 500
+        max_batch_size: int = 500,
+        max_concurrency: int = MAX_CONCURRENCY
     ):
         """Initialize the batch processor.
         
@@ -44,6 +53,7 @@ class BatchProcessor:
             memory_pause_time: Time to pause when memory threshold is exceeded
             min_batch_size: Minimum batch size
             max_batch_size: Maximum batch size
+            max_concurrency: Maximum in-flight embedding requests
         """
         self.rag = rag_system
         self.base_batch_size = batch_size
@@ -55,106 +65,138 @@ class BatchProcessor:
         self.memory_threshold = memory_threshold
         self.max_retries = max_retries
         self.memory_pause_time = memory_pause_time
+        # Threads for advancing blocking document streams; CPU-bound
+        # preprocessing runs on the shared process pool in RAGSystem
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
         self.processing_times = []
+        # Sizes embedding concurrency and batches from measured p95
+        # latency, error/429 rate and memory
+        self.controller = ConcurrencyController(
+            initial_concurrency=max_workers,
+            max_concurrency=max(max_workers, max_concurrency),
+            initial_batch_size=batch_size,
+            min_batch_size=min(min_batch_size, batch_size),
+            max_batch_size=max_batch_size,
+            memory_threshold=memory_threshold
+        )
         self.stats = BatchStats(0, 0, 0, 0.0, 0.0, 0.0, 0.0, batch_size, max_workers)
         self.logger = logging.getLogger(__name__)
 
     def _check_memory(self) -> bool:
-        """Check if memory usage is below threshold and adjust workers if needed."""
+        """Sample memory usage and check it is below the threshold."""
         memory = psutil.Process().memory_percent() / 100
         self.stats.memory_usage = memory
-        
-        # Adjust workers based on memory pressure
-        if memory > self.memory_threshold:
-            self.current_workers = max(1, self.current_workers - 1)
-            self.current_batch_size = max(self.min_batch_size, self.current_batch_size // 2)
-        elif memory < self.memory_threshold * 0.7 and self.current_workers < self.max_workers:
-            self.current_workers = min(self.max_workers, self.current_workers + 1)
-            
         return memory < self.memory_threshold
 
+    def _adjust(self) -> None:
+        """Apply the concurrency controller's next decision."""
+        decision = self.controller.update(self.stats.memory_usage)
+        self.current_batch_size = decision.batch_size
+        self.current_workers = min(self.max_workers, decision.concurrency)
+        self.stats.current_batch_size = self.current_batch_size
+        self.stats.active_workers = self.current_workers
+        self.stats.concurrency_limit = decision.concurrency
+        self.stats.p95_latency = decision.p95_latency
+        self.stats.error_rate = decision.error_rate
+        self.stats.controller_action = decision.action
+
     def _update_stats(self, start_time: float, processed: int) -> None:
-        """Update batch processing statistics and adjust batch size."""
+        """Update batch processing statistics."""
         elapsed = time.time() - start_time
         if elapsed > 0:
             self.stats.docs_per_minute = (processed / elapsed) * 60
             
         self.stats.avg_processing_time = elapsed / processed if processed > 0 else 0
-        self.processing_times.append(self.stats.avg_processing_time)
-        
-        # Keep only recent history
-        if len(self.processing_times) > 10:
-            self.processing_times.pop(0)
-            
-        # Adjust batch size based on processing times trend
-        if len(self.processing_times) >= 3:
-            avg_time = mean(self.processing_times[-3:])
-            if avg_time < self.stats.avg_processing_time * 0.8:
-                self.current_batch_size = min(self.max_batch_size, 
-                                           int(self.current_batch_size * 1.2))
-            elif avg_time > self.stats.avg_processing_time * 1.2:
-                self.current_batch_size = max(self.min_batch_size,
-                                           int(self.current_batch_size * 0.8))
-                
         self.stats.current_batch_size = self.current_batch_size
         self.stats.active_workers = self.current_workers
 
-    async def _process_doc(self, doc: Dict[str, Any], retries: int = 0) -> bool:
-        """Process a single document with adaptive retry logic."""
+    async def _process_docs(self, docs: List[Dict[str, Any]], retries: int = 0) -> List[bool]:
+        """Ingest documents together so their chunks share embedding requests.
+        
+        Documents that fail are retried as a group with adaptive backoff.
+        
+        Returns:
+            Success flag for each document
+        """
         try:
             start = time.time()
-            await self.rag.ingest_text(doc["text"], doc.get("metadata", {}))
-            # Track successful processing time for optimization
-            self.processing_times.append(time.time() - start)
-            return True
+            results = list(await self.rag.ingest_documents(docs, controller=self.controller))
+            self.processing_times.append((time.time() - start) / max(1, len(docs)))
+            # Keep only recent history
+            if len(self.processing_times) > 10:
+                self.processing_times.pop(0)
         except Exception as e:
-            self.logger.error(f"Failed to process document: {e}")
+            self.logger.error(f"Failed to process documents: {e}")
+            results = [False] * len(docs)
+            
+        failed = [i for i, ok in enumerate(results) if not ok]
+        if failed:
+            self.logger.error(f"Failed to process {len(failed)} of {len(docs)} documents")
             if retries < self.max_retries:
                 # Adaptive backoff based on error pattern
                 backoff = min(2 ** retries, 10) * (1 + self.stats.memory_usage)
                 await asyncio.sleep(backoff)
-                return await self._process_doc(doc, retries + 1)
-            return False
+                retried = await self._process_docs([docs[i] for i in failed], retries + 1)
+                for i, ok in zip(failed, retried):
+                    results[i] = ok
+        return results
 
-    async def _process_batch(self, batch: List[Dict[str, Any]]) -> None:
-        """Process a batch of documents with dynamic concurrency."""
+    async def _process_batch(self, batch: List[Dict[str, Any]]) -> List[bool]:
+        """Process a batch of documents with chunks pooled across documents.
+        
+        Returns:
+            Success flag for each document in the batch
+        """
         while not self._check_memory():
-            self.logger.warning(f"High memory usage ({self.stats.memory_usage:.2%}), reducing batch size to {self.current_batch_size}")
+            self.logger.warning(f"High memory usage ({self.stats.memory_usage:.2%}), pausing batch")
             await asyncio.sleep(self.memory_pause_time)
 
-        # Use current_workers for concurrency control
-        semaphore = asyncio.Semaphore(self.current_workers)
-        
-        async def process_with_semaphore(doc):
-            async with semaphore:
-                return await self._process_doc(doc)
-                
-        tasks = [process_with_semaphore(doc) for doc in batch]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        successful = sum(1 for r in results if r is True)
+        results = [r is True for r in await self._process_docs(batch)]
+        self._adjust()
+        successful = sum(results)
         self.stats.processed_docs += successful
         self.stats.failed_docs += len(batch) - successful
+        return results
 
     async def process_documents(
         self, 
         documents: List[Dict[str, Any]], 
-        callback: Optional[callable] = None
+        callback: Optional[callable] = None,
+        journal: Optional[IngestionJournal] = None,
+        retry_failed: bool = True
     ) -> BatchStats:
         """Process a list of documents in batches.
         
+        With a journal, every document's state is checkpointed after each
+        batch. Re-running the same job skips documents that were already
+        indexed, so an interrupted run resumes where it stopped.
+        
         Args:
             documents: List of documents to process
             callback: Optional callback function to report progress
+            journal: Optional journal used to checkpoint and resume the job
+            retry_failed: Whether documents that failed in an earlier run
+                of the job are retried
             
         Returns:
             BatchStats object with processing statistics
         """
+        total_docs = len(documents)
+        already_done = 0
+        if journal is not None:
+            keys = [document_key(doc) for doc in documents]
+            await asyncio.to_thread(journal.register, keys)
+            remaining = await asyncio.to_thread(journal.remaining, retry_failed)
+            pending = [(key, doc) for key, doc in zip(keys, documents) if key in remaining]
+            already_done = total_docs - len(pending)
+            documents = [doc for _, doc in pending]
+            if already_done:
+                self.logger.info(f"Resuming job {journal.job_id}: {already_done} of {total_docs} documents already done")
+
         # Reset stats for new processing run
         self.stats = BatchStats(
-            total_docs=len(documents),
-            processed_docs=0,
+            total_docs=total_docs,
+            processed_docs=already_done,
             failed_docs=0,
             start_time=time.time(),
             avg_processing_time=0.0,
@@ -165,35 +207,83 @@ class BatchProcessor:
         )
         self.processing_times = []  # Reset processing times history
 
-        for i in range(0, len(documents), self.current_batch_size):
-            batch = documents[i:i + self.current_batch_size]
-            await self._process_batch(batch)
+        # Advance by the size of each batch taken, since the batch size
+        # may change between iterations
+        start = 0
+        while start < len(documents):
+            batch = documents[start:start + self.current_batch_size]
+            start += len(batch)
+            results = await self._process_batch(batch)
+            
+            if journal is not None:
+                await self._checkpoint(journal, batch, results)
             
             # Ensure we don't exceed total_docs
             self.stats.processed_docs = min(self.stats.processed_docs, self.stats.total_docs)
             self.stats.failed_docs = min(self.stats.failed_docs, self.stats.total_docs)
             
-            self._update_stats(self.stats.start_time, self.stats.processed_docs)
+            # Rates only count documents processed in this run
+            self._update_stats(self.stats.start_time, self.stats.processed_docs - already_done)
             
             if callback:
                 callback(self.stats)
 
         return self.stats
 
+    async def _checkpoint(
+        self,
+        journal: IngestionJournal,
+        batch: List[Dict[str, Any]],
+        results: List[bool]
+    ) -> None:
+        """Record the outcome of a batch in the journal off the event loop."""
+        indexed = [document_key(doc) for doc, ok in zip(batch, results) if ok]
+        failed = [document_key(doc) for doc, ok in zip(batch, results) if not ok]
+        if indexed:
+            await asyncio.to_thread(journal.mark, indexed, INDEXED)
+        if failed:
+            await asyncio.to_thread(
+                journal.mark, failed, FAILED, f"Failed after {self.max_retries} retries"
+            )
+
     async def process_stream(
         self,
-        document_stream: Generator[Dict[str, Any], None, None],
-        callback: Optional[callable] = None
+        document_stream: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+        callback: Optional[callable] = None,
+        queue_size: Optional[int] = None,
+        journal: Optional[IngestionJournal] = None,
+        retry_failed: bool = True
     ) -> BatchStats:
-        """Process a stream of documents in batches.
+        """Process a stream of documents with bounded backpressure.
+        
+        A producer task reads documents into a bounded queue while workers
+        process them concurrently, so reading overlaps with embedding. When
+        the queue is full the producer waits, keeping memory flat regardless
+        of the stream length.
+        
+        With a journal, documents are registered as workers take them and
+        checkpointed once processed. Documents finished by an earlier run of
+        the job are skipped as they are read.
         
         Args:
-            document_stream: Generator yielding documents
+            document_stream: Iterable or async iterable yielding documents
+                (e.g. file readers, HTTP bodies, database cursors)
             callback: Optional callback function to report progress
+            queue_size: Maximum number of queued documents (defaults to
+                the current batch size)
+            journal: Optional journal used to checkpoint and resume the job
+            retry_failed: Whether documents that failed in an earlier run
+                of the job are retried
             
         Returns:
             BatchStats object with processing statistics
         """
+        done: Set[str] = set()
+        if journal is not None:
+            states = [INDEXED] + ([] if retry_failed else [FAILED])
+            done = await asyncio.to_thread(journal.keys_in_state, *states)
+        already_done = 0
+
         self.stats = BatchStats(
             total_docs=0,
             processed_docs=0,
@@ -205,25 +295,115 @@ class BatchProcessor:
             current_batch_size=self.current_batch_size,
             active_workers=self.current_workers
         )
+        self.processing_times = []
 
-        batch = []
-        for doc in document_stream:
-            self.stats.total_docs += 1
-            batch.append(doc)
-            
-            if len(batch) >= self.current_batch_size:
-                await self._process_batch(batch)
-                self._update_stats(self.stats.start_time, self.stats.processed_docs)
-                
-                if callback:
-                    callback(self.stats)
-                batch = []
-
-        # Process remaining documents
-        if batch:
-            await self._process_batch(batch)
-            self._update_stats(self.stats.start_time, self.stats.processed_docs)
-            if callback:
-                callback(self.stats)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size or self.current_batch_size)
+        producer_done = asyncio.Event()
+        completed = 0
+
+        async def produce() -> None:
+            nonlocal already_done
+            try:
+                async for doc in self._iterate_stream(document_stream):
+                    if done and document_key(doc) in done:
+                        already_done += 1
+                        self.stats.total_docs += 1
+                        self.stats.processed_docs += 1
+                        continue
+
+                    # Stop reading while memory is under pressure
+                    if self.stats.total_docs % self.current_batch_size == 0:
+                        while not self._check_memory():
+                            self.logger.warning(f"High memory usage ({self.stats.memory_usage:.2%}), pausing stream")
+                            await asyncio.sleep(self.memory_pause_time)
+
+                    # Blocks while the queue is full
+                    await queue.put(doc)
+                    self.stats.total_docs += 1
+            finally:
+                producer_done.set()
+                for _ in range(self.max_workers):
+                    await queue.put(_STREAM_END)
+
+        # Each worker takes its share of the queue at once so chunks are
+        # pooled across documents without growing the read-ahead
+        take = max(1, queue.maxsize // self.max_workers)
+
+        async def work(worker_id: int) -> None:
+            nonlocal completed
+            finished = False
+            while not finished:
+                # Workers above the current limit idle until memory recovers
+                while worker_id >= self.current_workers and not producer_done.is_set():
+                    await asyncio.sleep(self.memory_pause_time)
+
+                # Stop at the first end marker; the rest belong to other workers
+                docs = [await queue.get()]
+                while len(docs) < take and docs[-1] is not _STREAM_END and not queue.empty():
+                    docs.append(queue.get_nowait())
+                if docs[-1] is _STREAM_END:
+                    docs.pop()
+                    finished = True
+                if not docs:
+                    continue
+
+                if journal is not None:
+                    await asyncio.to_thread(journal.register, [document_key(doc) for doc in docs])
+                results = await self._process_docs(docs)
+                if journal is not None:
+                    await self._checkpoint(journal, docs, results)
+                successful = sum(r is True for r in results)
+                self.stats.processed_docs += successful
+                self.stats.failed_docs += len(docs) - successful
+
+                previous = completed
+                completed += len(docs)
+                if completed // self.current_batch_size > previous // self.current_batch_size:
+                    self._adjust()
+                    self._update_stats(self.stats.start_time, self.stats.processed_docs - already_done)
+                    if callback:
+                        callback(self.stats)
+
+        producer = asyncio.create_task(produce())
+        workers = [asyncio.create_task(work(i)) for i in range(self.max_workers)]
+        try:
+            await asyncio.gather(producer, *workers)
+        except BaseException:
+            for task in [producer, *workers]:
+                task.cancel()
+            raise
+
+        if already_done:
+            self.logger.info(f"Resumed job {journal.job_id}: skipped {already_done} documents already done")
+        self._update_stats(self.stats.start_time, self.stats.processed_docs - already_done)
+        if callback:
+            callback(self.stats)
+
+        return self.stats
+
+    async def _iterate_stream(
+        self,
+        document_stream: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate a sync or async document stream without blocking the loop.
+        
+        Synchronous iterators are advanced on the thread pool, so blocking
+        reads (files, cursors) do not stall in-flight embedding requests.
+        """
+        if hasattr(document_stream, "__aiter__"):
+            async for doc in document_stream:
+                yield doc
+            return
+
+        if isinstance(document_stream, (list, tuple)):
+            for doc in document_stream:
+                yield doc
+            return
 
-        return self.stats 
\ No newline at end of file
+        loop = asyncio.get_running_loop()
+        iterator = iter(document_stream)
+        while True:
+            doc = await loop.run_in_executor(self.executor, next, iterator, _STREAM_END)
+            if doc is _STREAM_END:
+                return
+            yield doc
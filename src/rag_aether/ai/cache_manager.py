@@ -1,8 +1,16 @@
 """Cache management for RAG system."""
-from typing import Any, Dict, Optional, List
+from typing import Any, Awaitable, Callable, Dict, Optional, List, Tuple
+import asyncio
+import copy
+import hashlib
+import json
 import logging
+import time
+from collections import OrderedDict
 from functools import lru_cache
+import numpy as np
 from redis import Redis
+from redis import asyncio as aioredis
 from redis.retry import Retry
 from redis.backoff import ExponentialBackoff
 from redis.exceptions import ConnectionError, TimeoutError
@@ -13,14 +21,23 @@ import ssl
 
 logger = logging.getLogger(__name__)
 
+# Query result cache settings
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "0"))  # 0 disables expiry
+
+# Query embedding cache settings
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+EMBEDDING_CACHE_TTL = int(os.getenv("EMBEDDING_CACHE_TTL", "86400"))
+# Optional Redis shared by all workers, e.g. redis://localhost:6379/0
+EMBEDDING_CACHE_REDIS_URL = os.getenv("EMBEDDING_CACHE_REDIS_URL")
+
 class LRUCache:
     """Simple LRU cache implementation."""
     
     def __init__(self, maxsize: int = 1000):
         """Initialize LRU cache with specified max size."""
         self.maxsize = maxsize
-        self.cache: Dict[str, Any] = {}
-        self._access_order: List[str] = []
+        self.cache: "OrderedDict[str, Any]" = OrderedDict()
         
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache."""
@@ -28,32 +45,254 @@ class LRUCache:
             return None
             
         # Update access order
-        self._access_order.remove(key)
-        self._access_order.append(key)
-        
+        self.cache.move_to_end(key)
         return self.cache[key]
         
     def set(self, key: str, value: Any) -> None:
         """Set value in cache."""
         if key in self.cache:
-            self._access_order.remove(key)
+            self.cache.move_to_end(key)
         elif len(self.cache) >= self.maxsize:
             # Remove least recently used item
-            lru_key = self._access_order.pop(0)
-            del self.cache[lru_key]
+            self.cache.popitem(last=False)
             
         self.cache[key] = value
-        self._access_order.append(key)
+        
+    def pop(self, key: str) -> Optional[Any]:
+        """Remove a key, returning its value if present."""
+        return self.cache.pop(key, None)
         
     def clear(self) -> None:
         """Clear the cache."""
         self.cache.clear()
-        self._access_order.clear()
         
     def __len__(self) -> int:
         """Get number of items in cache."""
         return len(self.cache)
 
+def normalize_query(text: str) -> str:
+    """Normalize query text for cache keys (case and whitespace)."""
+    return " ".join(text.casefold().split())
+
+class QueryResultCache:
+    """Cache of retrieved query context, invalidated by index generation.
+    
+    Entries remember the vector store generation they were computed at.
+    Any ingest or delete bumps the generation, so older entries are
+    treated as misses without having to find and evict them.
+    
+    Values are deep-copied on the way in and out, so callers may mutate
+    the results they get without corrupting the cache.
+    """
+    
+    def __init__(self, maxsize: int = QUERY_CACHE_SIZE, ttl: float = QUERY_CACHE_TTL):
+        """Initialize the result cache.
+        
+        Args:
+            maxsize: Maximum number of cached queries
+            ttl: Optional entry lifetime in seconds (0 disables expiry)
+        """
+        self.lru_cache = LRUCache(maxsize=maxsize)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        
+    @staticmethod
+    def make_key(
+        question: str,
+        max_results: Optional[int],
+        min_score: Optional[float],
+        filters: Optional[Dict[str, Any]] = None,
+        expanded: bool = False
+    ) -> str:
+        """Build a cache key from the normalized question and search options.
+        
+        ``expanded`` marks results merged with query-expansion retrieval, so
+        they never collide with raw-query results for the same question.
+        """
+        payload = json.dumps(
+            [normalize_query(question), max_results, min_score, filters or {}, expanded],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+        
+    def get(self, key: str, generation: int) -> Optional[Any]:
+        """Get a cached result computed at the given index generation.
+        
+        Args:
+            key: Key from :meth:`make_key`
+            generation: Current vector store generation
+            
+        Returns:
+            Copy of the cached result, or None on a miss or stale entry
+        """
+        entry: Optional[Tuple[int, float, Any]] = self.lru_cache.get(key)
+        if entry is not None:
+            entry_generation, created, value = entry
+            expired = self.ttl > 0 and time.time() - created > self.ttl
+            if entry_generation == generation and not expired:
+                self.hits += 1
+                return copy.deepcopy(value)
+            self.lru_cache.pop(key)
+            
+        self.misses += 1
+        return None
+        
+    def set(self, key: str, generation: int, value: Any) -> None:
+        """Cache a result computed at the given index generation."""
+        self.lru_cache.set(key, (generation, time.time(), copy.deepcopy(value)))
+        
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+        
+    def clear(self) -> None:
+        """Drop all cached results."""
+        self.lru_cache.clear()
+        
+    def __len__(self) -> int:
+        """Get number of cached results."""
+        return len(self.lru_cache)
+
+class EmbeddingCache:
+    """Cache of query embeddings keyed on normalized text and model.
+    
+    A bounded in-process LRU answers repeated queries without a network
+    round trip. When a Redis URL is configured, embeddings are also
+    shared across workers. Concurrent misses for the same query wait on
+    a single embedding request.
+    """
+    
+    def __init__(
+        self,
+        maxsize: int = EMBEDDING_CACHE_SIZE,
+        redis_url: Optional[str] = EMBEDDING_CACHE_REDIS_URL,
+        redis_ttl: int = EMBEDDING_CACHE_TTL
+    ):
+        """Initialize the embedding cache.
+        
+        Args:
+            maxsize: Maximum embeddings kept in process
+            redis_url: Optional Redis URL for a shared cache
+            redis_ttl: Lifetime of Redis entries in seconds
+        """
+        self.lru_cache = LRUCache(maxsize=maxsize)
+        self.redis_ttl = redis_ttl
+        self.redis = None
+        if redis_url:
+            try:
+                self.redis = aioredis.from_url(redis_url, decode_responses=False)
+            except Exception as e:
+                logger.warning(f"Failed to initialize embedding cache Redis: {e}")
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        
+    @staticmethod
+    def make_key(text: str, model: str) -> str:
+        """Build the cache key for a query and embedding model."""
+        digest = hashlib.sha1(normalize_query(text).encode("utf-8")).hexdigest()
+        return f"qemb:{model}:{digest}"
+        
+    async def _lookup(self, key: str) -> Optional[np.ndarray]:
+        """Look a key up in process, then in Redis."""
+        embedding = self.lru_cache.get(key)
+        if embedding is not None or self.redis is None:
+            return embedding
+            
+        try:
+            raw = await self.redis.get(key)
+        except Exception as e:
+            logger.warning(f"Embedding cache Redis get failed, disabling Redis: {e}")
+            self.redis = None
+            return None
+            
+        if raw is None:
+            return None
+        embedding = np.frombuffer(raw, dtype="float32")
+        self.lru_cache.set(key, embedding)
+        return embedding
+        
+    async def _store(self, key: str, embedding: np.ndarray) -> None:
+        """Store an embedding in process and in Redis."""
+        self.lru_cache.set(key, embedding)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.setex(key, self.redis_ttl, embedding.tobytes())
+        except Exception as e:
+            logger.warning(f"Embedding cache Redis set failed, disabling Redis: {e}")
+            self.redis = None
+            
+    async def get_or_embed(
+        self,
+        texts: List[str],
+        model: str,
+        embed: Callable[[List[str]], Awaitable[np.ndarray]]
+    ) -> np.ndarray:
+        """Get embeddings for queries, embedding only the uncached ones.
+        
+        Args:
+            texts: Query texts
+            model: Embedding model name, part of the cache key
+            embed: Coroutine embedding a list of texts in one request
+            
+        Returns:
+            Array of embeddings with one row per text
+        """
+        keys = [self.make_key(text, model) for text in texts]
+        embeddings: Dict[str, np.ndarray] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        missing: Dict[str, str] = {}
+        
+        for text, key in zip(texts, keys):
+            if key in embeddings or key in waiting or key in missing:
+                continue
+            cached = await self._lookup(key)
+            if cached is not None:
+                embeddings[key] = cached
+            elif key in self._inflight:
+                waiting[key] = self._inflight[key]
+            else:
+                missing[key] = text
+                
+        self.hits += len(embeddings) + len(waiting)
+        self.misses += len(missing)
+        
+        if missing:
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in missing}
+            self._inflight.update(futures)
+            try:
+                rows = np.asarray(await embed(list(missing.values())), dtype="float32")
+                for key, row in zip(missing, rows):
+                    row.flags.writeable = False
+                    embeddings[key] = row
+                    await self._store(key, row)
+                    futures[key].set_result(row)
+            except BaseException as e:
+                for future in futures.values():
+                    if not future.done():
+                        future.set_exception(e)
+                        # Retrieved here so an unawaited failure is not reported
+                        future.exception()
+                raise
+            finally:
+                for key in futures:
+                    self._inflight.pop(key, None)
+                    
+        for key, future in waiting.items():
+            embeddings[key] = await future
+            
+        return np.vstack([embeddings[key] for key in keys])
+        
+    def __len__(self) -> int:
+        """Get number of embeddings cached in process."""
+        return len(self.lru_cache)
+
 class CacheManager:
     """Cache manager with Redis support and local LRU cache."""
     
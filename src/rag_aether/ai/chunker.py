@@ -0,0 +1,260 @@
+"""Token-aware recursive text chunking."""
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Tuple
+import logging
+import os
+import re
+from collections import deque
+from functools import lru_cache
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Constants
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
+ENCODING_NAME = os.getenv("TOKEN_ENCODING", "cl100k_base")
+
+# Separators tried in order: paragraphs, then sentences, then raw tokens
+PARAGRAPH_PATTERN = re.compile(r"\n\s*\n")
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+# Piece starts used to measure what a separator adds when joined
+_SEPARATOR_PROBES = ("The", "1", "(")
+
+class _RegexEncoder:
+    """Approximate tokenizer used when tiktoken is unavailable.
+
+    Words and punctuation marks count as one token each; leading
+    whitespace is kept on the token so decoding is a plain join.
+    """
+
+    _pattern = re.compile(r"\s*\w+|\s*[^\w\s]|\s+")
+
+    def encode(self, text: str) -> List[str]:
+        """Split text into approximate tokens."""
+        return self._pattern.findall(text)
+
+    def decode(self, tokens: List[str]) -> str:
+        """Join approximate tokens back into text."""
+        return "".join(tokens)
+
+@lru_cache(maxsize=None)
+def get_encoder(encoding_name: str = ENCODING_NAME) -> Any:
+    """Get a cached token encoder.
+
+    Args:
+        encoding_name: Name of the tiktoken encoding
+
+    Returns:
+        Encoder exposing ``encode`` and ``decode``
+    """
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        logger.warning(f"tiktoken encoding '{encoding_name}' unavailable, using approximate counts: {e}")
+        return _RegexEncoder()
+
+def count_tokens(text: str, encoding_name: str = ENCODING_NAME) -> int:
+    """Count tokens in text.
+
+    Args:
+        text: Text to count
+        encoding_name: Name of the tiktoken encoding
+
+    Returns:
+        Number of tokens
+    """
+    return len(get_encoder(encoding_name).encode(text))
+
+class TextChunker:
+    """Split text into token-bounded chunks with overlap.
+
+    Text is split recursively by paragraph, sentence and finally by token,
+    and the resulting pieces are packed greedily into chunks of at most
+    ``chunk_size`` tokens. Chunks are yielded lazily.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = CHUNK_SIZE,
+        chunk_overlap: int = CHUNK_OVERLAP,
+        encoding_name: str = ENCODING_NAME
+    ):
+        """Initialize the chunker.
+
+        Args:
+            chunk_size: Maximum number of tokens per chunk
+            chunk_overlap: Number of tokens shared between consecutive chunks
+            encoding_name: Name of the tiktoken encoding
+
+        Raises:
+            ValueError: If sizes are invalid
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        if chunk_overlap < 0 or chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be non-negative and smaller than chunk_size")
+
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.encoding_name = encoding_name
+        self.encoder = get_encoder(encoding_name)
+
+        # Oversized sentences are cut into token windows this large so the
+        # overlap can be carried over whole windows
+        self._token_window = chunk_overlap or chunk_size
+
+        # Streamed text is flushed at a sentence boundary past this size
+        self._max_buffer_chars = chunk_size * 32
+        self._separator_sizes: Dict[str, int] = {}
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens in text."""
+        return len(self.encoder.encode(text))
+
+    def split_text(self, text: str) -> List[str]:
+        """Split text into a list of chunks."""
+        return list(self.iter_chunks(text))
+
+    def iter_chunks(self, text: str) -> Iterator[str]:
+        """Lazily split text into chunks.
+
+        Args:
+            text: Text to split
+
+        Yields:
+            Text chunks of at most ``chunk_size`` tokens
+        """
+        paragraphs = ((p, "\n\n") for p in PARAGRAPH_PATTERN.split(text) if p.strip())
+        yield from self._merge(self._split_paragraphs(paragraphs))
+
+    def iter_chunks_from_stream(self, stream: Iterable[str]) -> Iterator[str]:
+        """Lazily split a stream of text fragments into chunks.
+
+        Only the current unfinished paragraph is buffered, so arbitrarily
+        large documents can be chunked without loading them into memory.
+
+        Args:
+            stream: Iterable of text fragments (e.g. file reads)
+
+        Yields:
+            Text chunks of at most ``chunk_size`` tokens
+        """
+        yield from self._merge(self._split_paragraphs(self._stream_paragraphs(stream)))
+
+    def _stream_paragraphs(self, stream: Iterable[str]) -> Iterator[Tuple[str, str]]:
+        """Yield complete paragraphs from a stream of fragments.
+
+        A paragraph longer than the buffer limit is flushed early at its
+        last sentence boundary and continued with a plain space.
+        """
+        buffer = ""
+        separator = "\n\n"
+        for fragment in stream:
+            buffer += fragment
+            parts = PARAGRAPH_PATTERN.split(buffer)
+
+            # The last part may continue in the next fragment
+            buffer = parts.pop()
+            for part in parts:
+                if part.strip():
+                    yield part, separator
+                separator = "\n\n"
+
+            if len(buffer) > self._max_buffer_chars:
+                boundaries = [m.end() for m in SENTENCE_PATTERN.finditer(buffer)]
+                cut = boundaries[-1] if boundaries else len(buffer)
+                if buffer[:cut].strip():
+                    yield buffer[:cut], separator
+                    separator = " "
+                buffer = buffer[cut:]
+
+        if buffer.strip():
+            yield buffer, separator
+
+    def _split_paragraphs(self, paragraphs: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, str, int]]:
+        """Split paragraphs into pieces that each fit in a chunk.
+
+        Yields:
+            Tuples of (separator, piece, token count)
+        """
+        for paragraph, separator in paragraphs:
+            for piece, size in self._split_recursive(paragraph.strip(), [SENTENCE_PATTERN]):
+                yield separator, piece, size
+                separator = " "
+
+    def _split_recursive(
+        self,
+        text: str,
+        patterns: List[re.Pattern]
+    ) -> Iterator[Tuple[str, int]]:
+        """Recursively split text until every piece fits in a chunk."""
+        tokens = self.encoder.encode(text)
+        if len(tokens) <= self.chunk_size:
+            yield text, len(tokens)
+            return
+
+        if not patterns:
+            # Fall back to fixed token windows
+            for i in range(0, len(tokens), self._token_window):
+                window = tokens[i:i + self._token_window]
+                yield self.encoder.decode(window).strip(), len(window)
+            return
+
+        for part in patterns[0].split(text):
+            if part.strip():
+                yield from self._split_recursive(part.strip(), patterns[1:])
+
+    def _separator_tokens(self, separator: str) -> int:
+        """Tokens a separator adds when joined before a piece.
+
+        Encoders often fold a space into the next word's token, so the
+        cost is measured in front of sample piece starts rather than on
+        the separator alone. Computed once per separator.
+        """
+        size = self._separator_sizes.get(separator)
+        if size is None:
+            size = max(0, *(
+                self.count_tokens(separator + probe) - self.count_tokens(probe)
+                for probe in _SEPARATOR_PROBES
+            ))
+            self._separator_sizes[separator] = size
+        return size
+
+    def _merge(self, pieces: Iterable[Tuple[str, str, int]]) -> Iterator[str]:
+        """Greedily pack pieces into chunks, carrying over the overlap.
+
+        Each piece is counted with the separator joined before it (the
+        first piece of a chunk is slightly overcounted), so separators
+        cannot push a chunk past ``chunk_size``.
+        """
+        window: Deque[Tuple[str, str, int]] = deque()
+        total = 0
+
+        for separator, piece, size in pieces:
+            size += self._separator_tokens(separator)
+            if window and total + size > self.chunk_size:
+                yield self._join(window)
+
+                # Keep trailing pieces that fit in the overlap and leave room
+                while window and (total > self.chunk_overlap or total + size > self.chunk_size):
+                    total -= window.popleft()[2]
+
+            window.append((separator, piece, size))
+            total += size
+
+        if window:
+            yield self._join(window)
+
+    @staticmethod
+    def _join(window: Deque[Tuple[str, str, int]]) -> str:
+        """Join pieces in a window into a single chunk."""
+        parts = []
+        for i, (separator, piece, _) in enumerate(window):
+            if i > 0:
+                parts.append(separator)
+            parts.append(piece)
+        return "".join(parts)
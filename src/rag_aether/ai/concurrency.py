@@ -0,0 +1,250 @@
+"""Adaptive concurrency control for ingestion."""
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from dotenv import load_dotenv
+
+from ..core.monitoring import monitor
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Constants
+MAX_CONCURRENCY = int(os.getenv("INGEST_MAX_CONCURRENCY", "16"))
+# p95 latency (seconds) above which concurrency backs off; 0 learns it
+TARGET_LATENCY = float(os.getenv("INGEST_TARGET_LATENCY", "0"))
+ERROR_THRESHOLD = float(os.getenv("INGEST_ERROR_THRESHOLD", "0.05"))
+# Learned targets allow this much latency growth over the best p95 seen
+LATENCY_TOLERANCE = float(os.getenv("INGEST_LATENCY_TOLERANCE", "1.5"))
+DECREASE_FACTOR = float(os.getenv("INGEST_DECREASE_FACTOR", "0.5"))
+
+# Controller actions
+INCREASE = "increase"
+DECREASE = "decrease"
+HOLD = "hold"
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Whether an exception signals rate limiting (HTTP 429)."""
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    return status == 429 or type(error).__name__ == "RateLimitError"
+
+@dataclass
+class ControllerDecision:
+    """Outcome of one controller update."""
+    action: str
+    reason: str
+    concurrency: int
+    batch_size: int
+    p95_latency: float
+    error_rate: float
+    memory_usage: float
+    samples: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary format."""
+        return {
+            "action": self.action,
+            "reason": self.reason,
+            "concurrency": self.concurrency,
+            "batch_size": self.batch_size,
+            "p95_latency": self.p95_latency,
+            "error_rate": self.error_rate,
+            "memory_usage": self.memory_usage,
+            "samples": self.samples
+        }
+
+class ConcurrencyController:
+    """AIMD controller for in-flight embedding requests and batch size.
+
+    Requests run through ``slot()``, which enforces the current limit and
+    records latency, errors and 429s. On each ``update()`` the controller
+    backs off multiplicatively when requests are rate limited, the error
+    rate or memory is too high, or p95 latency exceeds its target, and
+    otherwise grows additively. Without an explicit target the latency
+    limit is learned from the best p95 observed.
+    """
+
+    def __init__(
+        self,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = MAX_CONCURRENCY,
+        initial_batch_size: int = 100,
+        min_batch_size: int = 1,
+        max_batch_size: int = 500,
+        target_latency: float = TARGET_LATENCY,
+        error_threshold: float = ERROR_THRESHOLD,
+        memory_threshold: float = 0.85,
+        decrease_factor: float = DECREASE_FACTOR,
+        latency_tolerance: float = LATENCY_TOLERANCE,
+        window: int = 200
+    ):
+        """Initialize the controller.
+
+        Args:
+            initial_concurrency: Starting in-flight request limit
+            min_concurrency: Lowest in-flight request limit
+            max_concurrency: Highest in-flight request limit
+            initial_batch_size: Starting batch size
+            min_batch_size: Lowest batch size
+            max_batch_size: Highest batch size
+            target_latency: p95 latency target in seconds (0 to learn it)
+            error_threshold: Error rate (0-1) that triggers a back-off
+            memory_threshold: Memory usage (0-1) that triggers a back-off
+            decrease_factor: Multiplier applied on back-off
+            latency_tolerance: Allowed growth over the best p95 when the
+                target is learned
+            window: Maximum samples kept between updates
+        """
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max(min_concurrency, max_concurrency)
+        self.concurrency = min(self.max_concurrency, max(min_concurrency, initial_concurrency))
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max(min_batch_size, max_batch_size)
+        self.batch_size = min(self.max_batch_size, max(min_batch_size, initial_batch_size))
+        self.batch_step = max(1, self.batch_size // 10)
+        self.target_latency = target_latency
+        self.error_threshold = error_threshold
+        self.memory_threshold = memory_threshold
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._errors = 0
+        self._rate_limited = 0
+        self._best_p95: Optional[float] = None
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+        self.last_decision: Optional[ControllerDecision] = None
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently running."""
+        return self._in_flight
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Run one request within the current concurrency limit.
+
+        Waits while the limit is reached and records the request's latency
+        and outcome when it finishes.
+        """
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.concurrency)
+            self._in_flight += 1
+
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.record(time.monotonic() - start, error=True, rate_limited=is_rate_limit_error(e))
+            raise
+        else:
+            self.record(time.monotonic() - start)
+        finally:
+            async with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def record(self, latency: float, error: bool = False, rate_limited: bool = False) -> None:
+        """Record the outcome of one request.
+
+        Args:
+            latency: Request duration in seconds
+            error: Whether the request failed
+            rate_limited: Whether the failure was a rate limit (429)
+        """
+        self._latencies.append(latency)
+        self._errors += int(error)
+        self._rate_limited += int(rate_limited)
+
+    def update(self, memory_usage: float = 0.0) -> ControllerDecision:
+        """Adjust concurrency and batch size from samples since the last update.
+
+        Args:
+            memory_usage: Current process memory usage (0-1)
+
+        Returns:
+            The decision taken
+        """
+        samples = len(self._latencies)
+        p95 = _percentile(self._latencies, 0.95)
+        error_rate = self._errors / samples if samples else 0.0
+
+        if self._rate_limited:
+            action, reason = DECREASE, "rate_limited"
+        elif memory_usage > self.memory_threshold:
+            action, reason = DECREASE, "memory"
+        elif error_rate > self.error_threshold:
+            action, reason = DECREASE, "errors"
+        elif not samples:
+            action, reason = HOLD, "no_samples"
+        elif p95 > self._latency_limit(p95):
+            action, reason = DECREASE, "latency"
+        elif self.concurrency >= self.max_concurrency and self.batch_size >= self.max_batch_size:
+            action, reason = HOLD, "at_limit"
+        else:
+            action, reason = INCREASE, "healthy"
+
+        if action == DECREASE:
+            self.concurrency = max(self.min_concurrency, int(self.concurrency * self.decrease_factor))
+            self.batch_size = max(self.min_batch_size, int(self.batch_size * self.decrease_factor))
+        elif action == INCREASE:
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+            self.batch_size = min(self.max_batch_size, self.batch_size + self.batch_step)
+
+        # Each decision only looks at what happened since the previous one
+        self._latencies.clear()
+        self._errors = 0
+        self._rate_limited = 0
+
+        decision = ControllerDecision(
+            action=action,
+            reason=reason,
+            concurrency=self.concurrency,
+            batch_size=self.batch_size,
+            p95_latency=p95,
+            error_rate=error_rate,
+            memory_usage=memory_usage,
+            samples=samples
+        )
+        if action != HOLD:
+            self.logger.debug(f"Concurrency {action} ({reason}): {decision.to_dict()}")
+        monitor.record_concurrency_decision(decision.to_dict())
+        self.last_decision = decision
+
+        async def notify() -> None:
+            async with self._condition:
+                self._condition.notify_all()
+
+        # Let waiting requests start if the limit grew
+        if action == INCREASE and self._in_flight:
+            try:
+                asyncio.get_running_loop().create_task(notify())
+            except RuntimeError:
+                pass
+
+        return decision
+
+    def _latency_limit(self, p95: float) -> float:
+        """Latency above which the controller backs off."""
+        if self.target_latency > 0:
+            return self.target_latency
+        if self._best_p95 is None or p95 < self._best_p95:
+            self._best_p95 = p95
+        return self._best_p95 * self.latency_tolerance
+
+def _percentile(values: Deque[float], q: float) -> float:
+    """Nearest-rank percentile of the values (0 if empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
@@ -0,0 +1,365 @@
+"""Token-budgeted context packing for generation."""
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Tuple, Union
+import hashlib
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from dotenv import load_dotenv
+
+from .cache_manager import LRUCache
+from .chunker import count_tokens, get_encoder
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Constants
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "800"))
+# Relevance vs. novelty trade-off for MMR (1.0 ignores redundancy)
+MMR_LAMBDA = float(os.getenv("CONTEXT_MMR_LAMBDA", "0.7"))
+# Chunks at least this similar to one already packed are dropped
+DUPLICATE_THRESHOLD = float(os.getenv("CONTEXT_DUPLICATE_THRESHOLD", "0.8"))
+# Older turns are summarized in blocks of this many turns
+SUMMARY_STEP = int(os.getenv("HISTORY_SUMMARY_STEP", "4"))
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+Summarizer = Callable[[List[Dict[str, Any]]], Awaitable[str]]
+
+@dataclass
+class ContextChunk:
+    """One packed span of retrieved text."""
+    content: str
+    score: float
+    tokens: int
+    document_id: Optional[str] = None
+    chunk_indices: List[int] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary format."""
+        return {
+            "content": self.content,
+            "score": self.score,
+            "tokens": self.tokens,
+            "document_id": self.document_id,
+            "chunk_indices": self.chunk_indices
+        }
+
+@dataclass
+class PackedContext:
+    """Context and history that fit the prompt budget."""
+    chunks: List[ContextChunk]
+    history: List[Dict[str, Any]]
+    summary: Optional[str]
+    context_tokens: int
+    history_tokens: int
+    dropped_chunks: int  # Spans left out as redundant or over budget
+    dropped_turns: int  # Turns left out or summarized
+
+    @property
+    def tokens(self) -> int:
+        """Total tokens packed."""
+        return self.context_tokens + self.history_tokens
+
+    def format_context(self) -> str:
+        """Numbered sources for the prompt."""
+        return "\n\n".join(f"[{i + 1}] {chunk.content}" for i, chunk in enumerate(self.chunks))
+
+    def format_history(self) -> str:
+        """Conversation summary and recent turns for the prompt."""
+        lines = []
+        if self.summary:
+            lines.append(f"Earlier conversation (summary): {self.summary}")
+        for turn in self.history:
+            lines.append(f"{turn.get('role', 'user')}: {turn.get('content', '')}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary format."""
+        return {
+            "chunks": [chunk.to_dict() for chunk in self.chunks],
+            "history": self.history,
+            "summary": self.summary,
+            "context_tokens": self.context_tokens,
+            "history_tokens": self.history_tokens,
+            "dropped_chunks": self.dropped_chunks,
+            "dropped_turns": self.dropped_turns
+        }
+
+def _shingles(text: str) -> FrozenSet[str]:
+    """Lowercased word bigrams (single words for very short texts)."""
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) < 2:
+        return frozenset(words)
+    return frozenset(zip(words, words[1:]))
+
+def _similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two shingle sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def _join_overlapping(first: str, second: str, probe: int = 16) -> str:
+    """Join consecutive chunks, dropping the longest text they overlap on."""
+    head = second[:probe]
+    # Only the last len(second) characters of first can overlap
+    position = first.find(head, max(0, len(first) - len(second))) if head else -1
+    while position != -1:
+        if second.startswith(first[position:]):
+            return first + second[len(first) - position:]
+        position = first.find(head, position + 1)
+    return f"{first}\n{second}"
+
+class ContextBuilder:
+    """Packs retrieved chunks and conversation history into a token budget.
+
+    Chunks are first merged into contiguous spans when they are adjacent
+    in the same source document (``metadata.doc_id``, which the vector
+    store keeps stable across chunks), dropping the overlap the chunker
+    adds between them. Spans are then picked by maximal marginal relevance (MMR):
+    each pick maximizes ``lambda * relevance - (1 - lambda) * redundancy``
+    against what is already packed, near-duplicates are dropped, and
+    anything that no longer fits the budget is skipped. Redundancy is
+    word-bigram overlap, so no embeddings are needed.
+
+    History keeps the most recent turns that fit its own budget. Older
+    turns are replaced by a summary when a summarizer is given. The
+    summary covers whole blocks of ``summary_step`` turns from the start
+    of the conversation, so it only changes once a block fills up; a new
+    summary extends the cached summary of the longest known prefix with
+    just the turns after it.
+    """
+
+    def __init__(
+        self,
+        context_budget: int = CONTEXT_TOKEN_BUDGET,
+        history_budget: int = HISTORY_TOKEN_BUDGET,
+        mmr_lambda: float = MMR_LAMBDA,
+        duplicate_threshold: float = DUPLICATE_THRESHOLD,
+        summarizer: Optional[Summarizer] = None,
+        summary_cache_size: int = 256,
+        summary_step: int = SUMMARY_STEP
+    ):
+        """Initialize the builder.
+
+        Args:
+            context_budget: Tokens available for retrieved context
+            history_budget: Tokens available for conversation history
+            mmr_lambda: Relevance weight in MMR selection (0-1)
+            duplicate_threshold: Similarity above which a chunk is dropped
+            summarizer: Optional coroutine summarizing older turns
+            summary_cache_size: Number of summaries to cache
+            summary_step: Turns per summarized block
+        """
+        if not 0 <= mmr_lambda <= 1:
+            raise ValueError("mmr_lambda must be between 0 and 1")
+        if summary_step < 1:
+            raise ValueError("summary_step must be at least 1")
+
+        self.context_budget = context_budget
+        self.history_budget = history_budget
+        self.mmr_lambda = mmr_lambda
+        self.duplicate_threshold = duplicate_threshold
+        self.summarizer = summarizer
+        self.summary_cache = LRUCache(maxsize=summary_cache_size)
+        self.summary_step = summary_step
+
+    async def build(
+        self,
+        results: List[Union[str, Dict[str, Any]]],
+        history: Optional[List[Dict[str, Any]]] = None
+    ) -> PackedContext:
+        """Pack retrieved results and history into the budgets.
+
+        Args:
+            results: Retrieved chunks, best first, as strings or dicts with
+                'content' (or 'text'), 'score' and optional 'document_id',
+                'metadata.doc_id' and 'metadata.chunk_index'
+            history: Conversation turns, oldest first, with 'role' and
+                'content'
+
+        Returns:
+            PackedContext ready to format into a prompt
+        """
+        spans = self._merge_adjacent([self._normalize(r, rank) for rank, r in enumerate(results)])
+        chunks = self._select(spans)
+        turns, summary, history_tokens, dropped_turns = await self._pack_history(history or [])
+
+        return PackedContext(
+            chunks=chunks,
+            history=turns,
+            summary=summary,
+            context_tokens=sum(chunk.tokens for chunk in chunks),
+            history_tokens=history_tokens,
+            dropped_chunks=len(spans) - len(chunks),
+            dropped_turns=dropped_turns
+        )
+
+    @staticmethod
+    def _normalize(result: Union[str, Dict[str, Any]], rank: int) -> ContextChunk:
+        """Turn one retrieved result into a chunk."""
+        if isinstance(result, str):
+            return ContextChunk(content=result, score=1.0 / (1 + rank), tokens=0)
+
+        metadata = result.get("metadata") or {}
+        index = metadata.get("chunk_index", result.get("chunk_index"))
+        # The store's document_id is per chunk; doc_id names the source
+        document_id = metadata.get("doc_id", result.get("document_id", metadata.get("document_id")))
+        return ContextChunk(
+            content=result.get("content", result.get("text", "")),
+            score=float(result.get("score", 1.0 / (1 + rank))),
+            tokens=0,
+            document_id=document_id,
+            chunk_indices=[index] if index is not None else []
+        )
+
+    @staticmethod
+    def _merge_adjacent(chunks: List[ContextChunk]) -> List[ContextChunk]:
+        """Merge chunks with consecutive indices in the same document."""
+        spans: List[ContextChunk] = []
+        by_position: Dict[Any, ContextChunk] = {}
+
+        for chunk in sorted(
+            (c for c in chunks if c.document_id is not None and c.chunk_indices),
+            key=lambda c: (str(c.document_id), c.chunk_indices[0])
+        ):
+            index = chunk.chunk_indices[0]
+            previous = by_position.get((chunk.document_id, index - 1))
+            if previous is not None:
+                previous.content = _join_overlapping(previous.content, chunk.content)
+                previous.score = max(previous.score, chunk.score)
+                previous.chunk_indices.append(index)
+                by_position[(chunk.document_id, index)] = previous
+            elif (chunk.document_id, index) not in by_position:
+                by_position[(chunk.document_id, index)] = chunk
+                spans.append(chunk)
+
+        spans.extend(c for c in chunks if c.document_id is None or not c.chunk_indices)
+        for span in spans:
+            span.tokens = count_tokens(span.content)
+        return sorted(spans, key=lambda s: s.score, reverse=True)
+
+    def _select(self, spans: List[ContextChunk]) -> List[ContextChunk]:
+        """Pick spans by MMR until the context budget is spent."""
+        if not spans:
+            return []
+
+        scores = [span.score for span in spans]
+        low, high = min(scores), max(scores)
+        relevance = [(s - low) / (high - low) if high > low else 1.0 for s in scores]
+        shingles = [_shingles(span.content) for span in spans]
+        redundancy = [0.0] * len(spans)
+
+        selected: List[ContextChunk] = []
+        remaining = set(range(len(spans)))
+        budget = self.context_budget
+        while remaining and budget > 0:
+            best = max(
+                remaining,
+                key=lambda i: self.mmr_lambda * relevance[i] - (1 - self.mmr_lambda) * redundancy[i]
+            )
+            remaining.discard(best)
+            if redundancy[best] >= self.duplicate_threshold or spans[best].tokens > budget:
+                continue
+
+            selected.append(spans[best])
+            budget -= spans[best].tokens
+            for i in remaining:
+                redundancy[i] = max(redundancy[i], _similarity(shingles[i], shingles[best]))
+
+        return selected
+
+    async def _pack_history(
+        self,
+        history: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], Optional[str], int, int]:
+        """Keep recent turns within budget, summarizing the older ones.
+
+        Returns:
+            Tuple of (kept turns, summary, tokens used, turns left out)
+        """
+        budget = self.history_budget
+        if budget <= 0:
+            return [], None, 0, len(history)
+        kept: List[Dict[str, Any]] = []
+        used = 0
+
+        for turn in reversed(history):
+            tokens = count_tokens(str(turn.get("content", "")))
+            if used + tokens > budget:
+                if not kept:
+                    # Keep the tail of an oversized latest turn
+                    encoder = get_encoder()
+                    content = encoder.decode(encoder.encode(str(turn.get("content", "")))[-budget:])
+                    kept.append({**turn, "content": content})
+                    used = budget
+                break
+            kept.append(turn)
+            used += tokens
+
+        kept.reverse()
+        older = history[:len(history) - len(kept)]
+        summary = None
+        if older and self.summarizer is not None and used < budget:
+            # Round up to a whole block, keeping at least the latest turn
+            step = self.summary_step
+            boundary = min(-(-len(older) // step) * step, len(history) - 1)
+            summary = await self._summarize(history[:boundary])
+            moved = boundary - len(older)
+            if summary and moved:
+                # Turns rounded into the block are covered by the summary
+                kept = kept[moved:]
+                older = history[:boundary]
+                used = sum(count_tokens(str(turn.get("content", ""))) for turn in kept)
+        if summary:
+            summary_tokens = count_tokens(summary)
+            if used + summary_tokens > budget:
+                encoder = get_encoder()
+                summary = encoder.decode(encoder.encode(summary)[:budget - used])
+                summary_tokens = budget - used
+            used += summary_tokens
+
+        return kept, summary, used, len(older)
+
+    async def _summarize(self, turns: List[Dict[str, Any]]) -> Optional[str]:
+        """Summarize turns, extending the cached summary of their longest prefix.
+
+        Summaries are cached under a hash chained over the turns they
+        cover, so a conversation that grows keeps hitting the cache for
+        its earlier prefixes. Only the turns after the longest cached
+        prefix are sent, preceded by that prefix's summary.
+
+        Returns None if summarizing fails; failures are not cached.
+        """
+        keys = []
+        digest = ""
+        for turn in turns:
+            payload = digest + json.dumps(turn, sort_keys=True, default=str)
+            digest = hashlib.sha1(payload.encode()).hexdigest()
+            keys.append(digest)
+
+        summary = self.summary_cache.get(keys[-1])
+        if summary is not None:
+            return summary
+
+        start, previous = 0, None
+        for end in range(len(turns) - 1, 0, -1):
+            previous = self.summary_cache.get(keys[end - 1])
+            if previous is not None:
+                start = end
+                break
+
+        pending = turns[start:]
+        if previous is not None:
+            pending = [{"role": "system", "content": f"Summary of the earlier conversation: {previous}"}, *pending]
+        try:
+            summary = await self.summarizer(pending)
+        except Exception as e:
+            logger.warning(f"History summary failed, dropping older turns: {e}")
+            return None
+        self.summary_cache.set(keys[-1], summary)
+        return summary
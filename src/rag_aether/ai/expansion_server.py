@@ -0,0 +1,250 @@
+"""Dynamic-batching inference server for the query expansion model."""
+from typing import List, NamedTuple, Optional
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+import torch
+from dotenv import load_dotenv
+
+from .query_expansion import get_model
+from ..core.errors import QueryExpansionError
+from ..core.monitoring import monitor
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Constants
+EXPANSION_MODEL = os.getenv("QUERY_EXPANSION_MODEL", "")
+EXPANSION_MAX_BATCH = int(os.getenv("QUERY_EXPANSION_MAX_BATCH", "16"))
+# Seconds to wait for more requests before running a partial batch
+EXPANSION_MAX_WAIT = float(os.getenv("QUERY_EXPANSION_MAX_WAIT", "0.01"))
+# Seconds a caller waits for expansions before falling back to the raw query
+EXPANSION_TIMEOUT = float(os.getenv("QUERY_EXPANSION_TIMEOUT", "0.25"))
+EXPANSION_NUM_RETURN = int(os.getenv("QUERY_EXPANSION_NUM_RETURN", "3"))
+EXPANSION_MAX_NEW_TOKENS = int(os.getenv("QUERY_EXPANSION_MAX_NEW_TOKENS", "32"))
+
+_STOP = object()
+
+class _Request(NamedTuple):
+    """One pending expansion request."""
+    query: str
+    future: asyncio.Future
+    loop: asyncio.AbstractEventLoop
+
+class ExpansionServer:
+    """Serves the T5 expansion model from a dedicated generation thread.
+
+    The model is loaded once per process, int8 dynamically quantized when
+    running on CPU. Concurrent ``expand`` calls are queued and the worker
+    thread groups them into batches of up to ``max_batch_size``, waiting
+    at most ``max_wait`` seconds for a batch to fill. Callers that do not
+    get expansions within ``timeout`` receive the raw query instead, so
+    expansion adds bounded latency under load; their requests are dropped
+    before generation if still queued.
+    """
+
+    def __init__(
+        self,
+        model_name: str = EXPANSION_MODEL,
+        max_batch_size: int = EXPANSION_MAX_BATCH,
+        max_wait: float = EXPANSION_MAX_WAIT,
+        timeout: float = EXPANSION_TIMEOUT,
+        num_return_sequences: int = EXPANSION_NUM_RETURN,
+        max_new_tokens: int = EXPANSION_MAX_NEW_TOKENS,
+        quantize: bool = True,
+        prompt: str = "expand query: {query}"
+    ):
+        """Initialize the server.
+
+        Args:
+            model_name: Name of the T5 model to serve
+            max_batch_size: Maximum queries per generate call
+            max_wait: Seconds to wait for a batch to fill
+            timeout: Seconds before a caller falls back to the raw query
+            num_return_sequences: Expansions generated per query
+            max_new_tokens: Maximum tokens per expansion
+            quantize: Whether to apply int8 dynamic quantization on CPU
+            prompt: Prompt template with a ``{query}`` placeholder
+        """
+        if not model_name:
+            raise QueryExpansionError("No query expansion model configured")
+
+        self.model_name = model_name
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self.num_return_sequences = num_return_sequences
+        self.max_new_tokens = max_new_tokens
+        self.quantize = quantize
+        self.prompt = prompt
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.timeouts = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the generation thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the generation thread (the model loads on that thread)."""
+        with self._lock:
+            if self.running:
+                return
+            self._thread = threading.Thread(
+                target=self._serve,
+                name=f"expansion-server-{self.model_name}",
+                daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the generation thread after the current batch."""
+        with self._lock:
+            if not self.running:
+                return
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    async def expand(self, query: str) -> List[str]:
+        """Generate expansions for a query.
+
+        Args:
+            query: Query to expand
+
+        Returns:
+            Generated expansions, or ``[query]`` if generation failed or
+            did not finish within the timeout
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put(_Request(query, future, loop))
+
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            # wait_for cancelled the future, so the worker will skip it
+            self.timeouts += 1
+            monitor.record_error("query_expansion_timeout")
+            logger.debug(f"Query expansion timed out after {self.timeout}s")
+        except Exception as e:
+            monitor.record_error("query_expansion")
+            logger.warning(f"Query expansion failed, using raw query: {e}")
+        return [query]
+
+    def _next_batch(self) -> Optional[List[_Request]]:
+        """Block for one request, then collect more until full or max_wait."""
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # Finish this batch, then stop
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _serve(self) -> None:
+        """Generation thread: load the model once, then serve batches."""
+        try:
+            model, tokenizer, device = get_model(self.model_name, quantize=self.quantize)
+        except Exception as e:
+            logger.error(f"Failed to load expansion model {self.model_name}: {e}")
+            model = None
+
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            # Skip callers that already timed out
+            batch = [r for r in batch if not r.future.done()]
+            if not batch:
+                continue
+
+            if model is None:
+                error = QueryExpansionError(f"Expansion model {self.model_name} is unavailable")
+                for request in batch:
+                    request.loop.call_soon_threadsafe(_set_exception, request.future, error)
+                continue
+
+            try:
+                outputs = self._generate(model, tokenizer, device, [r.query for r in batch])
+            except Exception as e:
+                logger.error(f"Expansion batch of {len(batch)} failed: {e}")
+                for request in batch:
+                    request.loop.call_soon_threadsafe(_set_exception, request.future, e)
+                continue
+
+            self.batches += 1
+            for request, expansions in zip(batch, outputs):
+                request.loop.call_soon_threadsafe(_set_result, request.future, expansions)
+
+    def _generate(self, model, tokenizer, device: str, queries: List[str]) -> List[List[str]]:
+        """Run one batched generate call; returns expansions per query."""
+        inputs = tokenizer(
+            [self.prompt.format(query=q) for q in queries],
+            return_tensors="pt",
+            padding=True,
+            truncation=True
+        )
+        inputs = {name: tensor.to(device) for name, tensor in inputs.items()}
+
+        with torch.inference_mode():
+            generated = model.generate(
+                **inputs,
+                max_new_tokens=self.max_new_tokens,
+                num_beams=self.num_return_sequences,
+                num_return_sequences=self.num_return_sequences
+            )
+
+        decoded = tokenizer.batch_decode(generated, skip_special_tokens=True)
+        n = self.num_return_sequences
+        return [
+            _unique([text.strip() for text in decoded[i * n:(i + 1) * n] if text.strip()]) or [query]
+            for i, query in enumerate(queries)
+        ]
+
+def _unique(texts: List[str]) -> List[str]:
+    """Drop duplicates, keeping first occurrence order."""
+    return list(dict.fromkeys(texts))
+
+def _set_result(future: asyncio.Future, result: List[str]) -> None:
+    """Resolve a future unless its caller gave up."""
+    if not future.done():
+        future.set_result(result)
+
+def _set_exception(future: asyncio.Future, error: BaseException) -> None:
+    """Fail a future unless its caller gave up."""
+    if not future.done():
+        future.set_exception(error)
+
+_server: Optional[ExpansionServer] = None
+
+def get_expansion_server() -> Optional[ExpansionServer]:
+    """Get the shared expansion server, or None if no model is configured."""
+    global _server
+    if _server is None and EXPANSION_MODEL:
+        _server = ExpansionServer()
+    return _server
@@ -0,0 +1,209 @@
+"""Background bulk ingestion jobs."""
+from typing import Any, AsyncIterable, Dict, Iterable, Iterator, List, Optional, Union
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from dotenv import load_dotenv
+
+from .batch_processor import BatchProcessor, BatchStats
+from .journal import IngestionJournal
+from .rag_system import RAGSystem
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Constants
+MAX_CONCURRENT_JOBS = int(os.getenv("INGEST_MAX_CONCURRENT_JOBS", "2"))
+MAX_FINISHED_JOBS = int(os.getenv("INGEST_MAX_FINISHED_JOBS", "1000"))
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+@dataclass
+class IngestJob:
+    """State of a background ingestion job."""
+    job_id: str
+    status: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    stats: Optional[BatchStats] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary format."""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "stats": asdict(self.stats) if self.stats else None,
+            "error": self.error
+        }
+
+class NDJSONFile:
+    """Documents read lazily from a spooled NDJSON file.
+
+    The job manager closes the file when its job finishes, whether or not
+    it was ever read, which deletes it.
+    """
+
+    def __init__(self, path: str):
+        """Wrap a spooled file.
+
+        Args:
+            path: Path to the NDJSON file, owned by this object
+        """
+        self.path = path
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    logger.warning(f"Skipping invalid NDJSON line {line_number}: {e}")
+
+    def close(self) -> None:
+        """Delete the spooled file."""
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+
+class IngestJobManager:
+    """Runs ingestion jobs in the background on top of BatchProcessor.
+
+    Jobs are accepted immediately and executed by a bounded number of
+    concurrent workers; progress is exposed through each job's BatchStats.
+    """
+
+    def __init__(
+        self,
+        rag_system: RAGSystem,
+        max_concurrent_jobs: int = MAX_CONCURRENT_JOBS,
+        batch_size: int = 100,
+        max_workers: int = 4,
+        journal_path: Optional[str] = None
+    ):
+        """Initialize the job manager.
+
+        Args:
+            rag_system: RAG system used for ingestion
+            max_concurrent_jobs: Jobs allowed to run at the same time
+            batch_size: Initial batch size for each job
+            max_workers: Concurrent documents per job
+            journal_path: Optional SQLite journal path for resumable jobs
+        """
+        self.rag = rag_system
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.journal_path = journal_path
+        self.jobs: Dict[str, IngestJob] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrent_jobs)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.logger = logging.getLogger(__name__)
+
+    def submit(
+        self,
+        documents: Union[List[Dict[str, Any]], Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+        job_id: Optional[str] = None
+    ) -> IngestJob:
+        """Queue documents for background ingestion.
+
+        Documents with a ``close()`` method (such as :class:`NDJSONFile`)
+        are closed when the job finishes. With a journal, resubmitting
+        documents under the ID of an interrupted job resumes it.
+
+        Args:
+            documents: List or (async) iterable of documents
+            job_id: Optional job ID; generated if omitted
+
+        Returns:
+            The queued job
+
+        Raises:
+            ValueError: If a job with the same ID is still queued or running
+        """
+        if job_id is not None and self.is_active(job_id):
+            raise ValueError(f"Job {job_id} is already running")
+        job = IngestJob(job_id=job_id or str(uuid.uuid4()), status=QUEUED, created_at=time.time())
+        self.jobs[job.job_id] = job
+        self._tasks[job.job_id] = asyncio.create_task(self._run(job, documents))
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        """Get a job by ID."""
+        return self.jobs.get(job_id)
+
+    def is_active(self, job_id: str) -> bool:
+        """Whether a job is queued or running."""
+        return job_id in self._tasks
+
+    async def _run(
+        self,
+        job: IngestJob,
+        documents: Union[List[Dict[str, Any]], Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]
+    ) -> None:
+        """Run a job once a worker slot is free."""
+        try:
+            async with self._semaphore:
+                await self._execute(job, documents)
+        finally:
+            self._tasks.pop(job.job_id, None)
+            close = getattr(documents, "close", None)
+            if callable(close):
+                close()
+
+    async def _execute(
+        self,
+        job: IngestJob,
+        documents: Union[List[Dict[str, Any]], Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]
+    ) -> None:
+        """Process a job's documents, recording its outcome."""
+        job.status = RUNNING
+        job.started_at = time.time()
+        processor = BatchProcessor(self.rag, batch_size=self.batch_size, max_workers=self.max_workers)
+
+        def update(stats: BatchStats) -> None:
+            job.stats = stats
+
+        journal = None
+        try:
+            if self.journal_path:
+                journal = await asyncio.to_thread(IngestionJournal, job.job_id, self.journal_path)
+            if isinstance(documents, list):
+                job.stats = await processor.process_documents(documents, callback=update, journal=journal)
+            else:
+                job.stats = await processor.process_stream(documents, callback=update, journal=journal)
+            job.status = COMPLETED
+        except Exception as e:
+            self.logger.error(f"Ingestion job {job.job_id} failed: {e}")
+            job.status = FAILED
+            job.error = str(e)
+            job.stats = processor.stats
+        finally:
+            job.finished_at = time.time()
+            if journal is not None:
+                journal.close()
+            processor.executor.shutdown(wait=False)
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond the retention limit."""
+        finished = [job for job in self.jobs.values() if job.status in (COMPLETED, FAILED)]
+        excess = len(finished) - MAX_FINISHED_JOBS
+        if excess > 0:
+            for job in sorted(finished, key=lambda j: j.finished_at or 0)[:excess]:
+                del self.jobs[job.job_id]
@@ -4,6 +4,8 @@ from typing import List, Dict, Any, Optional
 from .vector_store import VectorStore
 from .persona_system import PersonaSystem
 from .ml_client import MLClient
+from ..core.deadline import run_stage
+from ..core.errors import DeadlineExceededError
 
 logger = logging.getLogger(__name__)
 
@@ -35,15 +37,21 @@ class IntegrationSystem:
             max_tokens: Optional max tokens for response
             
         Returns:
-            Dict containing response and context information
+            Dict containing response and context information, plus the
+            stages skipped to meet the request deadline
         """
+        degraded = []
         try:
-            # Get relevant documents from RAG
-            relevant_docs = await self.vector_store.similarity_search(
-                query=message,
-                k=4,  # Get top 4 relevant documents
-                metadata_filter=metadata_filter
-            )
+            # Get relevant documents from RAG; answer without them if late
+            try:
+                relevant_docs = await run_stage("search", self.vector_store.similarity_search(
+                    query=message,
+                    k=4,  # Get top 4 relevant documents
+                    metadata_filter=metadata_filter
+                ))
+            except DeadlineExceededError:
+                relevant_docs = []
+                degraded.append("search")
             
             # Build context from documents and history
             context = {
@@ -55,23 +63,25 @@ class IntegrationSystem:
             # Check user availability
             is_available = await self.persona_system.is_user_available(user_id)
             
+            response = None
             if not is_available:
-                # Generate response using persona
-                response = await self.persona_system.generate_response(
-                    user_id=user_id,
-                    context=context,
-                    prompt=message,
-                    max_tokens=max_tokens
-                )
-            else:
-                # User is available, return indication
-                response = None
+                # Generate response using persona; return context only if late
+                try:
+                    response = await self.persona_system.generate_response(
+                        user_id=user_id,
+                        context=context,
+                        prompt=message,
+                        max_tokens=max_tokens
+                    )
+                except DeadlineExceededError:
+                    degraded.append("completion")
                 
             return {
                 "response": response,
                 "is_user_available": is_available,
                 "relevant_documents": relevant_docs,
-                "context_used": context
+                "context_used": context,
+                "degraded": degraded
             }
             
         except Exception as e:
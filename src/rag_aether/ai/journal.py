@@ -0,0 +1,163 @@
+"""Durable ingestion job journal backed by SQLite."""
+from typing import Any, Dict, Iterable, List, Optional, Set
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Constants
+JOURNAL_PATH = os.getenv("INGEST_JOURNAL_PATH", "ingest_journal.db")
+
+# Document states
+PENDING = "pending"
+INDEXED = "indexed"
+FAILED = "failed"
+STATES = (PENDING, INDEXED, FAILED)
+
+def document_key(doc: Dict[str, Any]) -> str:
+    """Stable key identifying a document across job restarts.
+
+    Uses the document ``id`` (or ``metadata["id"]``) when present, and a
+    hash of the text otherwise.
+    """
+    doc_id = doc.get("id")
+    if doc_id is None:
+        doc_id = (doc.get("metadata") or {}).get("id")
+    if doc_id is not None:
+        return str(doc_id)
+    text = doc.get("text") or ""
+    if isinstance(text, str):
+        text = text.encode("utf-8")
+    return hashlib.sha1(text).hexdigest()
+
+class IngestionJournal:
+    """Per-document checkpoint journal for an ingestion job.
+
+    Each document moves from pending to indexed or failed; a document is
+    embedded and indexed in one step, so there is no state in between.
+    State is committed to a local SQLite file so an interrupted job can
+    resume without re-embedding finished documents.
+
+    Methods block on SQLite; async callers should run them in a thread
+    (e.g. ``asyncio.to_thread``). The connection is shared between
+    threads and serialized by a lock.
+    """
+
+    def __init__(self, job_id: str, path: str = JOURNAL_PATH):
+        """Open (or create) the journal for a job.
+
+        Args:
+            job_id: Identifier of the ingestion job
+            path: Path to the SQLite journal file
+        """
+        self.job_id = job_id
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS ingest_documents (
+                job_id TEXT NOT NULL,
+                doc_key TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (job_id, doc_key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_ingest_documents_state
+                ON ingest_documents (job_id, state);
+        """)
+        self.conn.commit()
+
+    def register(self, doc_keys: Iterable[str]) -> None:
+        """Record documents as pending; known documents keep their state."""
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO ingest_documents (job_id, doc_key, state, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                ((self.job_id, key, PENDING, now) for key in doc_keys)
+            )
+
+    def mark(self, doc_keys: Iterable[str], state: str, error: Optional[str] = None) -> None:
+        """Move documents to a new state in a single transaction.
+
+        Args:
+            doc_keys: Keys of the documents to update
+            state: New state
+            error: Optional error message for failed documents
+
+        Raises:
+            ValueError: If the state is unknown
+        """
+        if state not in STATES:
+            raise ValueError(f"Unknown document state: {state}")
+
+        now = time.time()
+        attempt = 1 if state in (INDEXED, FAILED) else 0
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "UPDATE ingest_documents SET state = ?, error = ?, updated_at = ?, "
+                "attempts = attempts + ? WHERE job_id = ? AND doc_key = ?",
+                ((state, error, now, attempt, self.job_id, key) for key in doc_keys)
+            )
+
+    def keys_in_state(self, *states: str) -> Set[str]:
+        """Get keys of documents in any of the given states."""
+        placeholders = ", ".join("?" for _ in states)
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT doc_key FROM ingest_documents WHERE job_id = ? AND state IN ({placeholders})",
+                (self.job_id, *states)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def remaining(self, retry_failed: bool = True) -> Set[str]:
+        """Keys of documents that still need processing.
+
+        Args:
+            retry_failed: Whether failed documents should be retried
+
+        Returns:
+            Set of document keys
+        """
+        states = [PENDING] + ([FAILED] if retry_failed else [])
+        return self.keys_in_state(*states)
+
+    def progress(self) -> Dict[str, int]:
+        """Count documents per state for this job."""
+        counts = {state: 0 for state in STATES}
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT state, COUNT(*) FROM ingest_documents WHERE job_id = ? GROUP BY state",
+                (self.job_id,)
+            ).fetchall()
+        for state, count in rows:
+            counts[state] = count
+        counts["total"] = sum(counts[state] for state in STATES)
+        return counts
+
+    def failures(self) -> List[Dict[str, Any]]:
+        """Get failed documents with their last error and attempt count."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT doc_key, error, attempts FROM ingest_documents "
+                "WHERE job_id = ? AND state = ?",
+                (self.job_id, FAILED)
+            ).fetchall()
+        return [{"doc_key": key, "error": error, "attempts": attempts} for key, error, attempts in rows]
+
+    def close(self) -> None:
+        """Close the journal file."""
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,422 @@
+"""Streaming document parsers for file ingestion."""
+from typing import Any, AsyncIterator, Callable, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import queue as queue_module
+import re
+import zipfile
+from xml.etree import ElementTree
+from dotenv import load_dotenv
+
+from ..core.errors import DocumentProcessingError
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Constants
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Parsed sections buffered between worker processes and the consumer
+PARSE_QUEUE_SIZE = int(os.getenv("PARSE_QUEUE_SIZE", "64"))
+# Sections longer than this are split at a paragraph boundary
+MAX_SECTION_CHARS = int(os.getenv("PARSER_MAX_SECTION_CHARS", "100000"))
+READ_SIZE = 64 * 1024
+
+# Record fields holding the text of a JSON document
+JSON_TEXT_FIELDS = ("text", "content", "body")
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+FENCE_PATTERN = re.compile(r"^\s*(```|~~~)")
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+DOCX_HEADING_PATTERN = re.compile(r"^(?:Heading|heading)\s*(\d)$")
+
+Section = Dict[str, Any]
+
+def _section(text: str, source: str, fmt: str, **metadata: Any) -> Section:
+    """Build a section document in the shape ingestion expects."""
+    return {
+        "text": text,
+        "metadata": {"source": source, "format": fmt, **metadata}
+    }
+
+def _split_oversized(text: str) -> Iterator[str]:
+    """Split text longer than MAX_SECTION_CHARS at paragraph boundaries."""
+    while len(text) > MAX_SECTION_CHARS:
+        cut = text.rfind("\n\n", 0, MAX_SECTION_CHARS)
+        if cut <= 0:
+            cut = MAX_SECTION_CHARS
+        yield text[:cut]
+        text = text[cut:].lstrip("\n")
+    if text.strip():
+        yield text
+
+def parse_text(path: str) -> Iterator[Section]:
+    """Stream a plain text file in paragraph-aligned sections."""
+    buffer = ""
+    part = 0
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        while True:
+            block = f.read(READ_SIZE)
+            buffer += block
+            while len(buffer) > MAX_SECTION_CHARS:
+                cut = buffer.rfind("\n\n", 0, MAX_SECTION_CHARS)
+                if cut <= 0:
+                    cut = MAX_SECTION_CHARS
+                piece, buffer = buffer[:cut].strip(), buffer[cut:]
+                if piece:
+                    yield _section(piece, path, "text", part=part)
+                    part += 1
+            if not block:
+                break
+
+    if buffer.strip():
+        yield _section(buffer.strip(), path, "text", part=part)
+
+def parse_markdown(path: str) -> Iterator[Section]:
+    """Stream a Markdown file section by section.
+
+    A section starts at each heading and carries the path of enclosing
+    headings, e.g. ``["Guide", "Install", "Linux"]``.
+    """
+    headings: List[str] = []
+    lines: List[str] = []
+    size = 0
+    in_fence = False
+
+    def flush() -> Iterator[Section]:
+        text = "".join(lines).strip()
+        for part, piece in enumerate(_split_oversized(text)):
+            yield _section(piece.strip(), path, "markdown", heading_path=list(headings), part=part)
+
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if FENCE_PATTERN.match(line):
+                in_fence = not in_fence
+            match = None if in_fence else HEADING_PATTERN.match(line)
+            if match:
+                yield from flush()
+                lines, size = [], 0
+                level = len(match.group(1))
+                headings = headings[:level - 1] + [match.group(2)]
+                continue
+
+            lines.append(line)
+            size += len(line)
+            if size > MAX_SECTION_CHARS and not line.strip():
+                # Long section: emit what we have at this blank line
+                yield from flush()
+                lines, size = [], 0
+
+    yield from flush()
+
+def _json_record(record: Any, path: str, index: int, json_path: str) -> Optional[Section]:
+    """Turn one JSON record into a section."""
+    metadata: Dict[str, Any] = {"record": index, "json_path": json_path}
+    if isinstance(record, str):
+        text = record
+    elif isinstance(record, dict):
+        text = next((record[f] for f in JSON_TEXT_FIELDS if isinstance(record.get(f), str)), None)
+        if text is None:
+            text = json.dumps(record, ensure_ascii=False)
+        if isinstance(record.get("metadata"), dict):
+            metadata.update(record["metadata"])
+        if record.get("id") is not None:
+            metadata["id"] = record["id"]
+    else:
+        text = json.dumps(record, ensure_ascii=False)
+
+    if not text.strip():
+        return None
+    section = _section(text, path, "json", **metadata)
+    if "id" in metadata:
+        section["id"] = str(metadata["id"])
+    return section
+
+def _iter_json_array(f: IO[str]) -> Iterator[Any]:
+    """Decode the items of a top-level JSON array one at a time.
+
+    Only the item being decoded is held in memory, so arrays much larger
+    than RAM can be streamed without a dedicated streaming JSON library.
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(READ_SIZE).lstrip()
+    if not buffer.startswith("["):
+        raise DocumentProcessingError("Expected a JSON array")
+    buffer = buffer[1:]
+    eof = False
+
+    while True:
+        buffer = buffer.lstrip().lstrip(",").lstrip()
+        while not buffer and not eof:
+            block = f.read(READ_SIZE)
+            eof = not block
+            buffer = block.lstrip().lstrip(",").lstrip()
+        if buffer.startswith("]") or (eof and not buffer):
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer)
+            # A value ending exactly at the buffer end (e.g. a number) may continue
+            complete = eof or end < len(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise DocumentProcessingError("Truncated JSON array")
+            complete = False
+
+        if not complete:
+            # Item continues past the buffer; read more and retry
+            block = f.read(max(READ_SIZE, len(buffer)))
+            eof = not block
+            buffer += block
+            continue
+
+        yield item
+        buffer = buffer[end:]
+
+def parse_json(path: str) -> Iterator[Section]:
+    """Stream records from JSON, JSON Lines or NDJSON files.
+
+    Top-level arrays yield one section per item; other JSON values yield
+    a single section. Records use their ``text``/``content``/``body``
+    field as text and keep ``id`` and ``metadata`` when present.
+    """
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for index, line in enumerate(f):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    logger.warning(f"Skipping invalid JSON line {index + 1} in {path}: {e}")
+                    continue
+                section = _json_record(record, path, index, f"$[{index}]")
+                if section:
+                    yield section
+            return
+
+        head = f.read(1)
+        while head and head.isspace():
+            head = f.read(1)
+        f.seek(0)
+
+        if head == "[":
+            for index, record in enumerate(_iter_json_array(f)):
+                section = _json_record(record, path, index, f"$[{index}]")
+                if section:
+                    yield section
+        else:
+            section = _json_record(json.load(f), path, 0, "$")
+            if section:
+                yield section
+
+def _pdf_outline(reader: Any) -> Dict[int, List[str]]:
+    """Map page numbers to the outline heading path starting there."""
+    starts: Dict[int, List[str]] = {}
+
+    def walk(items: Iterable[Any], trail: List[str]) -> None:
+        last: List[str] = trail
+        for item in items:
+            if isinstance(item, list):
+                walk(item, last)
+                continue
+            last = trail + [str(item.title)]
+            try:
+                starts.setdefault(reader.get_destination_page_number(item), last)
+            except Exception:
+                pass
+
+    try:
+        walk(reader.outline, [])
+    except Exception as e:
+        logger.debug(f"Could not read PDF outline: {e}")
+    return starts
+
+def parse_pdf(path: str) -> Iterator[Section]:
+    """Stream a PDF page by page.
+
+    Requires the optional ``pypdf`` package. Pages are extracted lazily
+    and carry the outline heading path in effect on that page.
+
+    Raises:
+        DocumentProcessingError: If pypdf is not installed
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        raise DocumentProcessingError("PDF ingestion requires the pypdf package") from e
+
+    reader = PdfReader(path)
+    outline = _pdf_outline(reader)
+    heading_path: List[str] = []
+    for number, page in enumerate(reader.pages):
+        heading_path = outline.get(number, heading_path)
+        text = page.extract_text() or ""
+        if text.strip():
+            yield _section(text.strip(), path, "pdf", page=number + 1, heading_path=list(heading_path))
+
+def parse_docx(path: str) -> Iterator[Section]:
+    """Stream a DOCX file section by section.
+
+    The document XML is read incrementally from the archive, so memory
+    stays bounded regardless of file size. Heading styles start new
+    sections and build the heading path.
+    """
+    headings: List[str] = []
+    paragraphs: List[str] = []
+    size = 0
+
+    def flush() -> Iterator[Section]:
+        text = "\n\n".join(paragraphs).strip()
+        for part, piece in enumerate(_split_oversized(text)):
+            yield _section(piece.strip(), path, "docx", heading_path=list(headings), part=part)
+
+    try:
+        archive = zipfile.ZipFile(path)
+        document = archive.open("word/document.xml")
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise DocumentProcessingError(f"Not a valid DOCX file: {path}") from e
+
+    with archive, document:
+        for _, element in ElementTree.iterparse(document, events=("end",)):
+            if element.tag != f"{WORD_NAMESPACE}p":
+                continue
+
+            text = "".join(node.text or "" for node in element.iter(f"{WORD_NAMESPACE}t"))
+            style = element.find(f"{WORD_NAMESPACE}pPr/{WORD_NAMESPACE}pStyle")
+            level = None
+            if style is not None:
+                match = DOCX_HEADING_PATTERN.match(style.get(f"{WORD_NAMESPACE}val", ""))
+                level = int(match.group(1)) if match else None
+            element.clear()
+
+            if level and text.strip():
+                yield from flush()
+                paragraphs, size = [], 0
+                headings = headings[:level - 1] + [text.strip()]
+            elif text.strip():
+                paragraphs.append(text)
+                size += len(text)
+                if size > MAX_SECTION_CHARS:
+                    yield from flush()
+                    paragraphs, size = [], 0
+
+    yield from flush()
+
+PARSERS: Dict[str, Callable[[str], Iterator[Section]]] = {
+    ".txt": parse_text,
+    ".md": parse_markdown,
+    ".markdown": parse_markdown,
+    ".json": parse_json,
+    ".jsonl": parse_json,
+    ".ndjson": parse_json,
+    ".pdf": parse_pdf,
+    ".docx": parse_docx,
+}
+
+def register_parser(extension: str, parser: Callable[[str], Iterator[Section]]) -> None:
+    """Register a parser for a file extension (e.g. ``".html"``)."""
+    PARSERS[extension.lower()] = parser
+
+def get_parser(path: str) -> Callable[[str], Iterator[Section]]:
+    """Get the parser for a file, falling back to plain text."""
+    return PARSERS.get(os.path.splitext(path)[1].lower(), parse_text)
+
+def iter_sections(path: str, metadata: Optional[Dict[str, Any]] = None) -> Iterator[Section]:
+    """Parse a file into a stream of sections.
+
+    Args:
+        path: File to parse
+        metadata: Optional metadata added to every section
+
+    Yields:
+        Section documents with ``text`` and structural ``metadata``
+    """
+    for section in get_parser(path)(path):
+        if metadata:
+            section["metadata"] = {**metadata, **section["metadata"]}
+        yield section
+
+# Messages sent from parser processes
+_SECTION = "section"
+_ERROR = "error"
+_WORKER_DONE = "done"
+
+def _parse_worker(tasks: Any, results: Any) -> None:
+    """Parse files from the task queue until a None task arrives."""
+    while True:
+        task = tasks.get()
+        if task is None:
+            results.put((_WORKER_DONE, None))
+            return
+        path, metadata = task
+        try:
+            for section in iter_sections(path, metadata):
+                # Blocks while the consumer is behind
+                results.put((_SECTION, section))
+        except Exception as e:
+            results.put((_ERROR, (path, f"{type(e).__name__}: {e}")))
+
+async def parse_files(
+    files: Iterable[Tuple[str, Optional[Dict[str, Any]]]],
+    max_workers: int = PARSE_WORKERS,
+    queue_size: int = PARSE_QUEUE_SIZE
+) -> AsyncIterator[Section]:
+    """Parse files in worker processes and stream their sections.
+
+    Workers block once ``queue_size`` sections are waiting, so memory is
+    bounded by the queue, not by file sizes. Files that fail to parse are
+    logged and skipped.
+
+    Args:
+        files: Pairs of (path, optional metadata)
+        max_workers: Number of parser processes
+        queue_size: Maximum parsed sections buffered
+
+    Yields:
+        Section documents ready for ingestion
+    """
+    files = list(files)
+    if not files:
+        return
+
+    context = multiprocessing.get_context()
+    tasks = context.Queue()
+    results = context.Queue(maxsize=queue_size)
+    for task in files:
+        tasks.put(task)
+
+    workers = []
+    for _ in range(min(max_workers, len(files))):
+        tasks.put(None)
+        worker = context.Process(target=_parse_worker, args=(tasks, results), daemon=True)
+        worker.start()
+        workers.append(worker)
+
+    loop = asyncio.get_running_loop()
+    running = len(workers)
+    try:
+        while running:
+            try:
+                kind, payload = await loop.run_in_executor(None, results.get, True, 1.0)
+            except queue_module.Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    raise DocumentProcessingError("Parser processes exited unexpectedly")
+                continue
+
+            if kind == _SECTION:
+                yield payload
+            elif kind == _ERROR:
+                logger.error(f"Failed to parse {payload[0]}: {payload[1]}")
+            else:
+                running -= 1
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
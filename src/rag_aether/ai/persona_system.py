@@ -1,14 +1,22 @@
 """Persona system for user personality mirroring and response generation."""
+import asyncio
 import logging
+import os
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, asdict
 import json
 from supabase import create_client, Client
 from .ml_client import MLClient
+from .context_builder import ContextBuilder
 from ..config import load_credentials
+from ..core.deadline import run_stage
+from ..core.errors import DeadlineExceededError
 
 logger = logging.getLogger(__name__)
 
+# Seconds a Supabase profile load may take before falling back
+PROFILE_LOAD_TIMEOUT = float(os.getenv("PROFILE_LOAD_TIMEOUT", "0.5"))
+
 @dataclass
 class PersonaProfile:
     """User persona profile containing style characteristics."""
@@ -37,6 +45,7 @@ class PersonaSystem:
         self.ml_client = MLClient()
         self.supabase = create_client(creds.supabase_url, creds.supabase_key)
         self.profiles: Dict[str, PersonaProfile] = {}
+        self.context_builder = ContextBuilder(summarizer=self._summarize_history)
         self.logger = logging.getLogger(__name__)
         
     async def analyze_user_style(
@@ -121,10 +130,7 @@ class PersonaSystem:
             Generated response text
         """
         try:
-            # Try to load profile if not in memory
-            profile = self.profiles.get(user_id)
-            if not profile:
-                profile = await self._load_profile(user_id)
+            profile = await self.get_profile(user_id)
                 
             if not profile:
                 self.logger.warning(f"No profile found for user {user_id}, using default style")
@@ -134,26 +140,57 @@ class PersonaSystem:
             style_prompt = self._create_style_prompt(profile)
             messages = [
                 {"role": "system", "content": style_prompt},
-                {"role": "user", "content": f"Context: {context}\n\nPrompt: {prompt}"}
+                {"role": "user", "content": await self._build_user_message(context, prompt)}
             ]
             
-            # Generate response
-            response = await self.ml_client.get_completion(
+            # Generate response within the request deadline
+            response = await run_stage("completion", self.ml_client.get_completion(
                 messages=messages,
                 max_tokens=max_tokens or profile.average_response_length,
                 temperature=0.7  # Allow some creativity while maintaining style
-            )
+            ))
             
             return response
             
+        except DeadlineExceededError:
+            raise
         except Exception as e:
             self.logger.error(f"Failed to generate response: {e}")
             raise
             
+    async def get_profile(self, user_id: str) -> Optional[PersonaProfile]:
+        """Get a user's profile, preferring the in-memory copy.
+        
+        Profiles loaded from Supabase are kept in memory. If the load
+        misses its deadline the cached profile is served, or None when
+        there is none, so callers fall back to the default style.
+        
+        Args:
+            user_id: The user's ID
+            
+        Returns:
+            The profile, or None if unavailable
+        """
+        profile = self.profiles.get(user_id)
+        if profile:
+            return profile
+            
+        try:
+            profile = await run_stage("profile", self._load_profile(user_id), budget=PROFILE_LOAD_TIMEOUT)
+        except DeadlineExceededError:
+            self.logger.warning(f"Profile load for user {user_id} timed out, using default style")
+            return None
+            
+        if profile:
+            self.profiles[user_id] = profile
+        return profile
+            
     async def _load_profile(self, user_id: str) -> Optional[PersonaProfile]:
         """Load a profile from Supabase."""
         try:
-            result = self.supabase.table('persona_profiles').select('*').eq('user_id', user_id).execute()
+            # Run the blocking client call off the event loop so it can time out
+            query = self.supabase.table('persona_profiles').select('*').eq('user_id', user_id)
+            result = await asyncio.to_thread(query.execute)
             if result.data:
                 profile_data = result.data[0]
                 return PersonaProfile.from_dict(profile_data)
@@ -218,14 +255,41 @@ Maintain consistency with the user's typical expression while staying natural.""
         messages = [
             {"role": "system", "content": """Generate a professional, balanced response.
 Keep language clear and neutral. Avoid extreme formality or casualness."""},
-            {"role": "user", "content": f"Context: {context}\n\nPrompt: {prompt}"}
+            {"role": "user", "content": await self._build_user_message(context, prompt)}
         ]
         
-        return await self.ml_client.get_completion(
+        return await run_stage("completion", self.ml_client.get_completion(
             messages=messages,
             temperature=0.5
-        )
+        ))
 
+    async def _build_user_message(self, context: Dict[str, Any], prompt: str) -> str:
+        """Pack documents and history into the token budget for the prompt."""
+        packed = await self.context_builder.build(
+            context.get("relevant_documents", []),
+            context.get("conversation_history", [])
+        )
+        sections = []
+        if packed.chunks:
+            sections.append(f"Relevant documents:\n{packed.format_context()}")
+        if packed.history or packed.summary:
+            sections.append(f"Conversation so far:\n{packed.format_history()}")
+        sections.append(f"Prompt: {prompt}")
+        return "\n\n".join(sections)
+        
+    async def _summarize_history(self, turns: List[Dict[str, Any]]) -> str:
+        """Summarize older conversation turns in a few sentences."""
+        transcript = "\n".join(f"{t.get('role', 'user')}: {t.get('content', '')}" for t in turns)
+        return await run_stage("summary", self.ml_client.get_completion(
+            messages=[
+                {"role": "system", "content": "Summarize this conversation in at most three sentences, "
+                                              "keeping names, decisions and open questions."},
+                {"role": "user", "content": transcript}
+            ],
+            max_tokens=150,
+            temperature=0.2
+        ))
+        
     async def is_user_available(self, user_id: str) -> bool:
         """Check if a user is available based on their profile settings.
         
@@ -235,9 +299,7 @@ Keep language clear and neutral. Avoid extreme formality or casualness."""},
         Returns:
             Boolean indicating availability
         """
-        profile = self.profiles.get(user_id)
-        if not profile:
-            profile = await self._load_profile(user_id)
+        profile = await self.get_profile(user_id)
             
         if not profile or not profile.active_hours:
             return True  # Default to available if no profile/hours set
@@ -0,0 +1,421 @@
+"""Staged ingestion pipeline: parse -> chunk -> dedup -> embed -> index."""
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .parsers import parse_files
+from .preprocessing import get_chunker, decode_text, get_preprocess_pool, hash_text, normalize_text
+from .rag_system import RAGSystem, MODEL_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of input for a stage worker
+_END = object()
+
+@dataclass
+class StageStats:
+    """Throughput and queue statistics for a pipeline stage."""
+    name: str
+    concurrency: int
+    processed: int = 0
+    emitted: int = 0
+    failed: int = 0
+    busy_time: float = 0.0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    start_time: float = field(default_factory=time.time)
+    end_time: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        """Wall-clock time the stage has been running."""
+        return (self.end_time or time.time()) - self.start_time
+
+    @property
+    def throughput(self) -> float:
+        """Items processed per second."""
+        return self.processed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of worker time spent processing (0-1)."""
+        capacity = self.elapsed * self.concurrency
+        return self.busy_time / capacity if capacity > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary format."""
+        return {
+            "name": self.name,
+            "concurrency": self.concurrency,
+            "processed": self.processed,
+            "emitted": self.emitted,
+            "failed": self.failed,
+            "throughput": self.throughput,
+            "utilization": self.utilization,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth
+        }
+
+class Stage:
+    """A pipeline stage with its own input queue and worker pool.
+
+    The stage function receives one item (or a list of items when
+    ``batch_size`` > 1) and returns an iterable of output items, which are
+    passed to the next stage. When an executor is given the function must
+    be picklable and synchronous; it runs off the event loop.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Union[Iterable[Any], Awaitable[Iterable[Any]]]],
+        concurrency: int = 1,
+        batch_size: int = 1,
+        batch_timeout: float = 0.05,
+        queue_size: int = 256,
+        executor: Optional[Executor] = None
+    ):
+        """Initialize the stage.
+
+        Args:
+            name: Stage name used in metrics
+            func: Function mapping an item or batch to output items
+            concurrency: Number of concurrent workers
+            batch_size: Maximum items per call (1 disables batching)
+            batch_timeout: Seconds to wait for a batch to fill
+            queue_size: Maximum number of queued input items
+            executor: Optional executor for synchronous CPU-bound functions
+        """
+        if concurrency < 1 or batch_size < 1:
+            raise ValueError("concurrency and batch_size must be at least 1")
+
+        self.name = name
+        self.func = func
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.executor = executor
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.stats = StageStats(name=name, concurrency=concurrency)
+
+    async def put(self, item: Any) -> None:
+        """Queue an item, waiting while the queue is full."""
+        await self.queue.put(item)
+
+    async def close(self) -> None:
+        """Signal every worker that no more input will arrive."""
+        for _ in range(self.concurrency):
+            await self.queue.put(_END)
+
+    async def run(self, downstream: Optional["Stage"]) -> None:
+        """Run all workers until input is exhausted, then close downstream."""
+        self.stats = StageStats(name=self.name, concurrency=self.concurrency)
+        try:
+            await asyncio.gather(*(self._work(downstream) for _ in range(self.concurrency)))
+        finally:
+            self.stats.end_time = time.time()
+        if downstream:
+            await downstream.close()
+
+    async def _next_batch(self) -> Optional[List[Any]]:
+        """Collect the next batch; returns None once input is exhausted."""
+        item = await self.queue.get()
+        self._record_depth()
+        if item is _END:
+            return None
+
+        batch = [item]
+        deadline = time.monotonic() + self.batch_timeout
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if item is _END:
+                # Let this worker exit after the partial batch
+                await self.queue.put(_END)
+                break
+            batch.append(item)
+        return batch
+
+    async def _work(self, downstream: Optional["Stage"]) -> None:
+        """Process batches until the end marker is received."""
+        while True:
+            batch = await self._next_batch()
+            if batch is None:
+                return
+
+            payload = batch if self.batch_size > 1 else batch[0]
+            start = time.perf_counter()
+            try:
+                if self.executor is not None:
+                    loop = asyncio.get_running_loop()
+                    outputs = await loop.run_in_executor(self.executor, self.func, payload)
+                else:
+                    outputs = self.func(payload)
+                    if asyncio.iscoroutine(outputs):
+                        outputs = await outputs
+                outputs = list(outputs or [])
+            except Exception as e:
+                self.stats.failed += len(batch)
+                logger.error(f"Stage {self.name} failed on {len(batch)} item(s): {e}")
+                continue
+            finally:
+                self.stats.busy_time += time.perf_counter() - start
+
+            self.stats.processed += len(batch)
+            self.stats.emitted += len(outputs)
+            if downstream:
+                for output in outputs:
+                    await downstream.put(output)
+
+    def _record_depth(self) -> None:
+        """Sample the input queue depth."""
+        depth = self.queue.qsize()
+        self.stats.queue_depth = depth
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, depth)
+
+def parse_document(doc: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Decode and normalize a raw document.
+
+    Args:
+        doc: Document with ``text`` (str or bytes) and optional ``metadata``
+
+    Returns:
+        Single-item list with the parsed document, or empty if no text
+    """
+    text = normalize_text(decode_text(doc.get("text") or "", doc.get("encoding", "utf-8")))
+    if not text:
+        return []
+
+    metadata = dict(doc.get("metadata") or {})
+    doc_id = doc.get("id") or metadata.get("id") or hash_text(text)
+    return [{"id": str(doc_id), "text": text, "metadata": metadata}]
+
+def chunk_document(
+    doc: Dict[str, Any],
+    chunk_size: int = MODEL_CONFIG["embedding"]["chunk_size"],
+    chunk_overlap: int = MODEL_CONFIG["embedding"]["chunk_overlap"]
+) -> List[Dict[str, Any]]:
+    """Split a parsed document into hashed chunks.
+
+    Args:
+        doc: Parsed document from :func:`parse_document`
+        chunk_size: Maximum tokens per chunk
+        chunk_overlap: Tokens shared between consecutive chunks
+
+    Returns:
+        List of chunk dicts with ``text``, ``hash`` and ``metadata``;
+        the document id is kept under ``doc_id``, which the vector store
+        does not overwrite
+    """
+    chunker = get_chunker(chunk_size, chunk_overlap)
+    chunks = []
+    for i, text in enumerate(chunker.iter_chunks(doc["text"])):
+        chunks.append({
+            "text": text,
+            "hash": hash_text(text),
+            "metadata": {**doc["metadata"], "doc_id": doc["id"], "chunk_index": i}
+        })
+    return chunks
+
+class _ChunkTask:
+    """Picklable chunking callable bound to a chunk configuration."""
+
+    def __init__(self, chunk_size: int, chunk_overlap: int):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+    def __call__(self, doc: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return chunk_document(doc, self.chunk_size, self.chunk_overlap)
+
+class IngestionPipeline:
+    """Ingestion engine with independently scaled stages.
+
+    Documents flow through bounded queues:
+
+    * parse  - decode and normalize text (process pool)
+    * chunk  - token-aware chunking and hashing (process pool)
+    * dedup  - drop chunks already indexed for the same document
+    * embed  - micro-batched async embedding requests
+    * index  - single writer adding embedded batches to the vector store
+    """
+
+    def __init__(
+        self,
+        rag_system: RAGSystem,
+        cpu_workers: Optional[int] = None,
+        embed_concurrency: int = 4,
+        embed_batch_size: int = MODEL_CONFIG["embedding"]["batch_size"],
+        index_batch_size: int = 256,
+        queue_size: int = 256,
+        executor: Optional[Executor] = None
+    ):
+        """Initialize the pipeline.
+
+        Args:
+            rag_system: RAG system providing embedding and indexing
+            cpu_workers: Concurrent parse and chunk tasks (defaults to
+                the size of the shared preprocessing pool)
+            embed_concurrency: Concurrent embedding requests
+            embed_batch_size: Chunks per embedding request
+            index_batch_size: Maximum chunks per vector store insert
+            queue_size: Maximum queued items per stage
+            executor: Optional executor for CPU-bound stages; the shared
+                preprocessing process pool is used when omitted
+        """
+        self.rag = rag_system
+        self.cpu_workers = cpu_workers or get_preprocess_pool().max_workers
+        self.embed_concurrency = embed_concurrency
+        self.embed_batch_size = embed_batch_size
+        self.index_batch_size = index_batch_size
+        self.queue_size = queue_size
+        self.chunk_size = MODEL_CONFIG["embedding"]["chunk_size"]
+        self.chunk_overlap = MODEL_CONFIG["embedding"]["chunk_overlap"]
+        self._executor = executor
+        # (doc_id, chunk hash) of indexed chunks, and of chunks in flight
+        self.seen_hashes: Set[Tuple[str, str]] = set()
+        self._pending: Set[Tuple[str, str]] = set()
+        self.stages: List[Stage] = []
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def executor(self) -> Executor:
+        """Executor for CPU-bound stages, created on first use."""
+        if self._executor is None:
+            self._executor = get_preprocess_pool().executor
+        return self._executor
+
+    def _build_stages(self) -> List[Stage]:
+        """Create the stage graph for a run."""
+        return [
+            Stage("parse", parse_document, concurrency=self.cpu_workers,
+                  queue_size=self.queue_size, executor=self.executor),
+            Stage("chunk", _ChunkTask(self.chunk_size, self.chunk_overlap),
+                  concurrency=self.cpu_workers, queue_size=self.queue_size, executor=self.executor),
+            Stage("dedup", self._dedup, queue_size=self.queue_size),
+            Stage("embed", self._embed, concurrency=self.embed_concurrency,
+                  batch_size=self.embed_batch_size, queue_size=self.queue_size),
+            Stage("index", self._index, batch_size=self.index_batch_size,
+                  queue_size=self.queue_size)
+        ]
+
+    @staticmethod
+    def _chunk_key(chunk: Dict[str, Any]) -> Tuple[str, str]:
+        """Dedup key of a chunk: its document and content hash."""
+        return chunk["metadata"]["doc_id"], chunk["hash"]
+
+    def _dedup(self, chunk: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Pass a chunk through unless its document already has it.
+
+        The key is only recorded as seen once the chunk is indexed, so
+        chunks lost to a failed embed or index are ingested again on retry.
+        """
+        key = self._chunk_key(chunk)
+        if key in self.seen_hashes or key in self._pending:
+            return []
+        self._pending.add(key)
+        return [chunk]
+
+    async def _embed(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Embed a micro-batch of chunks in one request."""
+        embeddings = await self.rag.embed_texts([c["text"] for c in chunks])
+        return [{**chunk, "embedding": embedding} for chunk, embedding in zip(chunks, embeddings)]
+
+    async def _index(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Write a batch of embedded chunks to the vector store."""
+        keys = [self._chunk_key(c) for c in chunks]
+        try:
+            embeddings = np.vstack([c["embedding"] for c in chunks])
+            success = await self.rag.index_chunks(
+                [c["text"] for c in chunks],
+                embeddings,
+                [c["metadata"] for c in chunks]
+            )
+            if not success:
+                raise RuntimeError("Vector store rejected batch")
+        finally:
+            self._pending.difference_update(keys)
+        self.seen_hashes.update(keys)
+        return []
+
+    async def run(
+        self,
+        documents: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Run documents through every stage.
+
+        Args:
+            documents: Iterable or async iterable of documents with
+                ``text`` and optional ``metadata``/``id``
+
+        Returns:
+            Per-stage metrics keyed by stage name
+        """
+        self.stages = self._build_stages()
+        runners = [
+            asyncio.create_task(stage.run(self.stages[i + 1] if i + 1 < len(self.stages) else None))
+            for i, stage in enumerate(self.stages)
+        ]
+
+        try:
+            head = self.stages[0]
+            if hasattr(documents, "__aiter__"):
+                async for doc in documents:
+                    await head.put(doc)
+            else:
+                for doc in documents:
+                    await head.put(doc)
+            await head.close()
+            await asyncio.gather(*runners)
+        except BaseException:
+            for runner in runners:
+                runner.cancel()
+            raise
+        finally:
+            # Chunks that failed before indexing may be retried next run
+            self._pending.clear()
+
+        metrics = self.get_metrics()
+        self.logger.info(f"Ingestion pipeline finished, bottleneck stage: {self.bottleneck()}")
+        return metrics
+
+    async def run_files(
+        self,
+        paths: Iterable[str],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Parse files in worker processes and run their sections through every stage.
+
+        Args:
+            paths: Files to ingest (PDF, Markdown, JSON, DOCX or text)
+            metadata: Optional metadata added to every section
+
+        Returns:
+            Per-stage metrics keyed by stage name
+        """
+        return await self.run(parse_files(
+            [(path, metadata) for path in paths],
+            max_workers=self.cpu_workers,
+            queue_size=self.queue_size
+        ))
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Get current per-stage metrics."""
+        for stage in self.stages:
+            stage.stats.queue_depth = stage.queue.qsize()
+        return {stage.name: stage.stats.to_dict() for stage in self.stages}
+
+    def bottleneck(self) -> Optional[str]:
+        """Name of the stage with the highest worker utilization."""
+        if not self.stages:
+            return None
+        return max(self.stages, key=lambda stage: stage.stats.utilization).name
@@ -0,0 +1,194 @@
+"""CPU-bound document preprocessing on a process pool."""
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Union
+import asyncio
+import hashlib
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from dotenv import load_dotenv
+
+from .chunker import TextChunker, CHUNK_SIZE, CHUNK_OVERLAP
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Constants
+PREPROCESS_WORKERS = int(os.getenv("PREPROCESS_WORKERS", str(os.cpu_count() or 1)))
+# Documents shorter than this are processed inline; IPC would cost more
+INLINE_THRESHOLD = int(os.getenv("PREPROCESS_INLINE_THRESHOLD", "20000"))
+
+_TRAILING_SPACE_PATTERN = re.compile(r"[ \t]+\n")
+_CONTROL_PATTERN = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+
+class PreparedDocument(NamedTuple):
+    """Chunks and content hashes for one document.
+
+    Kept to plain tuples of strings so results pickle cheaply when returned
+    from worker processes.
+    """
+    chunks: Tuple[str, ...]
+    hashes: Tuple[str, ...]
+
+def decode_text(text: Union[str, bytes], encoding: str = "utf-8") -> str:
+    """Decode raw bytes into text, replacing invalid sequences."""
+    if isinstance(text, bytes):
+        return text.decode(encoding, errors="replace")
+    return text
+
+def normalize_text(text: str) -> str:
+    """Normalize line endings, control characters and trailing spaces."""
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = _CONTROL_PATTERN.sub("", text)
+    return _TRAILING_SPACE_PATTERN.sub("\n", text).strip()
+
+def hash_text(text: str) -> str:
+    """Content hash used for deduplication."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+@lru_cache(maxsize=8)
+def get_chunker(chunk_size: int, chunk_overlap: int) -> TextChunker:
+    """Get a chunker cached per worker process."""
+    return TextChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+def prepare_document(
+    text: Union[str, bytes],
+    chunk_size: int = CHUNK_SIZE,
+    chunk_overlap: int = CHUNK_OVERLAP,
+    encoding: str = "utf-8"
+) -> PreparedDocument:
+    """Decode, clean, chunk and hash a document.
+
+    Runs in worker processes, so it must stay a module-level function.
+
+    Args:
+        text: Raw document text or bytes
+        chunk_size: Maximum tokens per chunk
+        chunk_overlap: Tokens shared between consecutive chunks
+        encoding: Encoding used when text is bytes
+
+    Returns:
+        PreparedDocument with chunks and their hashes
+    """
+    cleaned = normalize_text(decode_text(text, encoding))
+    chunks = tuple(get_chunker(chunk_size, chunk_overlap).iter_chunks(cleaned))
+    return PreparedDocument(chunks, tuple(hash_text(chunk) for chunk in chunks))
+
+def _prepare_many(
+    texts: List[Union[str, bytes]],
+    chunk_size: int,
+    chunk_overlap: int
+) -> List[PreparedDocument]:
+    """Prepare several documents in one worker call."""
+    return [prepare_document(text, chunk_size, chunk_overlap) for text in texts]
+
+class PreprocessPool:
+    """Process pool for CPU-bound ingestion work.
+
+    Keeps decoding, cleanup, chunking and hashing off the event loop so
+    large documents do not block concurrent queries.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = PREPROCESS_WORKERS,
+        inline_threshold: int = INLINE_THRESHOLD
+    ):
+        """Initialize the pool.
+
+        Args:
+            max_workers: Number of worker processes (defaults to core count)
+            inline_threshold: Documents shorter than this many characters
+                are processed on the calling thread
+        """
+        self.max_workers = max_workers
+        self.inline_threshold = inline_threshold
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Worker process pool, created on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def prepare(
+        self,
+        text: Union[str, bytes],
+        chunk_size: int = CHUNK_SIZE,
+        chunk_overlap: int = CHUNK_OVERLAP
+    ) -> PreparedDocument:
+        """Prepare one document, off the event loop if it is large.
+
+        All chunks are materialized, since a worker process cannot hand
+        back a lazy generator; callers needing bounded memory for huge
+        inputs should chunk with :meth:`TextChunker.iter_chunks` instead.
+
+        Args:
+            text: Raw document text or bytes
+            chunk_size: Maximum tokens per chunk
+            chunk_overlap: Tokens shared between consecutive chunks
+
+        Returns:
+            PreparedDocument with chunks and their hashes
+        """
+        if len(text) < self.inline_threshold:
+            return prepare_document(text, chunk_size, chunk_overlap)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, prepare_document, text, chunk_size, chunk_overlap
+        )
+
+    async def prepare_many(
+        self,
+        texts: Iterable[Union[str, bytes]],
+        chunk_size: int = CHUNK_SIZE,
+        chunk_overlap: int = CHUNK_OVERLAP
+    ) -> List[PreparedDocument]:
+        """Prepare many documents spread across all workers.
+
+        Documents are grouped into one task per worker to keep IPC
+        overhead low for large batches of small documents.
+
+        Args:
+            texts: Raw document texts or bytes
+            chunk_size: Maximum tokens per chunk
+            chunk_overlap: Tokens shared between consecutive chunks
+
+        Returns:
+            PreparedDocument for each input, in order
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+
+        if sum(len(text) for text in texts) < self.inline_threshold:
+            return _prepare_many(texts, chunk_size, chunk_overlap)
+
+        loop = asyncio.get_running_loop()
+        group_size = -(-len(texts) // self.max_workers)
+        groups = [texts[i:i + group_size] for i in range(0, len(texts), group_size)]
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self.executor, _prepare_many, group, chunk_size, chunk_overlap)
+            for group in groups
+        ))
+        return [prepared for group in results for prepared in group]
+
+    def shutdown(self) -> None:
+        """Shut down worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+_pool: Optional[PreprocessPool] = None
+
+def get_preprocess_pool() -> PreprocessPool:
+    """Get the shared preprocessing pool."""
+    global _pool
+    if _pool is None:
+        _pool = PreprocessPool()
+    return _pool
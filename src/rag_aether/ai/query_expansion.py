@@ -1,6 +1,8 @@
 """Query expansion module for RAG system."""
 from typing import List, Dict, Any, Optional, Tuple
+import asyncio
 import logging
+import threading
 import ast
 from functools import lru_cache
 from transformers import T5Tokenizer, T5ForConditionalGeneration
@@ -15,28 +17,32 @@ logger = logging.getLogger(__name__)
 
 # Global model and tokenizer cache with LRU eviction
 _model_cache = LRUCache(maxsize=2)  # Only keep 2 models in memory
+_model_lock = threading.Lock()
 
-@with_performance_monitoring
-def get_model(model_name: str) -> Tuple[T5ForConditionalGeneration, T5Tokenizer, str]:
+def get_model(
+    model_name: str,
+    quantize: bool = False
+) -> Tuple[T5ForConditionalGeneration, T5Tokenizer, str]:
     """Get or create model and tokenizer with caching.
     
     Args:
         model_name: Name of T5 model to use
+        quantize: Whether to apply int8 dynamic quantization on CPU
         
     Returns:
         Tuple of (model, tokenizer, device)
     """
-    cache_key = f"model:{model_name}"
-    cached = _model_cache.get(cache_key)
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    quantize = quantize and device == "cpu"
+    cache_key = f"model:{model_name}:{'int8' if quantize else 'fp'}"
     
-    if cached is not None:
-        monitor.record_cache_hit("lru")
-        return cached
-        
-    with performance_section("load_model"):
-        monitor.take_snapshot(f"before_load_{model_name}")
-        
-        try:
+    with _model_lock:
+        cached = _model_cache.get(cache_key)
+        if cached is not None:
+            monitor.record_cache_hit("lru")
+            return cached
+            
+        with performance_section("load_model"):
             # Initialize tokenizer with error handling
             try:
                 tokenizer = T5Tokenizer.from_pretrained(model_name)
@@ -47,27 +53,26 @@ def get_model(model_name: str) -> Tuple[T5ForConditionalGeneration, T5Tokenizer,
             try:
                 model = T5ForConditionalGeneration.from_pretrained(
                     model_name,
-                    torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
+                    torch_dtype=torch.float16 if device == "cuda" else torch.float32,
                     low_cpu_mem_usage=True
                 )
             except Exception as e:
                 raise QueryExpansionError(f"Failed to load model: {e}")
                 
-            # Set device
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            model = model.to(device)
+            model = model.to(device).eval()
+            if quantize:
+                # int8 weights for the linear layers; activations stay fp32
+                model = torch.quantization.quantize_dynamic(
+                    model, {torch.nn.Linear}, dtype=torch.qint8
+                )
             
             # Cache the model, tokenizer, and device
             result = (model, tokenizer, device)
             _model_cache.set(cache_key, result)
-            
-            monitor.take_snapshot(f"after_load_{model_name}")
-            monitor.compare_snapshots(f"before_load_{model_name}", f"after_load_{model_name}")
+            logger.info(f"Loaded query expansion model {model_name} on {device}"
+                        f"{' (int8)' if quantize else ''}")
             
             return result
-            
-        except Exception as e:
-            raise QueryExpansionError(f"Failed to initialize model: {e}")
 
 class QueryProcessor:
     """Process and validate queries."""
@@ -129,15 +134,23 @@ class QueryProcessor:
 class QueryExpander:
     """Expands queries for better retrieval."""
     
-    def __init__(self, use_mock: bool = False):
+    def __init__(self, use_mock: bool = False, server: Optional[Any] = None):
         """Initialize query expander.
         
         Args:
             use_mock: Whether to use mock responses for testing
+            server: Optional ExpansionServer generating expansions; without
+                one queries are returned unchanged
         """
         self.use_mock = use_mock
+        self.server = server
         logger.info("Query expander initialized in %s mode", "mock" if use_mock else "normal")
     
+    @property
+    def can_expand(self) -> bool:
+        """Whether expand_query can return anything but the query itself."""
+        return self.use_mock or self.server is not None
+    
     async def expand_query(self, query: str) -> str:
         """Expand a query for better retrieval.
         
@@ -157,9 +170,12 @@ class QueryExpander:
             if self.use_mock:
                 return f"{query} (expanded mock)"
             
-            # TODO: Implement actual query expansion
-            # For now, just return the original query
-            return query
+            if self.server is None:
+                return query
+            
+            # Falls back to [query] if the server is busy past its timeout
+            expansions = await self.server.expand(query)
+            return " ".join(dict.fromkeys([query, *expansions]))
             
         except Exception as e:
             logger.error(f"Query expansion failed: {str(e)}")
@@ -175,12 +191,17 @@ class QueryExpander:
         Returns:
             List of expansion results
         """
+        # Expand concurrently so the server can batch the generations
+        expanded = await asyncio.gather(
+            *(self.expand_query(query) for query in queries),
+            return_exceptions=True
+        )
         results = []
-        for query in queries:
-            try:
-                expanded = await self.expand_query(query)
-                results.append(expanded)
-            except QueryExpansionError as e:
-                logger.warning(f"Failed to expand query '{query}': {e}")
+        for query, result in zip(queries, expanded):
+            if isinstance(result, QueryExpansionError):
+                logger.warning(f"Failed to expand query '{query}': {result}")
                 continue
+            if isinstance(result, BaseException):
+                raise result
+            results.append(result)
         return results 
\ No newline at end of file
@@ -1,14 +1,22 @@
 """Production-ready RAG system with OpenAI integration."""
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional, Tuple
 import asyncio
 import logging
+import time
 from datetime import datetime
 import faiss
 import numpy as np
 from openai import AsyncOpenAI
 from redis import asyncio as aioredis
 from .vector_store import VectorStore
+from .cache_manager import EmbeddingCache, QueryResultCache
+from .chunker import TextChunker
+from .preprocessing import get_preprocess_pool
+from .concurrency import ConcurrencyController
+from .context_builder import ContextBuilder
 from .query_expansion import QueryExpander, QueryExpansionError
+from .expansion_server import get_expansion_server
+from ..core.deadline import check_deadline, run_stage, stage_timeout
 from ..core.monitoring import monitor, RAGMonitor
 from ..core.performance import with_performance_monitoring, performance_section
 import os
@@ -34,9 +42,38 @@ MODEL_CONFIG = {
         "batch_size": int(os.getenv("BATCH_SIZE", "32")),
         "chunk_size": int(os.getenv("CHUNK_SIZE", "1000")),
         "chunk_overlap": int(os.getenv("CHUNK_OVERLAP", "200")),
+        "max_concurrent_requests": int(os.getenv("EMBED_CONCURRENCY", "4")),
     }
 }
 
+# Seconds from the start of a query that expanded retrieval may take
+# before the query returns with raw-query results only
+EXPANSION_DEADLINE = float(os.getenv("QUERY_EXPANSION_DEADLINE", "0.3"))
+# Questions embedded and searched together by a batch query; results of
+# one slice are returned before the next slice starts
+QUERY_BATCH_SIZE = int(os.getenv("QUERY_BATCH_SIZE", "64"))
+
+def _merge_results(
+    raw: List[Dict[str, Any]],
+    expanded: List[Dict[str, Any]],
+    k: Optional[int]
+) -> List[Dict[str, Any]]:
+    """Merge two result lists, keeping each chunk's best score."""
+    merged: Dict[Tuple[Any, str], Dict[str, Any]] = {}
+    for result in [*raw, *expanded]:
+        key = (result["document_id"], result["content"])
+        if key not in merged or result["score"] > merged[key]["score"]:
+            merged[key] = result
+    ranked = sorted(merged.values(), key=lambda x: x["score"], reverse=True)
+    return ranked[:k] if k else ranked
+
+def _document_id(document: Dict[str, Any]) -> Optional[str]:
+    """Stable id of a document (``id`` or ``metadata["id"]``), if it has one."""
+    doc_id = document.get("id")
+    if doc_id is None:
+        doc_id = (document.get("metadata") or {}).get("id")
+    return None if doc_id is None else str(doc_id)
+
 class RAGSystem:
     """Retrieval-augmented generation system."""
     
@@ -52,8 +89,23 @@ class RAGSystem:
         
         try:
             # Initialize components
-            self.query_expander = QueryExpander(use_mock=use_mock)
+            self.expansion_server = None if use_mock else get_expansion_server()
+            if self.expansion_server is not None:
+                # Load the model now rather than on the first query
+                self.expansion_server.start()
+            self.query_expander = QueryExpander(
+                use_mock=use_mock,
+                server=self.expansion_server
+            )
             self.vector_store = VectorStore(use_mock=use_mock)
+            self.chunker = TextChunker(
+                chunk_size=MODEL_CONFIG["embedding"]["chunk_size"],
+                chunk_overlap=MODEL_CONFIG["embedding"]["chunk_overlap"]
+            )
+            self.preprocess_pool = get_preprocess_pool()
+            self.result_cache = QueryResultCache()
+            self.embedding_cache = EmbeddingCache()
+            self.context_builder = ContextBuilder()
             self.monitor = RAGMonitor()
             
             if not use_mock:
@@ -79,10 +131,14 @@ class RAGSystem:
     ) -> bool:
         """Ingest text into the RAG system with efficient batch processing.
         
+        Text whose metadata carries an ``id`` is stored as a version of
+        that document through :meth:`upsert_document`, so ingesting it
+        again replaces the previous version instead of adding a copy.
+        
         Args:
             text: The text to ingest
             metadata: Optional metadata about the text
-            batch_size: Size of batches for processing
+            batch_size: Number of chunks to embed concurrently
             
         Returns:
             bool: True if ingestion was successful
@@ -98,71 +154,501 @@ class RAGSystem:
             if not text or not text.strip():
                 raise ValueError("Text cannot be empty")
                 
+            doc_id = _document_id({"metadata": metadata})
+            if doc_id is not None:
+                await self.upsert_document(doc_id, text, metadata)
+                return True
+                
             if batch_size is None:
                 batch_size = MODEL_CONFIG["embedding"]["batch_size"]
                 
-            # Split text into chunks for batch processing
+            # Decode, clean and chunk off the event loop. A worker process
+            # returns all chunk texts at once rather than a lazy stream; they
+            # take about as much memory as the document itself, while the
+            # much larger embeddings are still produced batch_size at a time
             with performance_section("split_text"):
-                chunks = self._split_text(text, batch_size)
-            
-            # Process chunks in parallel
-            tasks = []
-            for i, chunk in enumerate(chunks):
-                chunk_metadata = {
-                    **(metadata or {}),
-                    "chunk_index": i,
-                    "timestamp": datetime.now().isoformat()
-                }
-                tasks.append(self._process_chunk(chunk, chunk_metadata))
-                
-            # Wait for all chunks to be processed
-            with performance_section("process_chunks"):
-                results = await asyncio.gather(*tasks)
+                prepared = await self.preprocess_pool.prepare(
+                    text,
+                    chunk_size=self.chunker.chunk_size,
+                    chunk_overlap=self.chunker.chunk_overlap
+                )
+            
+            results = []
+            for start in range(0, len(prepared.chunks), batch_size):
+                # Process chunks in parallel
+                tasks = []
+                for index in range(start, min(start + batch_size, len(prepared.chunks))):
+                    chunk_metadata = {
+                        **(metadata or {}),
+                        "chunk_index": index,
+                        "chunk_hash": prepared.hashes[index],
+                        "timestamp": datetime.now().isoformat()
+                    }
+                    tasks.append(self._process_chunk(prepared.chunks[index], chunk_metadata))
+                    
+                # Wait for the batch to be processed
+                with performance_section("process_chunks"):
+                    results.extend(await asyncio.gather(*tasks))
                 
             return all(results)  # Return True only if all chunks succeeded
             
         except Exception as e:
             self.logger.error(f"Ingestion failed: {e}")
             raise
+
+    @with_performance_monitoring
+    async def ingest_documents(
+        self,
+        documents: List[Dict[str, Any]],
+        embed_batch_size: Optional[int] = None,
+        controller: Optional[ConcurrencyController] = None
+    ) -> List[bool]:
+        """Ingest several documents with chunks pooled across documents.
+        
+        Chunks from all documents are embedded in full-size requests and
+        indexed with one bulk insert, instead of one request per chunk.
+        A document succeeds only if all of its chunks were embedded and
+        indexed; documents never end up partially indexed. Documents with
+        an ``id`` (or ``metadata["id"]``) go through :meth:`upsert_document`
+        instead, so re-ingesting them only embeds changed chunks.
+        
+        Args:
+            documents: Documents with ``text`` and optional ``metadata``
+            embed_batch_size: Number of chunks per embedding request
+            controller: Optional controller limiting in-flight embedding
+                requests; it also receives their latency and errors
             
+        Returns:
+            Success flag for each document, in order
+        """
+        if self.use_mock:
+            return [True] * len(documents)
+            
+        if embed_batch_size is None:
+            embed_batch_size = MODEL_CONFIG["embedding"]["batch_size"]
+            
+        results = [isinstance(doc.get("text"), str) and bool(doc["text"].strip()) for doc in documents]
+        versioned = [i for i, ok in enumerate(results) if ok and _document_id(documents[i]) is not None]
+        valid = [i for i, ok in enumerate(results) if ok and _document_id(documents[i]) is None]
+        
+        # Decode, clean and chunk off the event loop
+        with performance_section("split_text"):
+            prepared = await self.preprocess_pool.prepare_many(
+                [documents[i]["text"] for i in valid],
+                chunk_size=self.chunker.chunk_size,
+                chunk_overlap=self.chunker.chunk_overlap
+            )
+            
+        # Flatten chunks, remembering which document each one belongs to
+        chunks: List[str] = []
+        chunk_metadata: List[Dict[str, Any]] = []
+        owners: List[int] = []
+        timestamp = datetime.now().isoformat()
+        for doc_index, doc_prepared in zip(valid, prepared):
+            base_metadata = documents[doc_index].get("metadata") or {}
+            for chunk_index, (chunk, chunk_hash) in enumerate(zip(doc_prepared.chunks, doc_prepared.hashes)):
+                chunks.append(chunk)
+                owners.append(doc_index)
+                chunk_metadata.append({
+                    **base_metadata,
+                    "chunk_index": chunk_index,
+                    "chunk_hash": chunk_hash,
+                    "timestamp": timestamp
+                })
+                
+        semaphore = asyncio.Semaphore(MODEL_CONFIG["embedding"]["max_concurrent_requests"])
+        
+        async def embed_batch(start: int) -> Optional[np.ndarray]:
+            try:
+                async with (controller.slot() if controller else semaphore):
+                    return await self.embed_texts(chunks[start:start + embed_batch_size])
+            except Exception as e:
+                self.logger.error(f"Embedding batch at chunk {start} failed: {e}")
+                return None
+                    
+        starts = list(range(0, len(chunks), embed_batch_size))
+        with performance_section("process_chunks"):
+            batches = await asyncio.gather(*(embed_batch(start) for start in starts))
+            
+        for start, embeddings in zip(starts, batches):
+            if embeddings is None:
+                for owner in owners[start:start + embed_batch_size]:
+                    results[owner] = False
+                    
+        # Index the chunks of every fully embedded document in one insert
+        keep: List[int] = []
+        parts: List[np.ndarray] = []
+        for start, embeddings in zip(starts, batches):
+            if embeddings is None:
+                continue
+            rows = [j - start for j in range(start, start + len(embeddings)) if results[owners[j]]]
+            if rows:
+                keep.extend(start + row for row in rows)
+                parts.append(embeddings[rows])
+                
+        if keep:
+            try:
+                indexed = await self.index_chunks(
+                    [chunks[j] for j in keep],
+                    np.concatenate(parts),
+                    [chunk_metadata[j] for j in keep]
+                )
+            except Exception as e:
+                self.logger.error(f"Bulk indexing failed: {e}")
+                indexed = False
+            if not indexed:
+                for j in keep:
+                    results[owners[j]] = False
+                    
+        # Versioned documents diff against their stored chunks
+        async def upsert(document: Dict[str, Any]) -> bool:
+            doc_id = _document_id(document)
+            try:
+                async with (controller.slot() if controller else semaphore):
+                    await self.upsert_document(doc_id, document["text"], document.get("metadata"))
+                return True
+            except Exception as e:
+                self.logger.error(f"Upsert of document {doc_id} failed: {e}")
+                return False
+                
+        upserted = await asyncio.gather(*(upsert(documents[i]) for i in versioned))
+        for index, ok in zip(versioned, upserted):
+            results[index] = ok
+        return results
+        
+    @with_performance_monitoring
+    async def upsert_document(
+        self,
+        doc_id: str,
+        text: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, int]:
+        """Ingest a new version of a document, re-embedding only changed chunks.
+
+        The text is re-chunked with the same settings as before and chunk
+        hashes are diffed against the stored version, so editing one
+        paragraph costs a single embedding call for the affected chunks.
+
+        Args:
+            doc_id: Stable document identifier
+            text: Full text of the new version
+            metadata: Optional metadata about the document
+
+        Returns:
+            Dict with the new version and added/unchanged/removed chunk counts
+
+        Raises:
+            ValueError: If text is empty or invalid
+        """
+        try:
+            # Mock ingestion for testing
+            if self.use_mock:
+                return {"version": 1, "added": 0, "unchanged": 0, "removed": 0}
+
+            if not text or not text.strip():
+                raise ValueError("Text cannot be empty")
+
+            with performance_section("split_text"):
+                prepared = await self.preprocess_pool.prepare(
+                    text,
+                    chunk_size=self.chunker.chunk_size,
+                    chunk_overlap=self.chunker.chunk_overlap
+                )
+
+            with performance_section("upsert_chunks"):
+                result = await self.vector_store.upsert_document(
+                    doc_id,
+                    list(prepared.chunks),
+                    list(prepared.hashes),
+                    self.embed_texts,
+                    {**(metadata or {}), "timestamp": datetime.now().isoformat()}
+                )
+
+            self.logger.info(
+                f"Document {doc_id} v{result['version']}: {result['added']} added, "
+                f"{result['unchanged']} unchanged, {result['removed']} removed"
+            )
+            return result
+
+        except Exception as e:
+            self.logger.error(f"Upsert of document {doc_id} failed: {e}")
+            raise
+
     @with_performance_monitoring
     async def query(
         self,
         question: str,
         max_results: Optional[int] = 3,
-        min_score: Optional[float] = 0.7
+        min_score: Optional[float] = 0.7,
+        filters: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Process a query and return relevant results."""
+        """Process a query and return relevant results.
+        
+        Retrieved context is cached per normalized question and search
+        options. Cached entries are only served while the vector store
+        generation is unchanged, so ingests and deletes invalidate them.
+        
+        Each stage respects the request deadline (see ``core.deadline``).
+        Expansion is skipped when it runs late; embedding or search past
+        the deadline raise ``DeadlineExceededError``.
+        
+        Args:
+            question: User question
+            max_results: Maximum number of context chunks
+            min_score: Minimum similarity score
+            filters: Optional metadata values context must match
+            
+        Returns:
+            Dict with the answer, retrieved context and the stages skipped
+            to meet the deadline
+        """
         try:
             # Mock response for testing
             if self.use_mock:
                 return {
                     "answer": "This is a mock response",
-                    "context": [{"text": "Mock context", "score": 1.0}]
+                    "context": [{"text": "Mock context", "score": 1.0}],
+                    "degraded": []
                 }
             
-            # Expand query
-            expanded = await self.query_expander.expand_query(question)
-            
-            # Search vector store
-            results = await self.vector_store.search(
-                expanded,
-                max_results=max_results,
-                min_score=min_score
+            start = time.perf_counter()
+            # Read before searching: an ingest that lands mid-query leaves
+            # this entry already stale instead of caching outdated context
+            generation = self.vector_store.generation
+            cache_key = self.result_cache.make_key(
+                question,
+                max_results,
+                min_score,
+                filters,
+                expanded=bool(self.query_expander.can_expand)
             )
+            cached = self.result_cache.get(cache_key, generation)
+            if cached is not None:
+                monitor.record_query(time.perf_counter() - start, cached=True)
+                return {
+                    "answer": "Generated answer based on context",
+                    "context": cached,
+                    "degraded": []
+                }
+            
+            check_deadline("query")
+            
+            # Start raw-query retrieval right away, with expansion and its
+            # retrieval running alongside it
+            search_kwargs = dict(k=max_results, min_score=min_score, filters=filters)
+            raw_task = asyncio.create_task(self._retrieve(question, **search_kwargs))
+            expanded_task = asyncio.create_task(self._retrieve_expanded(question, **search_kwargs))
+            try:
+                results = await raw_task
+            except BaseException:
+                expanded_task.cancel()
+                raise
+            
+            # Merge expanded results only if they arrive within the expansion
+            # deadline, capped by the request deadline; otherwise skip them
+            degraded = []
+            budget = max(0.0, EXPANSION_DEADLINE - (time.perf_counter() - start))
+            try:
+                expanded = await asyncio.wait_for(expanded_task, timeout=stage_timeout(budget))
+            except asyncio.TimeoutError:
+                degraded.append("expansion")
+                logger.debug("Expanded retrieval missed its deadline")
+            except Exception as e:
+                degraded.append("expansion")
+                logger.warning(f"Expanded retrieval failed, using raw-query results: {e}")
+            else:
+                if expanded:
+                    results = _merge_results(results, expanded, max_results)
+            
+            # Partial results are not cached, so a slow expansion only
+            # degrades this request
+            if not degraded:
+                self.result_cache.set(cache_key, generation, results)
             
             # Record metrics
-            monitor.record_query()
+            monitor.record_query(time.perf_counter() - start)
             
             return {
                 "answer": "Generated answer based on context",
-                "context": results
+                "context": list(results),
+                "degraded": degraded
             }
             
         except Exception as e:
             logger.error(f"Query processing failed: {str(e)}")
             raise
             
+    async def query_batch(
+        self,
+        questions: List[str],
+        max_results: Optional[int] = 3,
+        min_score: Optional[float] = 0.7,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Retrieve context for many questions, sharing embedding and search.
+        
+        Questions are processed in slices of ``QUERY_BATCH_SIZE``. Within a
+        slice, cached raw-query results are served, the remaining questions
+        are embedded in batched requests and searched with one multi-query
+        index search. Query expansion is skipped for batches, so their
+        results are cached apart from the expanded results of ``query``.
+        
+        Args:
+            questions: User questions
+            max_results: Maximum number of context chunks per question
+            min_score: Minimum similarity score
+            filters: Optional metadata values context must match
+            
+        Yields:
+            One dict per question, in order, with its index, the question
+            and its context, or an error if its slice failed
+        """
+        for offset in range(0, len(questions), QUERY_BATCH_SIZE):
+            batch = questions[offset:offset + QUERY_BATCH_SIZE]
+            try:
+                contexts = await self._retrieve_batch(batch, max_results, min_score, filters)
+            except Exception as e:
+                logger.error(f"Batch query at question {offset} failed: {e}")
+                for i, question in enumerate(batch):
+                    yield {"index": offset + i, "question": question, "error": str(e)}
+                continue
+                
+            for i, (question, context) in enumerate(zip(batch, contexts)):
+                yield {"index": offset + i, "question": question, "context": context}
+                
+    async def _retrieve_batch(
+        self,
+        questions: List[str],
+        max_results: Optional[int],
+        min_score: Optional[float],
+        filters: Optional[Dict[str, Any]]
+    ) -> List[List[Dict[str, Any]]]:
+        """Retrieve context for one slice of a batch query."""
+        if self.use_mock:
+            return [[{"text": "Mock context", "score": 1.0}] for _ in questions]
+            
+        start = time.perf_counter()
+        generation = self.vector_store.generation
+        contexts: List[Optional[List[Dict[str, Any]]]] = [None] * len(questions)
+        keys = [
+            self.result_cache.make_key(q, max_results, min_score, filters, expanded=False)
+            for q in questions
+        ]
+        pending = []
+        for i, key in enumerate(keys):
+            cached = self.result_cache.get(key, generation)
+            if cached is not None:
+                contexts[i] = cached
+            else:
+                pending.append(i)
+                
+        if pending:
+            check_deadline("query")
+            embeddings = await run_stage("embedding", self.embedding_cache.get_or_embed(
+                [questions[i] for i in pending],
+                MODEL_CONFIG["embedding"]["model"],
+                self._embed_query_batch
+            ))
+            check_deadline("search")
+            results = await self.vector_store.search_batch(
+                embeddings,
+                k=max_results,
+                min_score=min_score,
+                filters=filters
+            )
+            for i, result in zip(pending, results):
+                self.result_cache.set(keys[i], generation, result)
+                contexts[i] = list(result)
+                
+        elapsed = time.perf_counter() - start
+        searched = set(pending)
+        for i in range(len(questions)):
+            monitor.record_query(elapsed / len(questions), cached=i not in searched)
+        return contexts
+        
+    async def _embed_query_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed uncached batch questions in concurrent, size-limited requests."""
+        batch_size = MODEL_CONFIG["embedding"]["batch_size"]
+        semaphore = asyncio.Semaphore(MODEL_CONFIG["embedding"]["max_concurrent_requests"])
+        
+        async def embed_slice(start: int) -> np.ndarray:
+            async with semaphore:
+                return await self._get_embeddings(texts[start:start + batch_size])
+                
+        slices = await asyncio.gather(*(embed_slice(s) for s in range(0, len(texts), batch_size)))
+        return np.vstack(slices)
+        
+    async def stream_answer(
+        self,
+        question: str,
+        context: List[Dict[str, Any]]
+    ) -> AsyncIterator[str]:
+        """Generate an answer from retrieved context, yielding text deltas.
+        
+        The context is packed into the prompt token budget first, merging
+        adjacent chunks and dropping redundant ones.
+        
+        Args:
+            question: User question
+            context: Context returned by ``query``
+            
+        Yields:
+            Answer text as the completion model produces it
+        """
+        if self.use_mock:
+            for token in "This is a mock response".split(" "):
+                yield token + " "
+            return
+            
+        packed = await self.context_builder.build(context)
+        sources = packed.format_context()
+        config = MODEL_CONFIG["completion"]
+        stream = await self.client.chat.completions.create(
+            model=config["model"],
+            messages=[
+                {"role": "system", "content": "Answer the question using only the numbered context. "
+                                              "Cite sources by number."},
+                {"role": "user", "content": f"Context:\n{sources}\n\nQuestion: {question}"}
+            ],
+            max_tokens=config["max_tokens"],
+            temperature=config["temperature"],
+            top_p=config["top_p"],
+            presence_penalty=config["presence_penalty"],
+            frequency_penalty=config["frequency_penalty"],
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            
+    async def _retrieve(
+        self,
+        text: str,
+        k: Optional[int],
+        min_score: Optional[float],
+        filters: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Embed a query text and search the vector store with it."""
+        query_embedding = await run_stage("embedding", self.embed_query(text))
+        check_deadline("search")
+        return await self.vector_store.search(
+            query_embedding,
+            k=k,
+            min_score=min_score,
+            filters=filters
+        )
+        
+    async def _retrieve_expanded(
+        self,
+        question: str,
+        **search_kwargs: Any
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Expand a question and retrieve with it (None if unchanged)."""
+        expanded = await self.query_expander.expand_query(question)
+        if not expanded or expanded == question:
+            return None
+        return await self._retrieve(expanded, **search_kwargs)
+        
     async def _process_chunk(
         self,
         chunk: str,
@@ -179,21 +665,64 @@ class RAGSystem:
         """
         try:
             # Get embeddings
-            embeddings = await self._get_embeddings([chunk])
+            embeddings = await self.embed_texts([chunk])
             
             # Add to vector store
-            await self.vector_store.add_documents(
-                [chunk],
-                embeddings[0],
-                metadata
-            )
-            
-            return True
+            return await self.index_chunks([chunk], embeddings, [metadata])
             
         except Exception as e:
             self.logger.error(f"Chunk processing failed: {e}")
             return False
             
+    async def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Embed a batch of texts in a single request.
+        
+        Args:
+            texts: List of texts
+            
+        Returns:
+            Array of embeddings with one row per text
+        """
+        if self.use_mock:
+            return np.zeros((len(texts), self.vector_store.vector_dimension), dtype="float32")
+        return await self._get_embeddings(texts)
+        
+    async def embed_query(self, query: str) -> np.ndarray:
+        """Embed a query, reusing cached embeddings of the same normalized text.
+        
+        Args:
+            query: Query text
+            
+        Returns:
+            Query embedding
+        """
+        if self.use_mock:
+            return (await self.embed_texts([query]))[0]
+        embeddings = await self.embedding_cache.get_or_embed(
+            [query],
+            MODEL_CONFIG["embedding"]["model"],
+            self._get_embeddings
+        )
+        return embeddings[0]
+        
+    async def index_chunks(
+        self,
+        chunks: List[str],
+        embeddings: np.ndarray,
+        metadata: List[Dict[str, Any]]
+    ) -> bool:
+        """Add embedded chunks to the vector store in one bulk insert.
+        
+        Args:
+            chunks: Chunk texts
+            embeddings: Chunk embeddings with one row per chunk
+            metadata: Metadata for each chunk
+            
+        Returns:
+            bool: True if the chunks were indexed
+        """
+        return await self.vector_store.add_documents(chunks, embeddings, metadata)
+            
     async def _get_embeddings(
         self,
         texts: List[str],
@@ -226,34 +755,15 @@ class RAGSystem:
                 self.logger.warning(f"Embedding attempt {attempt + 1} failed: {e}")
                 await asyncio.sleep(1)  # Wait before retry
                 
-    def _split_text(self, text: str, chunk_size: int = 1000) -> List[str]:
-        """Split text into chunks.
+    def _split_text(self, text: str) -> Iterator[str]:
+        """Split text into token-bounded chunks.
+        
+        Uses the configured ``chunk_size`` and ``chunk_overlap`` (in tokens).
         
         Args:
             text: Text to split
-            chunk_size: Maximum chunk size
             
         Returns:
-            List of text chunks
+            Iterator over text chunks
         """
-        # Simple splitting by sentences for now
-        # TODO: Implement more sophisticated chunking
-        sentences = text.split(". ")
-        chunks = []
-        current_chunk = []
-        current_size = 0
-        
-        for sentence in sentences:
-            sentence_size = len(sentence.split())
-            if current_size + sentence_size > chunk_size:
-                chunks.append(". ".join(current_chunk) + ".")
-                current_chunk = [sentence]
-                current_size = sentence_size
-            else:
-                current_chunk.append(sentence)
-                current_size += sentence_size
-                
-        if current_chunk:
-            chunks.append(". ".join(current_chunk) + ".")
-            
-        return chunks 
\ No newline at end of file
+        return self.chunker.iter_chunks(text)
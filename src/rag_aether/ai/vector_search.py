@@ -5,7 +5,7 @@ import logging
 from dataclasses import dataclass, asdict
 from ..core.monitoring import monitor
 from ..core.performance import with_performance_monitoring, performance_section
-from ..ai.cache_manager import LRUCache
+from ..ai.cache_manager import EmbeddingCache, LRUCache
 from .vector_store import VectorStore
 import hashlib
 import asyncio
@@ -15,6 +15,8 @@ from .errors import DocumentProcessingError
 
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
 @dataclass
 class SearchResult:
     """Search result with metadata."""
@@ -150,6 +152,7 @@ class VectorStore:
         """
         self.use_mock = use_mock
         self.client = AsyncOpenAI()
+        self.embedding_cache = EmbeddingCache()
         self.documents = []
         self.index = None
         
@@ -200,8 +203,12 @@ class VectorStore:
             }]
             
         try:
-            # Get query embedding
-            embedding = await self._get_embeddings([query])
+            # Get query embedding, embedding only unseen queries
+            embedding = await self.embedding_cache.get_or_embed(
+                [query],
+                EMBEDDING_MODEL,
+                self._get_embeddings
+            )
             
             # Search index
             if self.index is None or len(self.documents) == 0:
@@ -236,7 +243,7 @@ class VectorStore:
         """
         try:
             response = await self.client.embeddings.create(
-                model="text-embedding-ada-002",
+                model=EMBEDDING_MODEL,
                 input=texts
             )
             return np.array([e.embedding for e in response.data])
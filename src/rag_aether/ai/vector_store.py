@@ -1,6 +1,6 @@
 """Vector store client for document storage and retrieval."""
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import Awaitable, Callable, List, Dict, Any, Optional, Set, Tuple
 import logging
 import faiss
 import numpy as np
@@ -18,6 +18,8 @@ load_dotenv()
 # Constants
 SIMILARITY_THRESHOLD = float(os.getenv("SIMILARITY_THRESHOLD", "0.7"))
 VECTOR_DIMENSION = int(os.getenv("VECTOR_DIMENSION", "1536"))  # For text-embedding-3-small
+# Compact once tombstoned chunks exceed this fraction of stored chunks (0 disables)
+COMPACT_RATIO = float(os.getenv("VECTOR_COMPACT_RATIO", "0.2"))
 
 class VectorStore:
     """Vector store for document embeddings."""
@@ -36,18 +38,29 @@ class VectorStore:
         self.ml_client = None if use_mock else MLClient()
         self.metadata = []
         
+        # Versioned documents: doc_id -> {"version": int, "chunks": {chunk_hash: index}}
+        self.doc_versions: Dict[str, Dict[str, Any]] = {}
+        # Indices of superseded chunks, skipped by search until compact()
+        self.tombstones: Set[int] = set()
+        self.compact_ratio = COMPACT_RATIO
+        self._version_lock = asyncio.Lock()
+        
+        # Bumped on every change to the indexed content; cached query
+        # results computed at an older generation are stale
+        self.generation = 0
+        
     async def add_documents(
         self,
         texts: List[str],
         embeddings: np.ndarray,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[List[Dict[str, Any]]] = None
     ) -> bool:
         """Add documents with pre-computed embeddings.
         
         Args:
             texts: List of document texts
             embeddings: Document embeddings
-            metadata: Optional metadata for the documents
+            metadata: Optional metadata for each document
             
         Returns:
             bool: True if successful
@@ -71,7 +84,7 @@ class VectorStore:
             
             # Store documents
             for i, text in enumerate(texts):
-                doc_metadata = metadata[i] if metadata else {}
+                doc_metadata = dict(metadata[i]) if metadata else {}
                 doc_metadata.update({
                     "document_id": str(uuid.uuid4()),
                     "timestamp": datetime.now(UTC).isoformat(),
@@ -80,6 +93,7 @@ class VectorStore:
                 self.documents.append(text)
                 self.metadata.append(doc_metadata)
                 
+            self.generation += 1
             return True
             
         except Exception as e:
@@ -131,6 +145,7 @@ class VectorStore:
                 })
                 self.documents.append(text)
                 self.metadata.append(doc_metadata)
+            self.generation += 1
             
             # Insert to Supabase
             try:
@@ -168,7 +183,8 @@ class VectorStore:
         self,
         query_embedding: np.ndarray,
         k: int = 5,
-        min_score: float = 0.0
+        min_score: float = 0.0,
+        filters: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """Search for similar documents.
         
@@ -176,19 +192,65 @@ class VectorStore:
             query_embedding: Query vector
             k: Number of results to return
             min_score: Minimum similarity score threshold
+            filters: Optional metadata values results must match exactly
             
         Returns:
             List of documents with similarity scores
         """
-        if not self.documents:
-            return []
+        results = await self.search_batch(
+            np.asarray(query_embedding).reshape(1, -1),
+            k=k,
+            min_score=min_score,
+            filters=filters
+        )
+        return results[0]
+        
+    async def search_batch(
+        self,
+        query_embeddings: np.ndarray,
+        k: int = 5,
+        min_score: float = 0.0,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Search for several queries with one multi-query index search.
+        
+        Args:
+            query_embeddings: Query vectors, one row per query
+            k: Number of results to return per query
+            min_score: Minimum similarity score threshold
+            filters: Optional metadata values results must match exactly
             
-        query_vector = query_embedding.reshape(1, -1)
-        distances, indices = self.index.search(query_vector, min(k, len(self.documents)))
+        Returns:
+            One list of documents with similarity scores per query
+        """
+        query_vectors = np.asarray(query_embeddings, dtype="float32").reshape(-1, self.vector_dimension)
+        if len(self.documents) <= len(self.tombstones):
+            return [[] for _ in range(len(query_vectors))]
+            
+        # Over-fetch so tombstoned chunks do not eat into the top k; with
+        # filters rank everything, which a flat index scans anyway
+        fetch_k = len(self.documents) if filters else min(k + len(self.tombstones), len(self.documents))
+        distances, indices = self.index.search(query_vectors, fetch_k)
+        
+        return [
+            self._collect(row_distances, row_indices, k, min_score, filters)
+            for row_distances, row_indices in zip(distances, indices)
+        ]
         
+    def _collect(
+        self,
+        distances: np.ndarray,
+        indices: np.ndarray,
+        k: int,
+        min_score: float,
+        filters: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Turn one query's raw hits into the top-k live, matching results."""
         results = []
-        for distance, idx in zip(distances[0], indices[0]):
-            if idx != -1:  # Valid index
+        for distance, idx in zip(distances, indices):
+            if idx != -1 and idx not in self.tombstones:  # Valid, live index
+                if filters and any(self.metadata[idx].get(key) != value for key, value in filters.items()):
+                    continue
                 score = float(1.0 / (1.0 + distance))  # Convert distance to similarity score
                 if score >= min_score:
                     result = {
@@ -199,7 +261,190 @@ class VectorStore:
                     }
                     results.append(result)
                     
-        return sorted(results, key=lambda x: x["score"], reverse=True)
+        return sorted(results, key=lambda x: x["score"], reverse=True)[:k]
+        
+    def get_document_version(self, doc_id: str) -> int:
+        """Get the stored version of a document (0 if unknown)."""
+        return self.doc_versions.get(doc_id, {}).get("version", 0)
+        
+    async def upsert_document(
+        self,
+        doc_id: str,
+        chunks: List[str],
+        chunk_hashes: List[str],
+        embed: Callable[[List[str]], Awaitable[np.ndarray]],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, int]:
+        """Store a new version of a document, embedding only changed chunks.
+        
+        Chunk hashes are diffed against the stored version: unchanged chunks
+        keep their vectors, new chunks are embedded in a single ``embed``
+        call, and chunks that disappeared are tombstoned.
+        
+        The version lock is not held while embedding. The diff is taken
+        under the lock, the new chunks are embedded outside it, and the
+        lock is taken again to apply the version; if another upsert of the
+        document landed in between, the diff is redone and only chunks not
+        embedded yet are sent to ``embed``.
+        
+        Args:
+            doc_id: Stable document identifier
+            chunks: Chunk texts of the new version, in order
+            chunk_hashes: Content hash of each chunk
+            embed: Coroutine embedding a list of texts
+            metadata: Optional metadata applied to every chunk
+            
+        Returns:
+            Dict with the new version and added/unchanged/removed counts
+            
+        Raises:
+            ValueError: If chunks and hashes do not line up
+            RuntimeError: If the new chunks could not be indexed
+        """
+        if len(chunks) != len(chunk_hashes):
+            raise ValueError("Number of chunks must match number of chunk hashes")
+            
+        # First occurrence of each hash
+        positions: Dict[str, int] = {}
+        for position, chunk_hash in enumerate(chunk_hashes):
+            positions.setdefault(chunk_hash, position)
+            
+        embedded: Dict[str, np.ndarray] = {}
+        while True:
+            async with self._version_lock:
+                previous = self.doc_versions.get(doc_id, {"version": 0, "chunks": {}})
+                new_hashes = [h for h in positions if h not in previous["chunks"]]
+                missing = [h for h in new_hashes if h not in embedded]
+                if not missing:
+                    version, current, removed = await self._apply_version(
+                        doc_id, previous, positions, new_hashes, chunks, embedded, metadata
+                    )
+                    break
+                    
+            vectors = await embed([chunks[positions[h]] for h in missing])
+            embedded.update(zip(missing, vectors))
+            
+        if removed:
+            await self._maybe_compact()
+        return {
+            "version": version,
+            "added": len(new_hashes),
+            "unchanged": len(current) - len(new_hashes),
+            "removed": len(removed)
+        }
+        
+    async def _apply_version(
+        self,
+        doc_id: str,
+        previous: Dict[str, Any],
+        positions: Dict[str, int],
+        new_hashes: List[str],
+        chunks: List[str],
+        embedded: Dict[str, np.ndarray],
+        metadata: Optional[Dict[str, Any]]
+    ) -> Tuple[int, Dict[str, int], List[int]]:
+        """Index new chunks and record a document version; caller holds the lock.
+        
+        Returns:
+            Tuple of (new version, chunk hash -> index, tombstoned indices)
+        """
+        version = previous["version"] + 1
+        current: Dict[str, int] = {}
+        if new_hashes:
+            start = len(self.documents)
+            added = await self.add_documents(
+                [chunks[positions[h]] for h in new_hashes],
+                np.vstack([embedded[h] for h in new_hashes]),
+                [
+                    {
+                        **(metadata or {}),
+                        "doc_id": doc_id,
+                        "version": version,
+                        "chunk_index": positions[h],
+                        "chunk_hash": h
+                    }
+                    for h in new_hashes
+                ]
+            )
+            if not added:
+                raise RuntimeError(f"Failed to index chunks for document {doc_id}")
+            for offset, chunk_hash in enumerate(new_hashes):
+                current[chunk_hash] = start + offset
+                
+        # Unchanged chunks are only touched once the new ones are indexed
+        for chunk_hash, position in positions.items():
+            index = previous["chunks"].get(chunk_hash)
+            if index is not None:
+                self.metadata[index].update({"chunk_index": position, "version": version})
+                current[chunk_hash] = index
+                
+        removed = [
+            index for chunk_hash, index in previous["chunks"].items()
+            if chunk_hash not in current
+        ]
+        self.tombstones.update(removed)
+        self.doc_versions[doc_id] = {"version": version, "chunks": current}
+        if removed:
+            self.generation += 1
+        return version, current, removed
+        
+    async def delete_document(self, doc_id: str) -> int:
+        """Tombstone every chunk of a versioned document.
+        
+        Args:
+            doc_id: Document identifier
+            
+        Returns:
+            Number of chunks removed
+        """
+        async with self._version_lock:
+            previous = self.doc_versions.pop(doc_id, None)
+            if not previous:
+                return 0
+            self.tombstones.update(previous["chunks"].values())
+            self.generation += 1
+            
+        await self._maybe_compact()
+        return len(previous["chunks"])
+        
+    async def _maybe_compact(self) -> None:
+        """Compact once tombstones exceed compact_ratio of stored chunks.
+        
+        Tombstoned vectors still sit in the flat index and widen every
+        search's over-fetch, so they are not left to pile up.
+        """
+        if self.compact_ratio > 0 and len(self.tombstones) > self.compact_ratio * len(self.documents):
+            await self.compact()
+            
+    async def compact(self) -> int:
+        """Drop tombstoned chunks and rebuild the index.
+        
+        Returns:
+            Number of chunks dropped
+        """
+        async with self._version_lock:
+            if not self.tombstones:
+                return 0
+                
+            keep = [i for i in range(len(self.documents)) if i not in self.tombstones]
+            remap = {old: new for new, old in enumerate(keep)}
+            vectors = self.index.reconstruct_n(0, self.index.ntotal)
+            
+            index = faiss.IndexFlatL2(self.vector_dimension)
+            if keep:
+                index.add(vectors[keep])
+            self.index = index
+            self.documents = [self.documents[i] for i in keep]
+            self.metadata = [self.metadata[i] for i in keep]
+            for new, doc_metadata in enumerate(self.metadata):
+                doc_metadata["index"] = new
+            for entry in self.doc_versions.values():
+                entry["chunks"] = {h: remap[i] for h, i in entry["chunks"].items()}
+                
+            dropped = len(self.tombstones)
+            self.tombstones.clear()
+            self.generation += 1
+            return dropped
             
     async def delete_texts(
         self,
@@ -212,6 +457,7 @@ class VectorStore:
         """
         try:
             self.supabase.table('embeddings').delete().in_('id', doc_ids).execute()
+            self.generation += 1
         except Exception as e:
             logger.error(f"Failed to delete documents: {e}")
             raise 
\ No newline at end of file
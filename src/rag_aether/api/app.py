@@ -7,6 +7,7 @@ from pydantic import BaseModel, Field
 from ..ai.vector_store import VectorStore
 from ..ai.ml_client import MLClient
 from ..ai.integration_system import IntegrationSystem
+from ..core.deadline import MESSAGE_TIMEOUT, request_deadline
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -102,13 +103,14 @@ class ConnectionManager:
             )
 
             # Process message through integration system
-            result = await self.integration_system.process_message(
-                user_id=user_id,
-                message=data["content"],
-                conversation_history=data.get("conversation_history", []),
-                metadata_filter=data.get("metadata_filter"),
-                max_tokens=data.get("max_tokens")
-            )
+            with request_deadline(data.get("timeout") or MESSAGE_TIMEOUT):
+                result = await self.integration_system.process_message(
+                    user_id=user_id,
+                    message=data["content"],
+                    conversation_history=data.get("conversation_history", []),
+                    metadata_filter=data.get("metadata_filter"),
+                    max_tokens=data.get("max_tokens")
+                )
 
             # Send response
             await self.broadcast_to_user(
@@ -118,6 +120,7 @@ class ConnectionManager:
                         "response": result["response"],
                         "is_user_available": result["is_user_available"],
                         "relevant_documents": result["relevant_documents"],
+                        "degraded": result["degraded"],
                         "conversation_id": data.get("conversation_id")
                     }
                 },
@@ -327,13 +330,14 @@ async def process_message(
 ) -> Dict[str, Any]:
     """Process a message using the integration system."""
     try:
-        return await integration.process_message(
-            user_id=user_id,
-            message=message,
-            conversation_history=conversation_history,
-            metadata_filter=metadata_filter,
-            max_tokens=max_tokens
-        )
+        with request_deadline(MESSAGE_TIMEOUT):
+            return await integration.process_message(
+                user_id=user_id,
+                message=message,
+                conversation_history=conversation_history,
+                metadata_filter=metadata_filter,
+                max_tokens=max_tokens
+            )
     except Exception as e:
         logger.error(f"Failed to process message: {e}")
         raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
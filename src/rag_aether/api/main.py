@@ -1,18 +1,29 @@
 """RAG Aether API."""
-from fastapi import FastAPI, HTTPException, Depends, status
-from pydantic import BaseModel, Field, field_validator
-from typing import Dict, Any, List, Optional
+from fastapi import FastAPI, HTTPException, Depends, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from typing import Dict, Any, AsyncIterator, List, Optional
 import os
+import json
 import logging
+import tempfile
+import time
 
 from ..ai.rag_system import RAGSystem
+from ..ai.ingest_jobs import IngestJobManager, NDJSONFile
 from ..ai.errors import QueryProcessingError, DocumentProcessingError
+from ..core.deadline import REQUEST_TIMEOUT, request_deadline
+from ..core.errors import DeadlineExceededError
 from ..core.monitoring import monitor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Largest number of questions accepted by one batch query
+MAX_BATCH_QUESTIONS = int(os.getenv("MAX_BATCH_QUESTIONS", "256"))
+
 app = FastAPI(
     title="RAG Aether API",
     description="API for retrieval-augmented generation with efficient batch processing",
@@ -22,6 +33,9 @@ app = FastAPI(
 # Global RAG system instance
 rag_system: Optional[RAGSystem] = None
 
+# Global ingestion job manager
+job_manager: Optional[IngestJobManager] = None
+
 class Document(BaseModel):
     """Document model for ingestion."""
     text: str = Field(..., description="Text content to ingest")
@@ -39,6 +53,7 @@ class Query(BaseModel):
     question: str = Field(..., description="Question to ask")
     max_results: Optional[int] = Field(3, description="Maximum number of results to return")
     min_score: Optional[float] = Field(0.7, description="Minimum similarity score threshold")
+    timeout: Optional[float] = Field(None, gt=0, description="Request deadline in seconds")
 
     @field_validator("question")
     def question_must_not_be_empty(cls, v):
@@ -47,6 +62,24 @@ class Query(BaseModel):
             raise ValueError("Question must not be empty")
         return v
 
+class BatchQuery(BaseModel):
+    """Batch query model."""
+    questions: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_QUESTIONS,
+        description="Questions to retrieve context for"
+    )
+    max_results: Optional[int] = Field(3, description="Maximum number of results per question")
+    min_score: Optional[float] = Field(0.7, description="Minimum similarity score threshold")
+
+    @field_validator("questions")
+    def questions_must_not_be_empty(cls, v):
+        """Validate batch questions."""
+        if any(not question.strip() for question in v):
+            raise ValueError("Questions must not be empty")
+        return v
+
 class HealthResponse(BaseModel):
     """Health check response model."""
     status: str = Field(..., description="Overall system status: healthy, degraded, or error")
@@ -61,6 +94,7 @@ class QueryResponse(BaseModel):
     answer: str = Field(..., description="Generated answer")
     context: List[Dict[str, Any]] = Field(..., description="Retrieved context snippets")
     metrics: Dict[str, Any] = Field(..., description="Query performance metrics")
+    degraded: List[str] = Field(default_factory=list, description="Stages skipped to meet the deadline")
 
 class IngestResponse(BaseModel):
     """Ingest response model."""
@@ -68,6 +102,20 @@ class IngestResponse(BaseModel):
     metrics: Dict[str, Any] = Field(..., description="Ingestion performance metrics")
     document_id: Optional[str] = Field(None, description="ID of ingested document")
 
+class IngestJobRequest(BaseModel):
+    """Bulk ingestion job request model."""
+    documents: List[Document] = Field(..., min_length=1, description="Documents to ingest")
+
+class IngestJobResponse(BaseModel):
+    """Ingestion job status response model."""
+    job_id: str = Field(..., description="Job identifier")
+    status: str = Field(..., description="queued, running, completed or failed")
+    created_at: float = Field(..., description="Job creation time (epoch seconds)")
+    started_at: Optional[float] = Field(None, description="Job start time (epoch seconds)")
+    finished_at: Optional[float] = Field(None, description="Job finish time (epoch seconds)")
+    stats: Optional[Dict[str, Any]] = Field(None, description="Batch processing statistics")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+
 def get_rag_system() -> RAGSystem:
     """Get or initialize RAG system."""
     global rag_system
@@ -132,15 +180,23 @@ async def query(query: Query):
     """Query endpoint."""
     try:
         system = get_rag_system()
-        result = await system.query(
-            question=query.question,
-            max_results=query.max_results,
-            min_score=query.min_score
-        )
+        with request_deadline(query.timeout or REQUEST_TIMEOUT):
+            result = await system.query(
+                question=query.question,
+                max_results=query.max_results,
+                min_score=query.min_score
+            )
         return QueryResponse(
             answer=result["answer"],
             context=result["context"],
-            metrics=monitor.get_metrics()
+            metrics=monitor.get_metrics(),
+            degraded=result.get("degraded", [])
+        )
+    except DeadlineExceededError as e:
+        logger.warning(f"Query deadline exceeded: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail={"error": str(e), "stage": e.stage}
         )
     except QueryProcessingError as e:
         logger.warning(f"Query processing error: {str(e)}")
@@ -155,9 +211,124 @@ async def query(query: Query):
             detail={"error": str(e), "metrics": monitor.get_metrics()}
         )
 
+def _sse(event: str, data: Any) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def _stream_query(system: RAGSystem, query: Query) -> AsyncIterator[str]:
+    """Yield context, answer deltas and final metrics as SSE events."""
+    start = time.perf_counter()
+    try:
+        with request_deadline(query.timeout or REQUEST_TIMEOUT):
+            result = await system.query(
+                question=query.question,
+                max_results=query.max_results,
+                min_score=query.min_score
+            )
+        retrieval_time = time.perf_counter() - start
+        yield _sse("context", {"context": result["context"], "degraded": result.get("degraded", [])})
+        
+        deltas = 0
+        async for delta in system.stream_answer(query.question, result["context"]):
+            deltas += 1
+            yield _sse("token", {"delta": delta})
+            
+        yield _sse("done", {
+            "retrieval_time": retrieval_time,
+            "total_time": time.perf_counter() - start,
+            "deltas": deltas,
+            "metrics": monitor.get_metrics()
+        })
+    except DeadlineExceededError as e:
+        logger.warning(f"Streaming query deadline exceeded: {str(e)}")
+        yield _sse("error", {"error": str(e), "stage": e.stage, "status": status.HTTP_504_GATEWAY_TIMEOUT})
+    except QueryProcessingError as e:
+        logger.warning(f"Query processing error: {str(e)}")
+        yield _sse("error", {"error": str(e), "status": status.HTTP_400_BAD_REQUEST})
+    except Exception as e:
+        logger.error(f"Streaming query error: {str(e)}")
+        yield _sse("error", {"error": str(e), "status": status.HTTP_500_INTERNAL_SERVER_ERROR})
+
+def _query_stream_response(query: Query) -> StreamingResponse:
+    """Start an SSE response for a query."""
+    system = get_rag_system()
+    return StreamingResponse(
+        _stream_query(system, query),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop reverse proxies from buffering the stream
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+@app.post("/query/stream")
+async def query_stream(query: Query):
+    """Stream a query as Server-Sent Events.
+    
+    Emits a ``context`` event as soon as retrieval finishes, ``token``
+    events with answer deltas, then a ``done`` event with metrics. Errors
+    after the stream starts are sent as an ``error`` event.
+    """
+    return _query_stream_response(query)
+
+@app.get("/query/stream")
+async def query_stream_get(
+    question: str,
+    max_results: Optional[int] = 3,
+    min_score: Optional[float] = 0.7,
+    timeout: Optional[float] = None
+):
+    """Stream a query as Server-Sent Events (for ``EventSource`` clients)."""
+    try:
+        query = Query(question=question, max_results=max_results, min_score=min_score, timeout=timeout)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"error": str(e)}
+        )
+    return _query_stream_response(query)
+
+async def _stream_batch(system: RAGSystem, query: BatchQuery) -> AsyncIterator[str]:
+    """Yield one JSON line per question, then a summary line."""
+    start = time.perf_counter()
+    failed = 0
+    try:
+        async for result in system.query_batch(
+            query.questions,
+            max_results=query.max_results,
+            min_score=query.min_score
+        ):
+            failed += "error" in result
+            yield json.dumps(result, default=str) + "\n"
+        yield json.dumps({
+            "done": True,
+            "questions": len(query.questions),
+            "failed": failed,
+            "total_time": time.perf_counter() - start
+        }) + "\n"
+    except Exception as e:
+        logger.error(f"Batch query error: {str(e)}")
+        yield json.dumps({"error": str(e), "status": status.HTTP_500_INTERNAL_SERVER_ERROR}) + "\n"
+
+@app.post("/query/batch")
+async def query_batch(query: BatchQuery):
+    """Retrieve context for many questions as newline-delimited JSON.
+    
+    Questions share batched embedding requests and multi-query index
+    searches. Each line holds ``index``, ``question`` and ``context`` (or
+    ``error``), in question order; the last line summarizes the batch.
+    """
+    system = get_rag_system()
+    return StreamingResponse(_stream_batch(system, query), media_type="application/x-ndjson")
+
 @app.post("/ingest", response_model=IngestResponse)
 async def ingest(document: Document):
-    """Document ingestion endpoint."""
+    """Document ingestion endpoint.
+    
+    A document whose metadata has an ``id`` replaces the stored version of
+    that document; only its changed chunks are embedded.
+    """
     try:
         system = get_rag_system()
         success = await system.ingest_text(
@@ -180,4 +351,82 @@ async def ingest(document: Document):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={"error": str(e), "metrics": monitor.get_metrics()}
-        ) 
\ No newline at end of file
+        ) 
+
+def get_job_manager() -> IngestJobManager:
+    """Get or initialize the ingestion job manager."""
+    global job_manager
+    if job_manager is None:
+        job_manager = IngestJobManager(
+            get_rag_system(),
+            journal_path=os.getenv("INGEST_JOURNAL_PATH")
+        )
+    return job_manager
+
+async def _spool_body(request: Request) -> NDJSONFile:
+    """Write a request body to a temporary file without blocking the loop."""
+    spool = await run_in_threadpool(tempfile.NamedTemporaryFile, "wb", suffix=".ndjson", delete=False)
+    documents = NDJSONFile(spool.name)
+    try:
+        async for chunk in request.stream():
+            await run_in_threadpool(spool.write, chunk)
+    except BaseException:
+        spool.close()
+        documents.close()
+        raise
+    await run_in_threadpool(spool.close)
+    return documents
+
+@app.post("/ingest/jobs", response_model=IngestJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_ingest_job(request: Request, job_id: Optional[str] = None):
+    """Start a background ingestion job.
+    
+    Accepts either a JSON body with a ``documents`` list or an NDJSON body
+    (``application/x-ndjson``) with one document per line. NDJSON bodies are
+    spooled to a temporary file and streamed into the job, so large uploads
+    never need to fit in memory. Returns as soon as the job is queued.
+    
+    Passing the ``job_id`` of an interrupted job resubmits it; with a
+    journal configured, documents it already indexed are skipped.
+    """
+    manager = get_job_manager()
+    content_type = request.headers.get("content-type", "")
+    if job_id is not None and manager.is_active(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"error": f"Job {job_id} is already running"}
+        )
+    
+    if "ndjson" in content_type:
+        documents = await _spool_body(request)
+    else:
+        try:
+            body = IngestJobRequest.model_validate(await request.json())
+        except (ValidationError, ValueError) as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={"error": str(e)}
+            )
+        documents = [doc.model_dump() for doc in body.documents]
+        
+    try:
+        job = manager.submit(documents, job_id=job_id)
+    except ValueError as e:
+        if isinstance(documents, NDJSONFile):
+            documents.close()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"error": str(e)}
+        )
+    return IngestJobResponse(**job.to_dict())
+
+@app.get("/ingest/jobs/{job_id}", response_model=IngestJobResponse)
+async def get_ingest_job(job_id: str):
+    """Get progress of an ingestion job."""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": f"Job {job_id} not found"}
+        )
+    return IngestJobResponse(**job.to_dict())
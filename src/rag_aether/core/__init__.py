@@ -2,10 +2,11 @@
 
 
 """
-from .errors import QueryProcessingError, QueryExpansionError, DocumentProcessingError, VectorStoreError, MonitoringError
+from .errors import QueryProcessingError, QueryExpansionError, DocumentProcessingError, VectorStoreError, MonitoringError, DeadlineExceededError
 from .monitoring import RAGMonitor, monitor
 from .performance import with_performance_monitoring, performance_section
 from .backup import BackupConfig, BackupManager
+from .deadline import request_deadline, remaining, run_stage
 
 __all__ = [
     'QueryProcessingError',
@@ -13,10 +14,14 @@ __all__ = [
     'DocumentProcessingError',
     'VectorStoreError',
     'MonitoringError',
+    'DeadlineExceededError',
     'RAGMonitor',
     'monitor',
     'with_performance_monitoring',
     'performance_section',
     'BackupConfig',
-    'BackupManager'
+    'BackupManager',
+    'request_deadline',
+    'remaining',
+    'run_stage'
 ] 
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""Request-scoped deadlines for the query path."""
+from contextvars import ContextVar
+from contextlib import contextmanager
+from typing import Awaitable, Iterator, Optional, TypeVar
+import asyncio
+import logging
+import os
+import time
+from dotenv import load_dotenv
+
+from .errors import DeadlineExceededError
+from .monitoring import monitor
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Constants
+# Default seconds a query may take end to end
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "2.0"))
+# Default seconds a chat message may take, including completion
+MESSAGE_TIMEOUT = float(os.getenv("MESSAGE_TIMEOUT", "15.0"))
+
+T = TypeVar("T")
+
+# Absolute deadline (time.monotonic()) of the current request, if any
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+@contextmanager
+def request_deadline(timeout: Optional[float] = REQUEST_TIMEOUT) -> Iterator[float]:
+    """Set the deadline for the code running in this context.
+
+    Tasks created inside the block inherit the deadline. A nested deadline
+    can only shorten the one already set, never extend it.
+
+    Args:
+        timeout: Seconds from now (None for no deadline)
+
+    Yields:
+        The absolute deadline in ``time.monotonic()`` seconds
+    """
+    current = _deadline.get()
+    deadline = current if timeout is None else time.monotonic() + timeout
+    if current is not None:
+        deadline = min(current, deadline)
+
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+def remaining() -> Optional[float]:
+    """Seconds left before the deadline (None if no deadline is set)."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+def stage_timeout(budget: Optional[float] = None) -> Optional[float]:
+    """Timeout for one stage: its own budget capped by the request deadline.
+
+    Args:
+        budget: Optional seconds the stage may take on its own
+
+    Returns:
+        Seconds the stage may take (None if unbounded)
+    """
+    left = remaining()
+    if budget is None:
+        return left
+    return budget if left is None else min(budget, left)
+
+def check_deadline(stage: str) -> None:
+    """Raise if the request deadline has already passed.
+
+    Raises:
+        DeadlineExceededError: If no time is left
+    """
+    if remaining() == 0.0:
+        monitor.record_error(f"deadline_{stage}")
+        raise DeadlineExceededError(stage)
+
+async def run_stage(stage: str, awaitable: Awaitable[T], budget: Optional[float] = None) -> T:
+    """Await one stage of a request within its timeout.
+
+    Callers apply the stage's degradation policy by catching the error.
+
+    Args:
+        stage: Stage name used in errors and metrics
+        awaitable: Coroutine or task running the stage
+        budget: Optional seconds the stage may take on its own
+
+    Returns:
+        The stage's result
+
+    Raises:
+        DeadlineExceededError: If the stage did not finish in time; the
+            stage is cancelled
+    """
+    timeout = stage_timeout(budget)
+    try:
+        if timeout is None:
+            return await awaitable
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        monitor.record_error(f"deadline_{stage}")
+        logger.debug(f"Stage {stage} missed its deadline ({timeout:.3f}s)")
+        raise DeadlineExceededError(stage)
@@ -30,4 +30,11 @@ class MonitoringError(RAGError):
 
 class MLClientError(RAGError):
     """Raised when ML client operations fail."""
-    pass 
\ No newline at end of file
+    pass 
+
+class DeadlineExceededError(RAGError):
+    """Raised when a request stage runs past the request deadline."""
+    
+    def __init__(self, stage: str):
+        self.stage = stage
+        super().__init__(f"Deadline exceeded during {stage}")
@@ -40,10 +40,12 @@ class RAGMonitor:
         self._queries = 0
         self._latency = 0
         self._cache_hits = 0
+        self._cache_lookups: Dict[str, Dict[str, int]] = {}
         self._system_ready = False
         self._doc_count = 0
         self._batch_count = 0
         self._error_count = 0
+        self._ingest_controller: Dict[str, Any] = {}
         
         if self.use_monitoring and not self.use_mock:
             try:
@@ -112,6 +114,29 @@ class RAGMonitor:
                     registry=self.registry
                 )
                 
+                # Ingestion concurrency controller metrics
+                self.ingest_concurrency = Gauge(
+                    "rag_ingest_concurrency_limit",
+                    "In-flight embedding request limit chosen by the controller",
+                    registry=self.registry
+                )
+                self.ingest_batch_size = Gauge(
+                    "rag_ingest_batch_size",
+                    "Ingestion batch size chosen by the controller",
+                    registry=self.registry
+                )
+                self.ingest_p95_latency = Gauge(
+                    "rag_ingest_request_p95_seconds",
+                    "p95 embedding request latency seen by the controller",
+                    registry=self.registry
+                )
+                self.ingest_decisions = Counter(
+                    "rag_ingest_controller_decisions_total",
+                    "Concurrency controller decisions",
+                    ["action", "reason"],
+                    registry=self.registry
+                )
+                
                 # System metrics
                 self.cpu_usage = Gauge(
                     "rag_cpu_usage_percent",
@@ -193,6 +218,16 @@ class RAGMonitor:
             except Exception as e:
                 logger.warning(f"Failed to record query metrics: {str(e)}")
     
+    def record_cache_hit(self, cache_type: str):
+        """Record a hit in an internal cache (e.g. ``lru`` or ``redis``)."""
+        lookups = self._cache_lookups.setdefault(cache_type, {"hits": 0, "misses": 0})
+        lookups["hits"] += 1
+    
+    def record_cache_miss(self, cache_type: str = "lru"):
+        """Record a miss in an internal cache."""
+        lookups = self._cache_lookups.setdefault(cache_type, {"hits": 0, "misses": 0})
+        lookups["misses"] += 1
+    
     def record_error(self, error_type: str):
         """Record system error."""
         self._error_count += 1
@@ -212,6 +247,22 @@ class RAGMonitor:
             except Exception as e:
                 logger.warning(f"Failed to record error: {str(e)}")
     
+    def record_concurrency_decision(self, decision: Dict[str, Any]):
+        """Record an ingestion concurrency controller decision."""
+        self._ingest_controller = dict(decision)
+        
+        if self.use_monitoring and not self.use_mock:
+            try:
+                self.ingest_concurrency.set(decision["concurrency"])
+                self.ingest_batch_size.set(decision["batch_size"])
+                self.ingest_p95_latency.set(decision["p95_latency"])
+                self.ingest_decisions.labels(
+                    action=decision["action"],
+                    reason=decision["reason"]
+                ).inc()
+            except Exception as e:
+                logger.warning(f"Failed to record concurrency decision: {str(e)}")
+    
     def update_cache_metrics(self, size_bytes: int, hit_ratio: float):
         """Update cache metrics."""
         if self.use_monitoring and not self.use_mock:
@@ -269,10 +320,12 @@ class RAGMonitor:
             "queries": self._queries,
             "latency": self._latency,
             "cache_hits": self._cache_hits,
+            "cache_lookups": {name: dict(counts) for name, counts in self._cache_lookups.items()},
             "system_ready": self._system_ready,
             "documents": self._doc_count,
             "batches": self._batch_count,
-            "errors": self._error_count
+            "errors": self._error_count,
+            "ingest_controller": self._ingest_controller
         }
         
         if self.use_monitoring and not self.use_mock:
@@ -0,0 +1,13 @@
+"""Shared setup for backend unit tests."""
+import sys
+import types
+from pathlib import Path
+
+# The root-level rag_aether/ retrieval package is shadowed on sys.path by
+# the src/rag_aether package, so its tests import it as rag_aether_root
+ROOT_PACKAGE = Path(__file__).resolve().parents[3] / "rag_aether"
+
+if "rag_aether_root" not in sys.modules:
+    package = types.ModuleType("rag_aether_root")
+    package.__path__ = [str(ROOT_PACKAGE)]
+    sys.modules["rag_aether_root"] = package
@@ -6,6 +6,7 @@ from typing import List, Dict, Any
 
 from src.rag_aether.ai.batch_processor import BatchProcessor, BatchStats
 from src.rag_aether.ai.rag_system import RAGSystem
+from src.rag_aether.ai.journal import IngestionJournal
 
 @pytest.fixture
 def mock_rag_system():
@@ -14,6 +15,15 @@ def mock_rag_system():
         await asyncio.sleep(0.001)  # Simulate processing time
         return True
     rag.ingest_text = mock_ingest_text
+
+    # Pooled ingestion delegates to ingest_text so tests can swap it out
+    async def mock_ingest_documents(documents: List[Dict[str, Any]], **kwargs):
+        results = await asyncio.gather(
+            *(rag.ingest_text(doc["text"], doc.get("metadata", {})) for doc in documents),
+            return_exceptions=True
+        )
+        return [not isinstance(r, Exception) for r in results]
+    rag.ingest_documents = mock_ingest_documents
     return rag
 
 @pytest.fixture
@@ -90,6 +100,32 @@ async def test_streaming_processing(batch_processor):
     assert stats.failed_docs == 0
     assert stats.docs_per_minute >= 1000
 
+@pytest.mark.asyncio
+async def test_async_streaming_processing(batch_processor):
+    """Test processing documents from an async iterator with a bounded queue."""
+    produced = 0
+    max_in_flight = 0
+
+    async def doc_stream():
+        nonlocal produced, max_in_flight
+        for i in range(200):
+            await asyncio.sleep(0)
+            produced += 1
+            in_flight = produced - batch_processor.stats.processed_docs
+            max_in_flight = max(max_in_flight, in_flight)
+            yield {
+                "text": f"Async document {i}",
+                "metadata": {"id": i, "source": "async-stream"}
+            }
+
+    stats = await batch_processor.process_stream(doc_stream(), queue_size=5)
+
+    assert stats.total_docs == 200
+    assert stats.processed_docs == 200
+    assert stats.failed_docs == 0
+    # Queue bound plus documents held by workers limits read-ahead
+    assert max_in_flight <= 5 + batch_processor.max_workers + 1
+
 @pytest.mark.asyncio
 async def test_error_handling(batch_processor, mock_rag_system):
     """Test handling of processing errors and retries."""
@@ -112,6 +148,84 @@ async def test_error_handling(batch_processor, mock_rag_system):
     assert stats.processed_docs >= 90
     assert stats.failed_docs <= 10
 
+@pytest.mark.asyncio
+async def test_resume_from_journal(batch_processor, mock_rag_system, tmp_path):
+    """Test that a resumed job only processes documents not yet indexed."""
+    docs = generate_test_docs(50)
+    journal = IngestionJournal("resume-job", path=str(tmp_path / "journal.db"))
+
+    # First run fails on the second half of the documents
+    async def fail_second_half(text: str, metadata: Dict[str, Any] = None):
+        if metadata["id"] >= 25:
+            raise Exception("Simulated crash")
+        return True
+
+    batch_processor.max_retries = 0
+    mock_rag_system.ingest_text = fail_second_half
+    stats = await batch_processor.process_documents(docs, journal=journal)
+    assert stats.processed_docs == 25
+    assert journal.progress()["failed"] == 25
+
+    # Second run retries only the failures
+    seen = []
+    async def record(text: str, metadata: Dict[str, Any] = None):
+        seen.append(metadata["id"])
+        return True
+
+    mock_rag_system.ingest_text = record
+    stats = await batch_processor.process_documents(docs, journal=journal)
+    assert sorted(seen) == list(range(25, 50))
+    assert stats.processed_docs == 50
+    assert journal.progress()["indexed"] == 50
+    journal.close()
+
+@pytest.mark.asyncio
+async def test_resume_stream_from_journal(batch_processor, mock_rag_system, tmp_path):
+    """Test that a resumed stream skips documents already indexed."""
+    journal = IngestionJournal("stream-job", path=str(tmp_path / "journal.db"))
+
+    async def fail_odd(text: str, metadata: Dict[str, Any] = None):
+        if metadata["id"] % 2:
+            raise Exception("Simulated crash")
+        return True
+
+    batch_processor.max_retries = 0
+    mock_rag_system.ingest_text = fail_odd
+    stats = await batch_processor.process_stream(iter(generate_test_docs(40)), journal=journal)
+    assert stats.processed_docs == 20
+    assert journal.progress() == {"pending": 0, "indexed": 20, "failed": 20, "total": 40}
+
+    seen = []
+    async def record(text: str, metadata: Dict[str, Any] = None):
+        seen.append(metadata["id"])
+        return True
+
+    mock_rag_system.ingest_text = record
+    stats = await batch_processor.process_stream(iter(generate_test_docs(40)), journal=journal)
+    assert sorted(seen) == list(range(1, 40, 2))
+    assert stats.total_docs == 40
+    assert stats.processed_docs == 40
+    assert journal.progress()["indexed"] == 40
+    journal.close()
+
+@pytest.mark.asyncio
+async def test_documents_pooled_per_batch(batch_processor, mock_rag_system):
+    """Test that each batch is ingested in a single pooled call."""
+    calls = []
+    async def record(documents: List[Dict[str, Any]], **kwargs):
+        calls.append(len(documents))
+        return [doc["metadata"]["id"] != 7 for doc in documents]
+
+    batch_processor.max_retries = 0
+    mock_rag_system.ingest_documents = record
+    stats = await batch_processor.process_documents(generate_test_docs(100))
+
+    # One call per batch, never one per document
+    assert sum(calls) == 100
+    assert len(calls) <= 10
+    assert stats.processed_docs == 99
+    assert stats.failed_docs == 1
+
 @pytest.mark.asyncio
 async def test_memory_threshold(batch_processor):
     """Test that processing pauses when memory threshold is reached."""
@@ -34,4 +34,80 @@ def test_memory_cache_fallback(cache_manager):
 
 def test_cache_settings_optimization(cache_manager):
     # Should not raise error even without Redis
-    cache_manager.optimize_cache_settings() 
\ No newline at end of file
+    cache_manager.optimize_cache_settings()
+
+
+def test_query_result_cache_generation():
+    from rag_aether.ai.cache_manager import QueryResultCache
+    cache = QueryResultCache(maxsize=10)
+    key = cache.make_key("  What is RAG? ", 3, 0.7, {"source": "docs"})
+
+    # Normalized questions and filter order share a key
+    assert key == cache.make_key("what   is rag?", 3, 0.7, {"source": "docs"})
+    assert key != cache.make_key("what is rag?", 5, 0.7, {"source": "docs"})
+    assert key != cache.make_key("what is rag?", 3, 0.7, None)
+    assert key != cache.make_key("what is rag?", 3, 0.7, {"source": "docs"}, expanded=True)
+
+    cache.set(key, 1, ["context"])
+    assert cache.get(key, 1) == ["context"]
+
+    # A newer index generation makes the entry stale
+    assert cache.get(key, 2) is None
+    assert len(cache) == 0
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_query_result_cache_ttl():
+    from rag_aether.ai.cache_manager import QueryResultCache
+    cache = QueryResultCache(ttl=0.01)
+    cache.set("key", 0, "value")
+    time.sleep(0.02)
+    assert cache.get("key", 0) is None
+
+
+
+def test_query_result_cache_returns_copies():
+    from rag_aether.ai.cache_manager import QueryResultCache
+    cache = QueryResultCache()
+    context = [{"content": "text", "metadata": {"source": "docs"}}]
+    cache.set("key", 0, context)
+
+    # Neither the stored value nor a hit aliases the cached entry
+    context[0]["content"] = "changed by caller"
+    hit = cache.get("key", 0)
+    hit[0]["metadata"]["source"] = "changed by hit"
+    hit.append({"content": "extra"})
+    assert cache.get("key", 0) == [{"content": "text", "metadata": {"source": "docs"}}]
+
+@pytest.mark.asyncio
+async def test_embedding_cache_reuses_normalized_queries():
+    import asyncio
+    import numpy as np
+    from rag_aether.ai.cache_manager import EmbeddingCache
+
+    cache = EmbeddingCache(maxsize=10, redis_url=None)
+    calls = []
+
+    async def embed(texts):
+        calls.append(list(texts))
+        await asyncio.sleep(0.01)
+        return np.array([[float(len(t)), 1.0] for t in texts])
+
+    first = await cache.get_or_embed(["What is RAG?"], "model-a", embed)
+    second = await cache.get_or_embed(["  what is   rag? "], "model-a", embed)
+    assert np.array_equal(first, second)
+    assert len(calls) == 1
+
+    # Model is part of the key
+    await cache.get_or_embed(["What is RAG?"], "model-b", embed)
+    assert len(calls) == 2
+
+    # Concurrent misses for one query share a single request
+    results = await asyncio.gather(*(cache.get_or_embed(["new query"], "model-a", embed) for _ in range(5)))
+    assert len(calls) == 3
+    assert all(np.array_equal(r, results[0]) for r in results)
+
+    # Batches embed only the uncached texts
+    batch = await cache.get_or_embed(["what is rag?", "another", "Another"], "model-a", embed)
+    assert calls[-1] == ["another"]
+    assert batch.shape == (3, 2)
@@ -0,0 +1,87 @@
+"""Tests for token-aware text chunking."""
+import pytest
+from rag_aether.ai.chunker import TextChunker, count_tokens
+
+@pytest.fixture
+def chunker():
+    """Small chunker for testing."""
+    return TextChunker(chunk_size=50, chunk_overlap=10)
+
+def make_text(paragraphs: int = 5, sentences: int = 8) -> str:
+    """Generate multi-paragraph test text."""
+    return "\n\n".join(
+        " ".join(f"Sentence {p}-{i} has some words in it." for i in range(sentences))
+        for p in range(paragraphs)
+    )
+
+def test_chunks_respect_token_limit(chunker):
+    """Every chunk fits within the configured token budget."""
+    chunks = chunker.split_text(make_text())
+    assert len(chunks) > 1
+    assert all(chunker.count_tokens(chunk) <= chunker.chunk_size for chunk in chunks)
+
+def test_chunks_overlap(chunker):
+    """Consecutive chunks share trailing content."""
+    chunks = chunker.split_text(make_text(paragraphs=1, sentences=20))
+    last_sentence = chunks[0].split(". ")[-1]
+    assert last_sentence in chunks[1]
+
+def test_long_sentence_split_by_tokens(chunker):
+    """Text without sentence boundaries falls back to token windows."""
+    chunks = chunker.split_text("word " * 500)
+    assert len(chunks) > 1
+    assert all(chunker.count_tokens(chunk) <= chunker.chunk_size for chunk in chunks)
+
+def test_short_text_single_chunk(chunker):
+    """Text under the limit is returned as one chunk."""
+    assert chunker.split_text("A short document.") == ["A short document."]
+
+def test_iter_chunks_is_lazy(chunker):
+    """Chunks are produced by a generator."""
+    chunks = chunker.iter_chunks(make_text())
+    assert next(chunks)
+
+def test_stream_matches_text(chunker):
+    """Chunking a fragment stream matches chunking the whole text."""
+    text = make_text()
+    fragments = (text[i:i + 37] for i in range(0, len(text), 37))
+    assert list(chunker.iter_chunks_from_stream(fragments)) == chunker.split_text(text)
+
+def test_invalid_overlap():
+    """Overlap must be smaller than the chunk size."""
+    with pytest.raises(ValueError):
+        TextChunker(chunk_size=10, chunk_overlap=10)
+
+def test_count_tokens():
+    """Token counting returns a positive count for text."""
+    assert count_tokens("hello world") > 0
+    assert count_tokens("") == 0
+
+class _CharEncoder:
+    """Encoder counting every character, separators included, as a token."""
+
+    def encode(self, text):
+        return list(text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+def test_separators_count_toward_limit():
+    """Joined separators are counted, so chunks stay within the limit."""
+    chunker = TextChunker(chunk_size=50, chunk_overlap=10)
+    chunker.encoder = _CharEncoder()
+    text = "\n\n".join(" ".join(["Aaaa bbbb c."] * 6) for _ in range(4))
+
+    chunks = chunker.split_text(text)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 50 for chunk in chunks)
+
+def test_chunks_respect_tiktoken_limit():
+    """With tiktoken, joined chunks stay within the token limit."""
+    tiktoken = pytest.importorskip("tiktoken")
+    chunker = TextChunker(chunk_size=40, chunk_overlap=8)
+    encoder = tiktoken.get_encoding(chunker.encoding_name)
+
+    chunks = chunker.split_text(make_text(paragraphs=6, sentences=10))
+    assert len(chunks) > 1
+    assert all(len(encoder.encode(chunk)) <= chunker.chunk_size for chunk in chunks)
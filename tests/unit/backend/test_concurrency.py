@@ -0,0 +1,93 @@
+"""Tests for the adaptive ingestion concurrency controller."""
+import pytest
+import asyncio
+
+from rag_aether.ai.concurrency import ConcurrencyController, INCREASE, DECREASE, HOLD
+from rag_aether.core.monitoring import monitor
+
+class RateLimitError(Exception):
+    """Stand-in for the OpenAI rate limit error."""
+    status_code = 429
+
+def make_controller(**kwargs) -> ConcurrencyController:
+    params = dict(
+        initial_concurrency=4,
+        max_concurrency=8,
+        initial_batch_size=100,
+        min_batch_size=10,
+        max_batch_size=200,
+        target_latency=0.5
+    )
+    params.update(kwargs)
+    return ConcurrencyController(**params)
+
+def test_additive_increase_when_healthy():
+    """Healthy requests grow concurrency and batch size step by step."""
+    controller = make_controller()
+    for _ in range(20):
+        controller.record(0.1)
+
+    decision = controller.update(memory_usage=0.1)
+    assert decision.action == INCREASE
+    assert decision.concurrency == 5
+    assert decision.batch_size == 110
+    assert monitor.get_metrics()["ingest_controller"]["action"] == INCREASE
+
+    # Nothing measured since the last update
+    assert controller.update().action == HOLD
+
+@pytest.mark.parametrize("kind", ["rate_limited", "errors", "latency", "memory"])
+def test_multiplicative_decrease(kind):
+    """Rate limits, errors, slow requests and memory pressure halve the limits."""
+    controller = make_controller()
+    for i in range(20):
+        if kind == "latency":
+            controller.record(1.0)
+        elif kind == "errors":
+            controller.record(0.1, error=i % 2 == 0)
+        elif kind == "rate_limited" and i == 0:
+            controller.record(0.1, error=True, rate_limited=True)
+        else:
+            controller.record(0.1)
+
+    decision = controller.update(memory_usage=0.95 if kind == "memory" else 0.1)
+    assert decision.action == DECREASE
+    assert decision.reason == kind
+    assert decision.concurrency == 2
+    assert decision.batch_size == 50
+
+def test_learned_latency_target():
+    """Without a target, p95 well above the best seen triggers a back-off."""
+    controller = make_controller(target_latency=0)
+    for _ in range(10):
+        controller.record(0.1)
+    assert controller.update().action == INCREASE
+
+    for _ in range(10):
+        controller.record(0.5)
+    decision = controller.update()
+    assert decision.action == DECREASE
+    assert decision.reason == "latency"
+
+@pytest.mark.asyncio
+async def test_slot_limits_in_flight_and_records_429():
+    """Slots never exceed the limit and 429s reach the next decision."""
+    controller = make_controller(initial_concurrency=2)
+    peak = 0
+
+    async def request(fail: bool):
+        nonlocal peak
+        async with controller.slot():
+            peak = max(peak, controller.in_flight)
+            await asyncio.sleep(0.01)
+            if fail:
+                raise RateLimitError("slow down")
+
+    results = await asyncio.gather(*(request(i == 3) for i in range(8)), return_exceptions=True)
+    assert peak == 2
+    assert sum(isinstance(r, RateLimitError) for r in results) == 1
+
+    decision = controller.update()
+    assert decision.reason == "rate_limited"
+    assert decision.concurrency == 1
+    assert decision.samples == 8
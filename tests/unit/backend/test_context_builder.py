@@ -0,0 +1,151 @@
+"""Tests for token-budgeted context packing."""
+import pytest
+
+from rag_aether.ai.chunker import count_tokens
+from rag_aether.ai.context_builder import ContextBuilder
+
+def result(doc_id: str, index: int, content: str, score: float):
+    """Search result in the vector store's format."""
+    return {
+        "document_id": doc_id,
+        "score": score,
+        "content": content,
+        "metadata": {"document_id": doc_id, "chunk_index": index}
+    }
+
+@pytest.mark.asyncio
+async def test_adjacent_chunks_merge_without_overlap():
+    """Consecutive chunks of one document become one span."""
+    builder = ContextBuilder(context_budget=1000)
+    packed = await builder.build([
+        result("doc", 1, "Focus deepens with practice. Flow follows focus.", 0.8),
+        result("doc", 0, "Flow states need clear goals. Focus deepens with practice.", 0.9),
+        result("other", 5, "Sleep supports memory consolidation.", 0.5)
+    ])
+
+    assert len(packed.chunks) == 2
+    merged = packed.chunks[0]
+    assert merged.chunk_indices == [0, 1]
+    assert merged.content == "Flow states need clear goals. Focus deepens with practice. Flow follows focus."
+    assert merged.score == 0.9
+    assert packed.dropped_chunks == 0
+
+@pytest.mark.asyncio
+async def test_redundant_chunks_dropped_and_budget_respected():
+    """Near-duplicates are skipped and the token budget is never exceeded."""
+    text = "Flow is a state of deep focus where time seems to disappear."
+    filler = " ".join(["Unrelated detail about calendars and meetings."] * 20)
+    budget = count_tokens(text) + count_tokens("Sleep helps memory.")
+
+    builder = ContextBuilder(context_budget=budget)
+    packed = await builder.build([
+        text,
+        text.replace("deep", "very deep"),
+        filler,
+        "Sleep helps memory."
+    ])
+
+    assert [chunk.content for chunk in packed.chunks] == [text, "Sleep helps memory."]
+    assert packed.context_tokens <= budget
+    assert packed.dropped_chunks == 2
+
+@pytest.mark.asyncio
+async def test_history_keeps_recent_turns_and_caches_summary():
+    """Older turns are summarized once per set of turns."""
+    calls = []
+
+    async def summarize(turns):
+        calls.append(len(turns))
+        return "They discussed flow."
+
+    history = [{"role": "user", "content": f"message number {i} " * 5} for i in range(10)]
+    builder = ContextBuilder(history_budget=40, summarizer=summarize)
+
+    first = await builder.build([], history)
+    second = await builder.build([], history)
+
+    assert first.history == history[-len(first.history):]
+    assert 0 < len(first.history) < len(history)
+    assert first.summary == "They discussed flow."
+    assert first.history_tokens <= 40
+    assert first.dropped_turns == len(history) - len(first.history)
+    assert calls == [first.dropped_turns]
+    assert second.summary == first.summary
+
+@pytest.mark.asyncio
+async def test_failed_summary_is_not_cached():
+    """A failing summarizer drops older turns and is retried next time."""
+    calls = 0
+
+    async def summarize(turns):
+        nonlocal calls
+        calls += 1
+        raise RuntimeError("completion unavailable")
+
+    history = [{"role": "user", "content": "word " * 30} for _ in range(3)]
+    builder = ContextBuilder(history_budget=40, summarizer=summarize)
+
+    packed = await builder.build([], history)
+    await builder.build([], history)
+
+    assert packed.summary is None
+    assert len(packed.history) == 1
+    assert calls == 2
+
+@pytest.mark.asyncio
+async def test_chunks_from_vector_store_merge_by_source_document():
+    """Chunks returned by VectorStore.search merge on their source doc_id."""
+    import hashlib
+    import numpy as np
+    from unittest.mock import patch
+    from rag_aether.ai.vector_store import VectorStore
+
+    with patch('rag_aether.ai.vector_store.MLClient'):
+        store = VectorStore(vector_dimension=2)
+
+    async def embed(texts):
+        return np.array([[1.0, float(i)] for i, _ in enumerate(texts)])
+
+    chunks = ["Flow needs clear goals.", "Focus deepens with practice.", "Sleep supports memory."]
+    hashes = [hashlib.sha1(c.encode()).hexdigest() for c in chunks]
+    await store.upsert_document("doc", chunks[:2], hashes[:2], embed)
+    await store.upsert_document("notes", chunks[2:], hashes[2:], embed)
+
+    results = await store.search(np.array([1.0, 0.0], dtype="float32"), k=3)
+    # Every chunk gets its own store id, so doc_id is what ties them together
+    assert len({r["document_id"] for r in results}) == 3
+
+    packed = await ContextBuilder(context_budget=1000).build(results)
+    spans = {chunk.document_id: chunk for chunk in packed.chunks}
+    assert set(spans) == {"doc", "notes"}
+    assert spans["doc"].chunk_indices == [0, 1]
+    assert spans["doc"].content == "Flow needs clear goals.\nFocus deepens with practice."
+
+@pytest.mark.asyncio
+async def test_growing_history_summarizes_incrementally():
+    """New messages only trigger a summary once a block of older turns fills."""
+    calls = []
+
+    async def summarize(turns):
+        calls.append(turns)
+        return f"summary of {len(calls)}"
+
+    # Room for six turns and a summary, so a whole block fits behind the window
+    budget = 6 * count_tokens("message 10 " * 3) + count_tokens("summary of 10")
+    builder = ContextBuilder(history_budget=budget, summarizer=summarize, summary_step=4)
+    history = []
+    for i in range(24):
+        history.append({"role": "user", "content": f"message {i} " * 3})
+        packed = await builder.build([], history)
+        if packed.summary:
+            # Summaries cover whole blocks and never the turns still kept
+            assert packed.dropped_turns % 4 == 0
+            assert packed.history == history[packed.dropped_turns:]
+            assert packed.history_tokens <= budget
+
+    # One call per filled block rather than one per message; later calls
+    # extend the previous summary with only the new block
+    assert [len(call) for call in calls] == [4, 5, 5, 5, 5]
+    for number, call in enumerate(calls[1:], 1):
+        assert call[0]["content"].endswith(f"summary of {number}")
+        assert call[1:] == history[4 * number:4 * number + 4]
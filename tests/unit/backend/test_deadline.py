@@ -0,0 +1,54 @@
+"""Tests for request-scoped deadlines."""
+import pytest
+import asyncio
+
+from rag_aether.core.deadline import request_deadline, remaining, run_stage, stage_timeout
+from rag_aether.core.errors import DeadlineExceededError
+
+def test_no_deadline_by_default():
+    """Outside a request there is no deadline."""
+    assert remaining() is None
+    assert stage_timeout() is None
+    assert stage_timeout(0.5) == 0.5
+
+def test_nested_deadline_only_shortens():
+    """A nested deadline cannot extend the outer one."""
+    with request_deadline(0.5) as outer:
+        with request_deadline(10.0) as inner:
+            assert inner == outer
+        with request_deadline(0.1) as inner:
+            assert inner < outer
+            assert stage_timeout(1.0) <= 0.1
+        assert 0.4 < remaining() <= 0.5
+    assert remaining() is None
+
+@pytest.mark.asyncio
+async def test_run_stage_times_out_and_cancels():
+    """A stage past the deadline is cancelled and reported by name."""
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(1.0)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with request_deadline(0.05):
+        with pytest.raises(DeadlineExceededError) as exc_info:
+            await run_stage("embedding", slow())
+
+    assert exc_info.value.stage == "embedding"
+    assert cancelled.is_set()
+
+@pytest.mark.asyncio
+async def test_stage_budget_and_task_inheritance():
+    """Stage budgets apply within the deadline and tasks inherit it."""
+    async def fast():
+        return remaining()
+
+    with request_deadline(1.0):
+        left = await asyncio.create_task(fast())
+        assert 0.9 < left <= 1.0
+        with pytest.raises(DeadlineExceededError):
+            await run_stage("profile", asyncio.sleep(1.0), budget=0.01)
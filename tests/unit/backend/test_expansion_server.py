@@ -0,0 +1,91 @@
+"""Tests for the dynamic-batching query expansion server."""
+import pytest
+import asyncio
+import time
+from unittest.mock import patch
+
+from rag_aether.ai.expansion_server import ExpansionServer
+from rag_aether.ai.query_expansion import QueryExpander
+
+class FakeTensor:
+    """Tokenizer output stand-in."""
+    def __init__(self, texts):
+        self.texts = texts
+
+    def to(self, device):
+        return self
+
+class FakeTokenizer:
+    """Records prompts and decodes generated ids back to text."""
+    def __call__(self, texts, **kwargs):
+        return {"input_ids": FakeTensor(list(texts))}
+
+    def batch_decode(self, generated, skip_special_tokens=True):
+        return generated
+
+class FakeModel:
+    """Generates numbered expansions and records batch sizes."""
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.batch_sizes = []
+
+    def generate(self, input_ids, num_return_sequences=1, **kwargs):
+        time.sleep(self.delay)
+        self.batch_sizes.append(len(input_ids.texts))
+        return [
+            f"{text.split(': ', 1)[1]} {i}"
+            for text in input_ids.texts
+            for i in range(num_return_sequences)
+        ]
+
+@pytest.fixture
+def model():
+    """Patch model loading with a fake model."""
+    fake = FakeModel()
+    with patch("rag_aether.ai.expansion_server.get_model",
+               return_value=(fake, FakeTokenizer(), "cpu")):
+        yield fake
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_batched(model):
+    """Concurrent expansions share one generate call."""
+    server = ExpansionServer(model_name="t5-small", max_batch_size=8,
+                             max_wait=0.1, timeout=2.0, num_return_sequences=2)
+    try:
+        results = await asyncio.gather(*(server.expand(f"query {i}") for i in range(8)))
+    finally:
+        server.stop(timeout=1.0)
+
+    assert results[3] == ["query 3 0", "query 3 1"]
+    assert model.batch_sizes == [8]
+    assert server.batches == 1
+
+@pytest.mark.asyncio
+async def test_timeout_falls_back_to_raw_query(model):
+    """A slow model returns the raw query within the timeout."""
+    model.delay = 0.3
+    server = ExpansionServer(model_name="t5-small", max_wait=0.0, timeout=0.05)
+    try:
+        start = time.monotonic()
+        result = await server.expand("slow query")
+        elapsed = time.monotonic() - start
+    finally:
+        server.stop(timeout=1.0)
+
+    assert result == ["slow query"]
+    assert elapsed < 0.25
+    assert server.timeouts == 1
+
+@pytest.mark.asyncio
+async def test_query_expander_uses_server(model):
+    """QueryExpander appends generated expansions to the query."""
+    server = ExpansionServer(model_name="t5-small", max_wait=0.05,
+                             timeout=2.0, num_return_sequences=2)
+    expander = QueryExpander(server=server)
+    try:
+        results = await expander.expand_queries(["flow state", "focus"])
+    finally:
+        server.stop(timeout=1.0)
+
+    assert results == ["flow state flow state 0 flow state 1", "focus focus 0 focus 1"]
+    assert model.batch_sizes == [2]
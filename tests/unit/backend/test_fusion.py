@@ -0,0 +1,83 @@
+"""Tests for rank fusion."""
+import pytest
+import numpy as np
+
+from rag_aether_root.ai.fusion import ScoreFusion, fuse
+from rag_aether_root.errors import SearchError
+
+
+def candidates(ids, scores):
+    """Candidate list as the retrievers return it."""
+    return np.array(ids), np.array(scores, dtype=np.float64)
+
+
+VECTOR = candidates([3, 1, 7], [0.9, 0.5, 0.1])
+KEYWORD = candidates([1, 4], [8.0, 2.0])
+
+
+def test_rrf_uses_ranks_and_weights():
+    """RRF sums weight / (rrf_k + rank) over the lists a document is in."""
+    ids, scores = fuse([VECTOR, KEYWORD], method='rrf', weights=[1.0, 2.0], rrf_k=10)
+    expected = {
+        1: 1 / 12 + 2 / 11,
+        4: 2 / 12,
+        3: 1 / 11,
+        7: 1 / 13,
+    }
+    assert list(ids) == sorted(expected, key=expected.get, reverse=True)
+    np.testing.assert_allclose(scores, [expected[i] for i in ids])
+
+
+def test_rrf_ties_share_a_rank():
+    """Tied scores in one list get the same reciprocal rank."""
+    ids, scores = fuse([candidates([5, 6, 2], [1.0, 1.0, 0.5])], method='rrf', rrf_k=0)
+    assert dict(zip(ids, scores)) == {5: 1.0, 6: 1.0, 2: 1 / 3}
+
+
+def test_convex_min_max_with_floor_for_missing():
+    """Convex fusion min-max normalizes; missing documents get zero."""
+    ids, scores = fuse([VECTOR, KEYWORD], method='convex', weights=[0.7, 0.3])
+    fused = dict(zip(ids, scores))
+    np.testing.assert_allclose(fused[1], 0.7 * 0.5 + 0.3 * 1.0)
+    np.testing.assert_allclose(fused[3], 0.7)
+    np.testing.assert_allclose(fused[4], 0.0)
+    np.testing.assert_allclose(fused[7], 0.0)
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_zscore_floor_is_lowest_normalized_score():
+    """A document missing from a list scores like that list's last entry."""
+    vector = candidates([3, 1, 7], [3.0, 2.0, 1.0])
+    keyword = candidates([9, 3], [4.0, 2.0])
+    ids, scores = fuse([vector, keyword], method='zscore')
+    fused = dict(zip(ids, scores))
+
+    z = np.sqrt(1.5)  # z-scores of [3, 2, 1] are [z, 0, -z]
+    np.testing.assert_allclose(fused[3], z + -1.0)
+    np.testing.assert_allclose(fused[9], -z + 1.0)
+    np.testing.assert_allclose(fused[1], 0.0 + -1.0)
+    np.testing.assert_allclose(fused[7], -z + -1.0)
+
+
+@pytest.mark.parametrize("method,value", [("convex", 1.0), ("zscore", 0.0)])
+def test_constant_scores_do_not_divide_by_zero(method, value):
+    """Lists with equal scores normalize to a constant without NaNs."""
+    ids, scores = fuse([candidates([1, 2], [0.4, 0.4])], method=method)
+    assert sorted(ids) == [1, 2]
+    np.testing.assert_allclose(scores, [value, value])
+
+
+def test_empty_lists_top_k_and_validation():
+    """Empty lists are skipped; bad input raises."""
+    ids, scores = fuse([candidates([], []), KEYWORD], method='convex', top_k=1)
+    assert list(ids) == [1] and list(scores) == [1.0]
+    assert fuse([candidates([], [])])[0].size == 0
+
+    with pytest.raises(ValueError):
+        ScoreFusion('max')
+    with pytest.raises(ValueError):
+        ScoreFusion('rrf', rrf_k=-1)
+    with pytest.raises(SearchError):
+        ScoreFusion('rrf', weights=[1.0]).fuse([VECTOR, KEYWORD])
+    with pytest.raises(SearchError):
+        ScoreFusion('rrf').fuse([(np.array([1, 2]), np.array([0.5]))])
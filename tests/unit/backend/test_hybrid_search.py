@@ -0,0 +1,94 @@
+"""Tests for hybrid search over the union of retriever candidates."""
+import pytest
+import zlib
+import numpy as np
+from unittest.mock import patch
+
+from rag_aether_root.ai.hybrid_search import HybridRetriever
+from rag_aether_root.ai.keyword_index import tokenize
+
+
+class FakeEncoder:
+    """Bag-of-words encoder with a fixed dimension."""
+
+    def __init__(self, model_name=None):
+        self.calls = 0
+
+    def get_sentence_embedding_dimension(self):
+        return 16
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        self.calls += 1
+        vectors = np.zeros((len(texts), 16), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                vectors[row, zlib.crc32(token.encode()) % 16] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+
+DOCS = [
+    {"text": "Flow states need clear goals and focus"},
+    {"text": "Deep work protects long blocks of focus"},
+    {"text": "Sleep consolidates memory overnight"},
+    {"text": "Meetings fragment the calendar"},
+    {"text": "Clear goals make feedback immediate"},
+    {"text": "Exercise improves sleep quality"},
+]
+
+
+def make_retriever(method, documents=DOCS, candidate_k=2):
+    """Hybrid retriever with the fake encoder."""
+    with patch("rag_aether_root.ai.vector_search.SentenceTransformer", FakeEncoder):
+        retriever = HybridRetriever(fusion_method=method, candidate_k=candidate_k)
+    retriever.add_documents(documents)
+    return retriever
+
+
+@pytest.mark.parametrize("method", ["convex", "zscore", "rrf"])
+def test_union_candidates_get_both_scores(method):
+    """Every fused document is scored by both retrievers, once per query."""
+    retriever = make_retriever(method)
+    encoder = retriever.vector_search.model
+    calls = encoder.calls
+    query = "clear goals for sleep"
+
+    with patch.object(retriever.fusion, "fuse", wraps=retriever.fusion.fuse) as fuse:
+        results = retriever.search(query, top_k=3)
+
+    assert encoder.calls == calls + 1
+    (vector_ids, vector_scores), (keyword_ids, keyword_scores) = fuse.call_args[0][0]
+    assert sorted(vector_ids) == sorted(keyword_ids)
+    assert len(vector_ids) > 2  # the union is larger than either list
+    assert list(vector_scores) == sorted(vector_scores, reverse=True)
+
+    query_vector = encoder.encode([query])[0]
+    stored = retriever.vector_search.get_embeddings(vector_ids)
+    np.testing.assert_allclose(vector_scores, stored @ query_vector, rtol=1e-5)
+    np.testing.assert_allclose(
+        keyword_scores,
+        retriever.keyword_index.score(query, keyword_ids)
+    )
+
+    assert 0 < len(results) <= 3
+    assert [r["score"] for r in results] == sorted((r["score"] for r in results), reverse=True)
+    assert all(r["text"] == DOCS[r["doc_index"]]["text"] for r in results)
+
+
+@pytest.mark.parametrize("method", ["convex", "zscore", "rrf"])
+def test_constant_scores_and_edge_cases(method):
+    """Identical documents, empty queries and tiny corpora fuse cleanly."""
+    retriever = make_retriever(method, [{"text": "same text"}] * 4, candidate_k=4)
+    results = retriever.search("same text", top_k=4)
+    assert len(results) == 4
+    assert np.isfinite([r["score"] for r in results]).all()
+    assert len({round(r["score"], 9) for r in results}) == 1
+
+    empty = make_retriever(method).search("", top_k=2)
+    assert len(empty) == 2 and np.isfinite([r["score"] for r in empty]).all()
+
+    single = make_retriever(method, [{"text": "only document"}])
+    assert [r["doc_index"] for r in single.search("document", top_k=5)] == [0]
+    assert [r["doc_index"] for r in single.search("unrelated", top_k=5)] == [0]
+
+    assert make_retriever(method, []).search("anything") == []
@@ -0,0 +1,123 @@
+"""Tests for background ingestion jobs."""
+import pytest
+import asyncio
+import json
+from typing import Any, Dict, List
+from unittest.mock import Mock, patch
+
+from rag_aether.ai.ingest_jobs import IngestJobManager, NDJSONFile, COMPLETED, FAILED, QUEUED
+from rag_aether.ai.rag_system import RAGSystem
+
+@pytest.fixture
+def mock_rag_system():
+    """Mock RAG system with fast ingestion."""
+    rag = Mock(spec=RAGSystem)
+    async def mock_ingest_text(text: str, metadata: Dict[str, Any] = None):
+        await asyncio.sleep(0.001)
+        return True
+    rag.ingest_text = mock_ingest_text
+
+    async def mock_ingest_documents(documents: List[Dict[str, Any]], **kwargs):
+        await asyncio.sleep(0.001)
+        return [True] * len(documents)
+    rag.ingest_documents = mock_ingest_documents
+    return rag
+
+async def wait_for_job(manager: IngestJobManager, job_id: str) -> None:
+    """Poll until the job leaves the queued/running states."""
+    for _ in range(500):
+        if manager.get(job_id).status not in (QUEUED, "running"):
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Job did not finish")
+
+@pytest.mark.asyncio
+async def test_submit_returns_immediately(mock_rag_system):
+    """Submitting queues the job and returns before processing."""
+    manager = IngestJobManager(mock_rag_system, batch_size=10)
+    docs = [{"text": f"Document {i}", "metadata": {"id": i}} for i in range(100)]
+
+    job = manager.submit(docs)
+    assert job.status == QUEUED
+    assert manager.get(job.job_id) is job
+
+    await wait_for_job(manager, job.job_id)
+    assert job.status == COMPLETED
+    assert job.stats.processed_docs == 100
+    assert job.to_dict()["stats"]["failed_docs"] == 0
+
+@pytest.mark.asyncio
+async def test_ndjson_job(mock_rag_system, tmp_path):
+    """NDJSON files are streamed into the job and removed afterwards."""
+    path = tmp_path / "docs.ndjson"
+    path.write_text("\n".join(json.dumps({"text": f"Doc {i}"}) for i in range(25)) + "\n")
+
+    manager = IngestJobManager(mock_rag_system, batch_size=10)
+    job = manager.submit(NDJSONFile(str(path)))
+    await wait_for_job(manager, job.job_id)
+
+    assert job.status == COMPLETED
+    assert job.stats.total_docs == 25
+    assert not path.exists()
+
+@pytest.mark.asyncio
+async def test_ndjson_file_removed_when_job_fails_early(mock_rag_system, tmp_path):
+    """The spooled file is deleted even if the job fails before reading it."""
+    path = tmp_path / "docs.ndjson"
+    path.write_text(json.dumps({"text": "Doc"}) + "\n")
+
+    manager = IngestJobManager(mock_rag_system, journal_path=str(tmp_path / "missing" / "journal.db"))
+    job = manager.submit(NDJSONFile(str(path)))
+    await wait_for_job(manager, job.job_id)
+
+    assert job.status == FAILED
+    assert not path.exists()
+
+@pytest.mark.asyncio
+async def test_resubmitted_job_resumes_from_journal(mock_rag_system, tmp_path):
+    """Resubmitting under the same job ID skips documents already indexed."""
+    seen = []
+    async def record(documents: List[Dict[str, Any]], **kwargs):
+        seen.extend(doc["metadata"]["id"] for doc in documents)
+        return [True] * len(documents)
+    mock_rag_system.ingest_documents = record
+
+    manager = IngestJobManager(mock_rag_system, batch_size=10, journal_path=str(tmp_path / "journal.db"))
+    docs = [{"text": f"Document {i}", "metadata": {"id": i}} for i in range(20)]
+    job = manager.submit(docs[:10], job_id="bulk-1")
+    with pytest.raises(ValueError):
+        manager.submit(docs, job_id="bulk-1")
+    await wait_for_job(manager, job.job_id)
+
+    job = manager.submit(docs, job_id="bulk-1")
+    await wait_for_job(manager, job.job_id)
+    assert job.status == COMPLETED
+    assert sorted(seen) == list(range(20))
+    assert job.stats.processed_docs == 20
+
+@pytest.mark.asyncio
+async def test_unknown_job(mock_rag_system):
+    """Unknown job IDs return None."""
+    manager = IngestJobManager(mock_rag_system)
+    assert manager.get("missing") is None
+
+def test_ndjson_endpoint_spools_body_and_accepts_job_id(mock_rag_system):
+    """NDJSON uploads become a job under the requested ID; running IDs conflict."""
+    from fastapi.testclient import TestClient
+    from rag_aether.api import main
+
+    docs = "\n".join(json.dumps({"text": f"Doc {i}"}) for i in range(5)) + "\n"
+    manager = IngestJobManager(mock_rag_system)
+    with patch.object(main, "job_manager", manager):
+        client = TestClient(main.app)
+        response = client.post(
+            "/ingest/jobs?job_id=upload-1",
+            content=docs,
+            headers={"content-type": "application/x-ndjson"}
+        )
+        assert response.status_code == 202
+        assert response.json()["job_id"] == "upload-1"
+
+        with patch.object(manager, "is_active", return_value=True):
+            response = client.post("/ingest/jobs?job_id=upload-1", json={"documents": [{"text": "Doc"}]})
+        assert response.status_code == 409
@@ -0,0 +1,55 @@
+"""Tests for the ingestion job journal."""
+import pytest
+from rag_aether.ai.journal import IngestionJournal, document_key, INDEXED, FAILED, PENDING
+
+@pytest.fixture
+def journal(tmp_path):
+    """Journal stored in a temporary file."""
+    journal = IngestionJournal("job-1", path=str(tmp_path / "journal.db"))
+    yield journal
+    journal.close()
+
+def test_document_key():
+    """Keys come from ids when present and from content otherwise."""
+    assert document_key({"id": 7, "text": "a"}) == "7"
+    assert document_key({"text": "a", "metadata": {"id": "m-1"}}) == "m-1"
+    assert document_key({"text": "a"}) == document_key({"text": "a"})
+    assert document_key({"text": "a"}) != document_key({"text": "b"})
+
+def test_register_and_progress(journal):
+    """Registered documents start pending."""
+    journal.register(["a", "b", "c"])
+    assert journal.progress() == {PENDING: 3, INDEXED: 0, FAILED: 0, "total": 3}
+
+def test_register_keeps_existing_state(journal):
+    """Re-registering does not reset finished documents."""
+    journal.register(["a", "b"])
+    journal.mark(["a"], INDEXED)
+    journal.register(["a", "b"])
+    assert journal.keys_in_state(INDEXED) == {"a"}
+
+def test_remaining_and_retry(journal):
+    """Failed documents are retried only when requested."""
+    journal.register(["a", "b", "c"])
+    journal.mark(["a"], INDEXED)
+    journal.mark(["b"], FAILED, error="boom")
+    assert journal.remaining() == {"b", "c"}
+    assert journal.remaining(retry_failed=False) == {"c"}
+    assert journal.failures() == [{"doc_key": "b", "error": "boom", "attempts": 1}]
+
+def test_journal_survives_reopen(tmp_path):
+    """State persists across journal instances."""
+    path = str(tmp_path / "journal.db")
+    first = IngestionJournal("job-1", path=path)
+    first.register(["a", "b"])
+    first.mark(["a"], INDEXED)
+    first.close()
+
+    second = IngestionJournal("job-1", path=path)
+    assert second.remaining() == {"b"}
+    second.close()
+
+def test_invalid_state(journal):
+    """Unknown states are rejected."""
+    with pytest.raises(ValueError):
+        journal.mark(["a"], "done")
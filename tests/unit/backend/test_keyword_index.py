@@ -0,0 +1,129 @@
+"""Tests for the BM25 keyword index."""
+import math
+import random
+import threading
+import numpy as np
+
+from rag_aether_root.ai.keyword_index import BM25Index, tokenize
+
+
+def brute_force_scores(texts, query, k1=1.2, b=0.75):
+    """BM25 score of every document, computed directly from the texts."""
+    docs = [tokenize(text) for text in texts]
+    avg_length = sum(map(len, docs)) / len(docs)
+    scores = np.zeros(len(docs))
+    for term in set(tokenize(query)):
+        df = sum(term in doc for doc in docs)
+        if not df:
+            continue
+        idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+        for i, doc in enumerate(docs):
+            tf = doc.count(term)
+            if tf:
+                norm = k1 * (1 - b + b * len(doc) / avg_length)
+                scores[i] += idf * tf * (k1 + 1) / (tf + norm)
+    return scores
+
+
+def random_corpus(size, seed=0):
+    """Texts with a skewed vocabulary, so some terms are very common."""
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(200)]
+    weights = [1 / (i + 1) for i in range(200)]
+    return [" ".join(rng.choices(vocab, weights, k=rng.randint(3, 30))) for _ in range(size)]
+
+
+def test_search_and_score_match_brute_force():
+    """Top-k search and candidate scoring agree with direct BM25."""
+    texts = random_corpus(400)
+    index = BM25Index()
+    index.add_documents(texts[:150])
+    index.add_documents(texts[150:])
+
+    for query in ["w0", "w1 w50", "w0 w1 w2", "w3 w120 w199 w7", "w0 w0 w150"]:
+        expected = brute_force_scores(texts, query)
+        ids, scores = index.search(query, 10)
+
+        top = np.sort(expected)[::-1][:len(ids)]
+        np.testing.assert_allclose(scores, top)
+        np.testing.assert_allclose(expected[ids], scores)
+        assert list(scores) == sorted(scores, reverse=True)
+
+        sample = np.array([0, 5, 17, 399, 42])
+        np.testing.assert_allclose(index.score(query, sample), expected[sample])
+
+
+def test_search_edge_cases():
+    """Unknown terms, empty queries and small k return what matches."""
+    index = BM25Index()
+    assert index.search("anything", 5)[0].size == 0
+
+    index.add_documents(["Flow needs focus.", "", "focus FOCUS focus"])
+    assert len(index) == 3
+    assert index.search("", 5)[0].size == 0
+    assert index.search("unknown words", 5)[0].size == 0
+    assert index.search("focus", 0)[0].size == 0
+
+    ids, _ = index.search("focus", 5)
+    assert list(ids) == [2, 0]
+    assert index.score("focus", np.array([1]))[0] == 0.0
+
+    index.clear()
+    assert len(index) == 0 and index.search("focus", 5)[0].size == 0
+
+
+def test_add_documents_while_searching():
+    """Adding documents while searches hold postings views does not fail."""
+    index = BM25Index()
+    index.add_documents(random_corpus(200))
+    ids, _ = index.search("w0 w1", 5)
+    views = index.postings["w0"].arrays()
+
+    errors = []
+
+    def search_loop():
+        try:
+            for _ in range(200):
+                index.search("w0 w1 w2", 5)
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=search_loop)
+    thread.start()
+    for seed in range(20):
+        index.add_documents(random_corpus(50, seed=seed + 1))
+    thread.join()
+
+    assert not errors
+    assert len(index) == 1200
+    assert views[0].size < index.postings["w0"].size
+
+
+def test_pruned_search_matches_exhaustive_top_k(monkeypatch):
+    """MaxScore skips postings of low-impact terms without changing the top k."""
+    texts = ["common " * 3 + f"filler{i}" for i in range(500)]
+    for i in (10, 200, 404):
+        texts[i] = "rare rare common"
+    texts += random_corpus(300, seed=7)
+
+    index = BM25Index()
+    index.add_documents(texts)
+    scored = []
+    contributions = index._contributions
+
+    def spy(doc_ids, freqs, idf, avg_length):
+        scored.append(len(doc_ids))
+        return contributions(doc_ids, freqs, idf, avg_length)
+
+    monkeypatch.setattr(index, "_contributions", spy)
+    for query, k in [("rare common", 3), ("rare common w0 w1", 5), ("common w150 w0", 10)]:
+        expected = brute_force_scores(texts, query)
+        ids, scores = index.search(query, k)
+        np.testing.assert_allclose(scores, np.sort(expected)[::-1][:k])
+        np.testing.assert_allclose(expected[ids], scores)
+
+    # Only the rare term and the three candidates' common postings are scored
+    scored.clear()
+    ids, _ = index.search("rare common", 3)
+    assert sorted(ids) == [10, 200, 404]
+    assert sum(scored) == 6
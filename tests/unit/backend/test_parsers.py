@@ -0,0 +1,89 @@
+"""Tests for streaming document parsers."""
+import pytest
+import json
+import zipfile
+
+from rag_aether.ai import parsers
+from rag_aether.ai.parsers import get_parser, iter_sections, parse_files, parse_json, parse_text
+
+def write_docx(path, paragraphs):
+    """Write a minimal DOCX file from (style, text) pairs."""
+    ns = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    body = ""
+    for style, text in paragraphs:
+        properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+        body += f"<w:p>{properties}<w:r><w:t>{text}</w:t></w:r></w:p>"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", f'<w:document xmlns:w="{ns}"><w:body>{body}</w:body></w:document>')
+
+def test_markdown_heading_paths(tmp_path):
+    """Markdown sections carry the path of enclosing headings."""
+    path = tmp_path / "guide.md"
+    path.write_text(
+        "Preface text.\n\n# Guide\nIntro.\n\n## Install\nSteps.\n\n```\n# not a heading\n```\n\n"
+        "### Linux\nUse apt.\n\n## Usage\nRun it.\n"
+    )
+
+    sections = list(iter_sections(str(path), {"collection": "docs"}))
+    paths = [s["metadata"]["heading_path"] for s in sections]
+    assert paths == [[], ["Guide"], ["Guide", "Install"], ["Guide", "Install", "Linux"], ["Guide", "Usage"]]
+    assert "# not a heading" in sections[2]["text"]
+    assert all(s["metadata"]["collection"] == "docs" for s in sections)
+    assert sections[0]["metadata"]["format"] == "markdown"
+
+def test_json_array_streamed_in_small_reads(tmp_path, monkeypatch):
+    """JSON arrays are decoded item by item across read boundaries."""
+    monkeypatch.setattr(parsers, "READ_SIZE", 7)
+    records = [
+        {"id": "a", "text": "First record", "metadata": {"lang": "en"}},
+        {"content": "Second record"},
+        12345,
+        "plain string"
+    ]
+    path = tmp_path / "records.json"
+    path.write_text(json.dumps(records, indent=2))
+
+    sections = list(parse_json(str(path)))
+    assert [s["text"] for s in sections] == ["First record", "Second record", "12345", "plain string"]
+    assert sections[0]["id"] == "a"
+    assert sections[0]["metadata"]["lang"] == "en"
+    assert sections[1]["metadata"]["json_path"] == "$[1]"
+
+def test_docx_sections(tmp_path):
+    """DOCX heading styles start sections with heading paths."""
+    path = tmp_path / "report.docx"
+    write_docx(path, [
+        ("Heading1", "Summary"),
+        (None, "Results were good."),
+        ("Heading2", "Details"),
+        (None, "First detail."),
+        (None, "Second detail.")
+    ])
+
+    sections = list(get_parser(str(path))(str(path)))
+    assert [s["metadata"]["heading_path"] for s in sections] == [["Summary"], ["Summary", "Details"]]
+    assert sections[1]["text"] == "First detail.\n\nSecond detail."
+
+def test_text_split_at_paragraphs(tmp_path, monkeypatch):
+    """Large text files are emitted in bounded, paragraph-aligned sections."""
+    monkeypatch.setattr(parsers, "MAX_SECTION_CHARS", 50)
+    monkeypatch.setattr(parsers, "READ_SIZE", 16)
+    paragraphs = [f"Paragraph number {i} here." for i in range(10)]
+    path = tmp_path / "notes.doc"
+    path.write_text("\n\n".join(paragraphs))
+
+    sections = list(iter_sections(str(path)))
+    assert all(len(s["text"]) <= 50 for s in sections)
+    assert " ".join(s["text"].replace("\n\n", " ") for s in sections) == " ".join(paragraphs)
+    assert get_parser(str(path)) is parse_text
+
+@pytest.mark.asyncio
+async def test_parse_files_in_workers(tmp_path):
+    """Files are parsed in worker processes; bad files are skipped."""
+    (tmp_path / "a.md").write_text("# A\nAlpha.\n")
+    (tmp_path / "b.jsonl").write_text('{"text": "Beta"}\n{"text": "Gamma"}\n')
+    (tmp_path / "c.docx").write_text("not a zip")
+
+    files = [(str(tmp_path / name), {"batch": 1}) for name in ("a.md", "b.jsonl", "c.docx")]
+    texts = sorted([s["text"] async for s in parse_files(files, max_workers=2, queue_size=1)])
+    assert texts == ["Alpha.", "Beta", "Gamma"]
@@ -0,0 +1,149 @@
+"""Tests for the staged ingestion pipeline."""
+import pytest
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+import numpy as np
+
+from rag_aether.ai.pipeline import IngestionPipeline, Stage, parse_document, chunk_document
+from rag_aether.ai.vector_store import VectorStore
+
+@pytest.fixture
+def mock_rag_system():
+    """Mock RAG system recording embedding and index calls."""
+    rag = Mock()
+    rag.embed_calls = []
+    rag.indexed = []
+
+    async def embed_texts(texts):
+        rag.embed_calls.append(len(texts))
+        await asyncio.sleep(0.001)
+        return np.ones((len(texts), 8), dtype="float32")
+
+    async def index_chunks(chunks, embeddings, metadata):
+        assert embeddings.shape == (len(chunks), 8)
+        rag.indexed.extend(zip(chunks, metadata))
+        return True
+
+    rag.embed_texts = embed_texts
+    rag.index_chunks = index_chunks
+    return rag
+
+@pytest.fixture
+def pipeline(mock_rag_system):
+    """Pipeline using threads instead of processes for CPU stages."""
+    executor = ThreadPoolExecutor(max_workers=2)
+    yield IngestionPipeline(
+        mock_rag_system,
+        cpu_workers=2,
+        embed_concurrency=2,
+        embed_batch_size=8,
+        queue_size=4,
+        executor=executor
+    )
+    executor.shutdown()
+
+def test_parse_document_normalizes_text():
+    """Parsing decodes bytes and normalizes whitespace."""
+    [doc] = parse_document({"text": b"Hello  \r\nworld\r\n", "metadata": {"source": "test"}})
+    assert doc["text"] == "Hello\nworld"
+    assert doc["metadata"] == {"source": "test"}
+    assert doc["id"]
+    assert parse_document({"text": "   "}) == []
+
+def test_chunk_document_hashes_chunks():
+    """Chunks carry content hashes and document membership."""
+    doc = parse_document({"id": "doc-1", "text": "First paragraph.\n\nSecond paragraph."})[0]
+    chunks = chunk_document(doc, chunk_size=5, chunk_overlap=0)
+    assert len(chunks) == 2
+    assert chunks[0]["hash"] != chunks[1]["hash"]
+    assert chunks[1]["metadata"] == {"doc_id": "doc-1", "chunk_index": 1}
+
+@pytest.mark.asyncio
+async def test_pipeline_indexes_all_chunks(pipeline, mock_rag_system):
+    """Every unique chunk is embedded in micro-batches and indexed."""
+    docs = [{"id": f"doc-{i}", "text": f"Document number {i}."} for i in range(50)]
+    metrics = await pipeline.run(docs)
+
+    assert len(mock_rag_system.indexed) == 50
+    assert max(mock_rag_system.embed_calls) > 1
+    assert metrics["parse"]["processed"] == 50
+    assert metrics["index"]["processed"] == 50
+    assert set(metrics) == {"parse", "chunk", "dedup", "embed", "index"}
+
+@pytest.mark.asyncio
+async def test_pipeline_drops_duplicate_chunks(pipeline, mock_rag_system):
+    """Repeated chunks of a document are embedded only once."""
+    async def docs():
+        for _ in range(10):
+            yield {"id": "doc-1", "text": "Same text every time."}
+
+    metrics = await pipeline.run(docs())
+    assert len(mock_rag_system.indexed) == 1
+    assert metrics["dedup"]["processed"] == 10
+    assert metrics["dedup"]["emitted"] == 1
+
+    await pipeline.run([{"id": "doc-1", "text": "Same text every time."}])
+    assert len(mock_rag_system.indexed) == 1
+
+@pytest.mark.asyncio
+async def test_pipeline_keeps_same_text_in_other_documents(pipeline, mock_rag_system):
+    """Identical text in different documents is indexed for each of them."""
+    docs = [{"id": f"doc-{i}", "text": "Shared boilerplate."} for i in range(3)]
+    await pipeline.run(docs)
+    assert sorted(m["doc_id"] for _, m in mock_rag_system.indexed) == ["doc-0", "doc-1", "doc-2"]
+
+@pytest.mark.asyncio
+async def test_pipeline_retries_chunks_that_failed_to_index(pipeline, mock_rag_system):
+    """Chunks of a failed index batch are not remembered as seen."""
+    index_chunks = mock_rag_system.index_chunks
+    attempts = []
+
+    async def flaky_index(chunks, embeddings, metadata):
+        attempts.append(len(chunks))
+        if len(attempts) == 1:
+            return False
+        return await index_chunks(chunks, embeddings, metadata)
+
+    mock_rag_system.index_chunks = flaky_index
+    docs = [{"id": "doc-1", "text": "Retry me."}]
+
+    metrics = await pipeline.run(docs)
+    assert metrics["index"]["failed"] == 1
+    assert mock_rag_system.indexed == []
+
+    await pipeline.run(docs)
+    assert [text for text, _ in mock_rag_system.indexed] == ["Retry me."]
+
+@pytest.mark.asyncio
+async def test_indexed_metadata_keeps_document_id(pipeline, mock_rag_system):
+    """The vector store keeps the source document id of pipeline chunks."""
+    with patch('rag_aether.ai.vector_store.MLClient'):
+        store = VectorStore(vector_dimension=8)
+    mock_rag_system.index_chunks = store.add_documents
+
+    await pipeline.run([{"id": "doc-1", "text": "Indexed text.", "metadata": {"source": "test"}}])
+
+    [metadata] = store.metadata
+    assert metadata["doc_id"] == "doc-1"
+    assert metadata["source"] == "test"
+    assert metadata["chunk_index"] == 0
+    results = await store.search(np.ones(8, dtype="float32"), k=1)
+    assert results[0]["metadata"]["doc_id"] == "doc-1"
+
+@pytest.mark.asyncio
+async def test_stage_failure_is_counted():
+    """A failing stage records failures and keeps running."""
+    async def flaky(item):
+        if item % 2:
+            raise ValueError("odd item")
+        return [item]
+
+    stage = Stage("flaky", flaky, concurrency=2)
+    for i in range(10):
+        await stage.put(i)
+    await stage.close()
+    await stage.run(None)
+
+    assert stage.stats.processed == 5
+    assert stage.stats.failed == 5
@@ -0,0 +1,39 @@
+"""Tests for process-pool document preprocessing."""
+import pytest
+from rag_aether.ai.preprocessing import (
+    PreprocessPool,
+    prepare_document,
+    normalize_text,
+    hash_text
+)
+
+@pytest.fixture
+def pool():
+    """Small pool that always uses worker processes."""
+    pool = PreprocessPool(max_workers=2, inline_threshold=0)
+    yield pool
+    pool.shutdown()
+
+def test_normalize_text():
+    """Line endings, control characters and trailing spaces are cleaned."""
+    assert normalize_text("a  \r\nb\x00\rc  ") == "a\nb\nc"
+
+def test_prepare_document_hashes_chunks():
+    """Each chunk has a matching content hash."""
+    prepared = prepare_document(b"First part.\n\nSecond part.", chunk_size=4, chunk_overlap=0)
+    assert prepared.chunks == ("First part.", "Second part.")
+    assert prepared.hashes == tuple(hash_text(c) for c in prepared.chunks)
+
+@pytest.mark.asyncio
+async def test_prepare_in_worker_process(pool):
+    """Large documents are prepared in worker processes."""
+    text = "Sentence with several words. " * 200
+    prepared = await pool.prepare(text, chunk_size=50, chunk_overlap=10)
+    assert prepared == prepare_document(text, chunk_size=50, chunk_overlap=10)
+
+@pytest.mark.asyncio
+async def test_prepare_many_preserves_order(pool):
+    """Batches are split across workers and returned in input order."""
+    texts = [f"Document {i}." for i in range(10)]
+    prepared = await pool.prepare_many(texts, chunk_size=50, chunk_overlap=10)
+    assert [p.chunks[0] for p in prepared] == texts
@@ -0,0 +1,99 @@
+"""Tests for batch queries."""
+import pytest
+import json
+import numpy as np
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+
+from rag_aether.ai.cache_manager import EmbeddingCache, QueryResultCache
+from rag_aether.ai.rag_system import RAGSystem
+from rag_aether.api import main
+
+def _batch_rag():
+    """RAGSystem with a recording embedder and a fake multi-query store."""
+    rag = RAGSystem.__new__(RAGSystem)
+    rag.use_mock = False
+    rag.result_cache = QueryResultCache()
+    rag.embedding_cache = EmbeddingCache()
+    rag.embedded = []
+    rag.searches = []
+
+    async def get_embeddings(texts, retries=3):
+        rag.embedded.append(list(texts))
+        return np.array([[float(len(t)), 1.0] for t in texts])
+
+    async def search_batch(embeddings, k, min_score, filters):
+        rag.searches.append(len(embeddings))
+        return [[{"document_id": f"doc-{int(row[0])}", "score": 0.9, "content": ""}] for row in embeddings]
+
+    rag._get_embeddings = get_embeddings
+    rag.vector_store = Mock(generation=0, search_batch=search_batch)
+    return rag
+
+@pytest.mark.asyncio
+async def test_query_batch_shares_embedding_and_search():
+    """Uncached questions are embedded and searched together, in order."""
+    rag = _batch_rag()
+    questions = ["a", "bb", "a", "ccc"]
+
+    results = [r async for r in rag.query_batch(questions, max_results=1, min_score=0.0)]
+
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert [r["context"][0]["document_id"] for r in results] == ["doc-1", "doc-2", "doc-1", "doc-3"]
+    assert rag.embedded == [["a", "bb", "ccc"]]
+    assert rag.searches == [4]
+
+    # A repeated batch is served from the result cache
+    again = [r async for r in rag.query_batch(questions, max_results=1, min_score=0.0)]
+    assert [r["context"] for r in again] == [r["context"] for r in results]
+    assert rag.searches == [4]
+
+@pytest.mark.asyncio
+async def test_query_batch_slices_and_reports_failures():
+    """Each slice is searched separately; a failed slice yields errors."""
+    from rag_aether.ai import rag_system
+
+    rag = _batch_rag()
+    search_batch = rag.vector_store.search_batch
+
+    async def flaky_search(embeddings, k, min_score, filters):
+        if rag.searches:
+            raise RuntimeError("index unavailable")
+        return await search_batch(embeddings, k, min_score, filters)
+
+    rag.vector_store.search_batch = flaky_search
+    with patch.object(rag_system, "QUERY_BATCH_SIZE", 2):
+        results = [r async for r in rag.query_batch(["a", "bb", "ccc"], min_score=0.0)]
+
+    assert "context" in results[0] and "context" in results[1]
+    assert results[2]["error"] == "index unavailable"
+
+def test_batch_endpoint_streams_ndjson():
+    """The endpoint streams one line per question and a summary line."""
+    system = Mock()
+
+    async def query_batch(questions, max_results=3, min_score=0.7):
+        for i, question in enumerate(questions):
+            yield {"index": i, "question": question, "context": []}
+
+    system.query_batch = query_batch
+    with patch.object(main, "rag_system", system):
+        client = TestClient(main.app)
+        response = client.post("/query/batch", json={"questions": ["a", "b"]})
+        lines = [json.loads(line) for line in response.text.splitlines()]
+
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert [line.get("question") for line in lines[:2]] == ["a", "b"]
+        assert lines[-1]["done"] and lines[-1]["failed"] == 0
+        assert client.post("/query/batch", json={"questions": []}).status_code == 422
+
+def test_batch_endpoint_rejects_too_many_questions():
+    """Batches above MAX_BATCH_QUESTIONS are rejected before any work."""
+    system = Mock()
+    with patch.object(main, "rag_system", system):
+        client = TestClient(main.app)
+        questions = [f"q{i}" for i in range(main.MAX_BATCH_QUESTIONS + 1)]
+        response = client.post("/query/batch", json={"questions": questions})
+
+        assert response.status_code == 422
+        assert not system.query_batch.called
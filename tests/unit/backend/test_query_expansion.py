@@ -130,4 +130,16 @@ async def test_query_expander_expand_queries():
     assert all(isinstance(r, dict) for r in results)
     assert all("original_query" in r for r in results)
     assert all("expanded_queries" in r for r in results)
-    assert all(len(r["expanded_queries"]) > 0 for r in results) 
\ No newline at end of file
+    assert all(len(r["expanded_queries"]) > 0 for r in results) 
+def test_get_model_records_cache_hits(mock_t5_tokenizer, mock_t5_model):
+    """Loading a cached model counts an lru cache hit instead of reloading."""
+    from rag_aether.ai import query_expansion
+    from rag_aether.core.monitoring import monitor
+
+    with patch.object(query_expansion, "_model_cache", query_expansion.LRUCache(maxsize=2)):
+        query_expansion.get_model("t5-test")
+        hits = monitor.get_metrics()["cache_lookups"].get("lru", {}).get("hits", 0)
+        query_expansion.get_model("t5-test")
+
+    assert mock_t5_model.from_pretrained.call_count == 1
+    assert monitor.get_metrics()["cache_lookups"]["lru"]["hits"] == hits + 1
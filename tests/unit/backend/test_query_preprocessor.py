@@ -0,0 +1,67 @@
+"""Tests for cached, batched query parsing."""
+import pytest
+from unittest.mock import patch
+
+from rag_aether_root.ai.query_expansion import QueryPreprocessor
+from rag_aether_root.errors import QueryError
+
+
+class FakeNLP:
+    """spaCy stand-in whose pipe records every batch it parses."""
+
+    def __init__(self):
+        self.batches = []
+
+    def pipe(self, texts, batch_size=None):
+        texts = list(texts)
+        self.batches.append(texts)
+        return ({"text": text} for text in texts)
+
+
+def make_preprocessor(cache_size=3):
+    """Preprocessor over a FakeNLP."""
+    nlp = FakeNLP()
+    with patch("rag_aether_root.ai.query_expansion.spacy.load", return_value=nlp) as load:
+        preprocessor = QueryPreprocessor(cache_size=cache_size)
+    load.assert_called_once_with("en_core_web_sm", disable=["parser"])
+    return preprocessor, nlp
+
+
+def test_parse_many_batches_only_uncached_queries():
+    """One pipe call per batch, for unique uncached normalized queries."""
+    preprocessor, nlp = make_preprocessor()
+
+    docs = preprocessor.parse_many(["flow  state", "focus", "flow state ", "focus"])
+    assert nlp.batches == [["flow state", "focus"]]
+    assert docs[0] is docs[2] and docs[1] is docs[3]
+
+    again = preprocessor.parse_many(["focus", "sleep"])
+    assert nlp.batches[1] == ["sleep"]
+    assert again[0] is docs[1]
+
+    preprocessor.parse_many(["flow state", "focus"])
+    assert len(nlp.batches) == 2
+    assert preprocessor.parse("focus") is docs[1]
+
+
+def test_lru_evicts_least_recently_used():
+    """Reading a doc refreshes it; the oldest unread doc is evicted."""
+    preprocessor, nlp = make_preprocessor(cache_size=2)
+
+    preprocessor.parse("a")
+    preprocessor.parse("b")
+    preprocessor.parse("a")
+    preprocessor.parse("c")
+    assert list(preprocessor._docs) == ["a", "c"]
+
+    preprocessor.parse("b")
+    assert nlp.batches[-1] == ["b"]
+    preprocessor.parse("c")
+    assert len(nlp.batches) == 4
+
+
+def test_missing_model_raises_query_error():
+    """A missing spaCy model is reported instead of downloaded."""
+    with patch("rag_aether_root.ai.query_expansion.spacy.load", side_effect=OSError("not found")):
+        with pytest.raises(QueryError, match="spacy download"):
+            QueryPreprocessor()
@@ -0,0 +1,65 @@
+"""Tests for the streaming query endpoint."""
+import pytest
+import json
+from typing import Any, Dict, List
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+
+from rag_aether.api import main
+from rag_aether.core.errors import DeadlineExceededError
+
+CONTEXT = [{"document_id": "doc-1", "score": 0.9, "content": "Flow is focus."}]
+
+def parse_events(body: str) -> List[Dict[str, Any]]:
+    """Split an SSE body into (event, data) dicts."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append({"event": lines["event"], "data": json.loads(lines["data"])})
+    return events
+
+@pytest.fixture
+def rag():
+    """Mock RAG system that retrieves one chunk and streams two deltas."""
+    system = Mock()
+
+    async def query(question, max_results=3, min_score=0.7):
+        return {"answer": "", "context": CONTEXT, "degraded": []}
+
+    async def stream_answer(question, context):
+        for delta in ["Flow ", "is focus."]:
+            yield delta
+
+    system.query = query
+    system.stream_answer = stream_answer
+    with patch.object(main, "rag_system", system):
+        yield system
+
+def test_stream_emits_context_tokens_and_metrics(rag):
+    """Context comes first, then token deltas, then final metrics."""
+    client = TestClient(main.app)
+    response = client.post("/query/stream", json={"question": "What is flow?"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    assert [e["event"] for e in events] == ["context", "token", "token", "done"]
+    assert events[0]["data"]["context"] == CONTEXT
+    assert "".join(e["data"]["delta"] for e in events[1:3]) == "Flow is focus."
+    assert events[-1]["data"]["deltas"] == 2
+
+def test_stream_get_and_deadline_error(rag):
+    """GET streams too; a deadline miss is sent as an error event."""
+    async def slow_query(question, max_results=3, min_score=0.7):
+        raise DeadlineExceededError("embedding")
+
+    rag.query = slow_query
+    client = TestClient(main.app)
+    response = client.get("/query/stream", params={"question": "What is flow?"})
+
+    events = parse_events(response.text)
+    assert [e["event"] for e in events] == ["error"]
+    assert events[0]["data"]["stage"] == "embedding"
+    assert events[0]["data"]["status"] == 504
+
+    assert client.get("/query/stream", params={"question": " "}).status_code == 422
@@ -122,4 +122,169 @@ def test_rag_performance(mock_sentence_transformer, mock_query_processor, mock_f
     assert "query" in stats
     assert stats["query"]["calls"] > 0
     assert "search" in stats
-    assert stats["search"]["calls"] > 0 
\ No newline at end of file
+    assert stats["search"]["calls"] > 0
+
+
+def _fan_out_rag(expand_delay: float):
+    """RAGSystem with a fake store whose results depend on the query text."""
+    import asyncio
+    from unittest.mock import AsyncMock
+    from rag_aether.ai.cache_manager import QueryResultCache
+
+    rag = RAGSystem.__new__(RAGSystem)
+    rag.use_mock = False
+    rag.result_cache = QueryResultCache()
+
+    async def expand_query(question):
+        await asyncio.sleep(expand_delay)
+        return f"{question} expanded"
+
+    def result(doc_id, score):
+        return {"document_id": doc_id, "score": score, "metadata": {}, "content": doc_id}
+
+    async def search(text, k, min_score, filters):
+        if text.endswith("expanded"):
+            return [result("b", 0.95), result("a", 0.5)]
+        return [result("a", 0.9), result("c", 0.6)]
+
+    rag.query_expander = Mock(expand_query=expand_query, can_expand=True)
+    rag.vector_store = Mock(generation=0)
+    rag._retrieve = AsyncMock(side_effect=search)
+    return rag
+
+
+@pytest.mark.asyncio
+async def test_query_merges_expanded_results_within_deadline():
+    """Expanded results that arrive in time are merged by best score."""
+    rag = _fan_out_rag(expand_delay=0.0)
+    response = await rag.query("flow", max_results=3, min_score=0.0)
+
+    assert [(r["document_id"], r["score"]) for r in response["context"]] == [
+        ("b", 0.95), ("a", 0.9), ("c", 0.6)
+    ]
+    assert len(rag.result_cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_query_returns_raw_results_when_expansion_is_slow():
+    """A slow expansion does not hold the query past the deadline."""
+    import time
+    from rag_aether.ai import rag_system
+
+    rag = _fan_out_rag(expand_delay=1.0)
+    with patch.object(rag_system, "EXPANSION_DEADLINE", 0.05):
+        start = time.perf_counter()
+        response = await rag.query("flow", max_results=3, min_score=0.0)
+        elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.5
+    assert [r["document_id"] for r in response["context"]] == ["a", "c"]
+    assert response["degraded"] == ["expansion"]
+    # Partial results are not cached
+    assert len(rag.result_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_query_raises_when_retrieval_misses_deadline():
+    """Embedding past the request deadline fails the query."""
+    import asyncio
+    from rag_aether.core.deadline import request_deadline
+    from rag_aether.core.errors import DeadlineExceededError
+
+    rag = _fan_out_rag(expand_delay=0.0)
+    del rag._retrieve
+
+    async def slow_embed(text):
+        await asyncio.sleep(1.0)
+
+    rag.embed_query = slow_embed
+    with request_deadline(0.05):
+        with pytest.raises(DeadlineExceededError) as exc_info:
+            await rag.query("flow", max_results=3, min_score=0.0)
+    assert exc_info.value.stage == "embedding"
+
+
+@pytest.mark.asyncio
+async def test_query_does_not_serve_cached_batch_results():
+    """Raw batch results and expanded query results are cached apart."""
+    import numpy as np
+    from rag_aether.ai.cache_manager import EmbeddingCache
+
+    rag = _fan_out_rag(expand_delay=0.0)
+    rag.embedding_cache = EmbeddingCache()
+
+    async def get_embeddings(texts, retries=3):
+        return np.ones((len(texts), 2))
+
+    async def search_batch(embeddings, k, min_score, filters):
+        return [[{"document_id": "a", "score": 0.9, "metadata": {}, "content": "a"}] for _ in embeddings]
+
+    rag._get_embeddings = get_embeddings
+    rag.vector_store.search_batch = search_batch
+
+    batch = [r async for r in rag.query_batch(["flow"], max_results=3, min_score=0.0)]
+    assert [r["document_id"] for r in batch[0]["context"]] == ["a"]
+
+    response = await rag.query("flow", max_results=3, min_score=0.0)
+    assert [r["document_id"] for r in response["context"]] == ["b", "a", "c"]
+    assert len(rag.result_cache) == 2
+
+
+def _versioned_rag():
+    """RAGSystem over a real vector store with a recording embedder."""
+    import numpy as np
+    from rag_aether.ai.chunker import TextChunker
+    from rag_aether.ai.preprocessing import PreprocessPool
+    from rag_aether.ai.vector_store import VectorStore
+
+    rag = RAGSystem.__new__(RAGSystem)
+    rag.use_mock = False
+    rag.logger = Mock()
+    with patch('rag_aether.ai.vector_store.MLClient'):
+        rag.vector_store = VectorStore(vector_dimension=2)
+    rag.chunker = TextChunker(chunk_size=5, chunk_overlap=0)
+    rag.preprocess_pool = PreprocessPool(max_workers=1, inline_threshold=10**6)
+    rag.embedded = []
+
+    async def get_embeddings(texts, retries=3):
+        rag.embedded.append(list(texts))
+        return np.array([[float(len(t)), 1.0] for t in texts])
+
+    rag._get_embeddings = get_embeddings
+    return rag
+
+
+def _live_chunks(store):
+    """Texts of the chunks search can still return."""
+    return sorted(text for i, text in enumerate(store.documents) if i not in store.tombstones)
+
+
+def test_reingest_with_id_replaces_previous_version():
+    """Re-ingesting a document with an id embeds only changed chunks and keeps no copies."""
+    import asyncio
+    from fastapi.testclient import TestClient
+    from rag_aether.api import main
+
+    rag = _versioned_rag()
+    v1 = "First paragraph here.\n\nSecond paragraph here."
+    v2 = "First paragraph here.\n\nSecond paragraph edited."
+    with patch.object(main, "rag_system", rag):
+        client = TestClient(main.app)
+        for text in (v1, v2, v2):
+            response = client.post("/ingest", json={"text": text, "metadata": {"id": "doc-1"}})
+            assert response.json()["status"] == "success"
+
+    assert rag.embedded == [["First paragraph here.", "Second paragraph here."], ["Second paragraph edited."]]
+    assert rag.vector_store.get_document_version("doc-1") == 3
+    assert _live_chunks(rag.vector_store) == ["First paragraph here.", "Second paragraph edited."]
+
+    # Pooled ingestion routes documents with an id the same way
+    results = asyncio.run(rag.ingest_documents([
+        {"id": "doc-1", "text": v1},
+        {"text": "Unversioned text."}
+    ]))
+    assert results == [True, True]
+    assert rag.vector_store.get_document_version("doc-1") == 4
+    assert _live_chunks(rag.vector_store) == [
+        "First paragraph here.", "Second paragraph here.", "Unversioned text."
+    ]
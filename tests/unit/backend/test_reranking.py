@@ -0,0 +1,113 @@
+"""Tests for re-ranking with stored vectors and a cross-encoder."""
+import pytest
+import time
+import numpy as np
+from unittest.mock import patch
+
+from rag_aether_root.ai.reranking import Reranker
+from rag_aether_root.ai.vector_search import OptimizedVectorSearch
+
+VECTORS = {
+    "flow": [1.0, 0.0, 0.0, 0.0],
+    "focus": [0.8, 0.6, 0.0, 0.0],
+    "sleep": [0.0, 0.0, 1.0, 0.0],
+    "meetings": [0.0, 0.0, 0.0, 1.0],
+}
+
+
+class TableEncoder:
+    """Encoder returning fixed vectors and recording each batch."""
+
+    def __init__(self, model_name=None):
+        self.batches = []
+
+    def get_sentence_embedding_dimension(self):
+        return 4
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        self.batches.append(list(texts))
+        return np.array([VECTORS[text] for text in texts], dtype=np.float32)
+
+
+class SlowCrossEncoder:
+    """Cross-encoder scoring by text length, taking a while per call."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.batches = []
+
+    def predict(self, pairs):
+        self.batches.append(pairs)
+        time.sleep(self.delay)
+        return [float(len(text)) for _, text in pairs]
+
+
+@pytest.fixture
+def search():
+    """Vector search holding the table's documents."""
+    with patch("rag_aether_root.ai.vector_search.SentenceTransformer", TableEncoder):
+        vector_search = OptimizedVectorSearch()
+    vector_search.add_documents([{"text": text} for text in VECTORS])
+    vector_search.model.batches.clear()
+    return vector_search
+
+
+def result(text, score, doc_index=None):
+    """Retrieved result as the searches return it."""
+    return {"text": text, "score": score, "doc_index": doc_index}
+
+
+def test_stored_vectors_are_not_reencoded(search):
+    """Results with a doc_index use stored vectors; only the query is encoded."""
+    reranker = Reranker(search.model, semantic_weight=0.5)
+    results = [result("sleep", 0.9, 2), result("focus", 0.6, 1), result("flow", 0.5, 0)]
+
+    reranked = reranker.rerank("flow", results, vector_search=search)
+
+    assert search.model.batches == [["flow"]]
+    assert [r["text"] for r in reranked] == ["flow", "focus", "sleep"]
+    assert reranked[0]["semantic_score"] == pytest.approx(1.0)
+    assert reranked[1]["final_score"] == pytest.approx(0.5 * 0.6 + 0.5 * 0.8)
+
+
+def test_results_without_stored_vectors_encoded_in_one_batch(search):
+    """Only results lacking a stored vector are encoded, together."""
+    reranker = Reranker(search.model, semantic_weight=1.0)
+    results = [result("meetings", 0.9), result("focus", 0.8, 1), result("flow", 0.1)]
+    query_embedding = np.array(VECTORS["flow"], dtype=np.float32)
+
+    reranked = reranker.rerank("flow", results, vector_search=search, query_embedding=query_embedding)
+
+    assert search.model.batches == [["meetings", "flow"]]
+    assert [r["text"] for r in reranked] == ["flow", "focus", "meetings"]
+
+    search.model.batches.clear()
+    reranker.rerank("flow", [result("sleep", 0.5, 2)], top_k=1)
+    assert search.model.batches == [["flow"], ["sleep"]]
+
+
+def test_stored_vectors_after_ivf_optimization(search):
+    """get_embeddings reconstructs vectors from an IVF index too."""
+    search.optimize_index()
+    np.testing.assert_allclose(search.get_embeddings([3, 0]), [VECTORS["meetings"], VECTORS["flow"]])
+    assert search.get_embeddings([]).shape == (0, 4)
+
+
+def test_cross_encoder_stops_at_latency_budget(search):
+    """The first batch is always scored; later ones only within budget."""
+    reranker = Reranker(search.model, semantic_weight=0.0, cross_top_n=4, cross_batch_size=2,
+                        latency_budget=0.01)
+    reranker._cross_encoder = SlowCrossEncoder(delay=0.02)
+    results = [result("flow", 0.9, 0), result("meetings", 0.8, 3), result("focus", 0.7, 1),
+               result("sleep", 0.6, 2), result("flow", 0.5, 0)]
+
+    reranked = reranker.rerank("flow", results, vector_search=search)
+
+    assert len(reranker._cross_encoder.batches) == 1
+    assert [r["text"] for r in reranked] == ["meetings", "flow", "focus", "sleep", "flow"]
+    assert "cross_score" not in reranked[2]
+
+    reranker.latency_budget = 10.0
+    reranked = reranker.rerank("flow", results, vector_search=search, top_k=3)
+    assert len(reranker._cross_encoder.batches) == 3
+    assert [r["text"] for r in reranked] == ["meetings", "focus", "sleep"]
@@ -0,0 +1,109 @@
+"""Tests for batched search of weighted query variations."""
+import pytest
+import numpy as np
+from unittest.mock import Mock, patch
+
+from rag_aether_root.ai.query_expansion import ExpandedQuery, QueryExpander
+from rag_aether_root.ai.vector_search import OptimizedVectorSearch
+from rag_aether_root.errors import QueryError, SearchError
+
+VECTORS = {
+    "alpha": [1.0, 0.0, 0.0, 0.0],
+    "beta": [0.0, 1.0, 0.0, 0.0],
+    "alpha beta": [0.6, 0.8, 0.0, 0.0],
+}
+
+
+class TableEncoder:
+    """Encoder returning fixed vectors and recording each batch."""
+
+    def __init__(self, model_name=None):
+        self.batches = []
+
+    def get_sentence_embedding_dimension(self):
+        return 4
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        self.batches.append(list(texts))
+        return np.array([VECTORS[text] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def search():
+    """Vector search over three documents with known vectors."""
+    with patch("rag_aether_root.ai.vector_search.SentenceTransformer", TableEncoder):
+        vector_search = OptimizedVectorSearch()
+    vector_search.add_documents([{"text": text} for text in VECTORS])
+    vector_search.model.batches.clear()
+    return vector_search
+
+
+def fused(results):
+    """Map document text to fused score."""
+    return {r["text"]: pytest.approx(r["score"]) for r in results}
+
+
+def test_weighted_aggregation_in_one_batch(search):
+    """Per-variation scores are summed by weight after one encode call."""
+    results = search.search_variations(["alpha", "beta"], [0.75, 0.25], k=3, fetch_k=3)
+
+    assert search.model.batches == [["alpha", "beta"]]
+    assert [r["text"] for r in results] == ["alpha", "alpha beta", "beta"]
+    assert fused(results) == {"alpha": 0.75, "alpha beta": 0.75 * 0.6 + 0.25 * 0.8, "beta": 0.25}
+    assert results[1]["matched_queries"] == ["alpha", "beta"]
+    assert results[1]["doc_index"] == 2
+
+
+def test_duplicate_variations_searched_once(search):
+    """A repeated variation counts with its summed weight."""
+    results = search.search_variations(["alpha", "alpha", "beta"], [0.5, 0.25, 0.25], k=3, fetch_k=3)
+
+    assert search.model.batches == [["alpha", "beta"]]
+    assert fused(results) == fused(search.search_variations(["alpha", "beta"], [0.75, 0.25], k=3, fetch_k=3))
+    assert all(len(set(r["matched_queries"])) == len(r["matched_queries"]) for r in results)
+
+
+def test_threshold_and_fetch_k(search):
+    """Weak hits are dropped per variation; fetch_k limits each list."""
+    results = search.search_variations(["alpha", "beta"], [0.75, 0.25], k=3, threshold=0.5, fetch_k=3)
+    assert fused(results) == {"alpha": 0.75, "alpha beta": 0.65, "beta": 0.25}
+    assert results[0]["matched_queries"] == ["alpha"]
+
+    results = search.search_variations(["alpha", "beta"], [0.75, 0.25], k=3, fetch_k=1)
+    assert fused(results) == {"alpha": 0.75, "beta": 0.25}
+
+    assert search.search_variations(["alpha"], [1.0], k=3, threshold=2.0) == []
+    with pytest.raises(SearchError):
+        search.search_variations(["alpha", "beta"], [1.0])
+
+
+def test_candidates_reuse_query_embedding(search):
+    """Candidate search takes a precomputed embedding without re-encoding."""
+    embedding = search.encode_query("alpha")
+    assert embedding.shape == (1, 4)
+
+    ids, scores = search.search_candidates("alpha", k=2, query_embedding=embedding)
+    assert list(ids) == [0, 2]
+    np.testing.assert_allclose(scores, [1.0, 0.6], rtol=1e-6)
+    assert search.model.batches == [["alpha"]]
+
+    ids, _ = search.search_candidates("beta", k=10)
+    assert list(ids) == [1, 2, 0]
+
+
+def test_expander_search_uses_variations():
+    """QueryExpander.search expands once and fetches twice k per variation."""
+    expander = QueryExpander.__new__(QueryExpander)
+    expanded = ExpandedQuery("alpha", ["alpha", "alpha beta"], [0.6, 0.4])
+    expander.expand_query = Mock(return_value=expanded)
+    vector_search = Mock()
+    vector_search.search_variations.return_value = [{"text": "alpha", "score": 0.6}]
+
+    assert expander.search("alpha", vector_search, k=4, threshold=0.3) == [{"text": "alpha", "score": 0.6}]
+    vector_search.search_variations.assert_called_once_with(
+        ["alpha", "alpha beta"], [0.6, 0.4], k=4, threshold=0.3, fetch_k=8
+    )
+
+    vector_search.search_variations.side_effect = SearchError("index unavailable")
+    with pytest.raises(QueryError):
+        expander.search("alpha", vector_search)
@@ -138,4 +138,152 @@ async def test_delete_texts(mock_supabase, mock_ml_client, mock_credentials):
     mock_supabase.table.return_value.delete.return_value.in_.assert_called_once_with(
         'id',
         ['1', '2']
-    ) 
\ No newline at end of file
+    ) 
+
+def _hash(text):
+    import hashlib
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def _embedder(calls):
+    """Deterministic embedder that records every call."""
+    import numpy as np
+
+    async def embed(texts):
+        calls.append(list(texts))
+        return np.array([[float(len(t)), float(sum(map(ord, t)) % 97), 1.0, 0.0] for t in texts])
+    return embed
+
+@pytest.mark.asyncio
+async def test_upsert_document_embeds_only_changed_chunks(mock_ml_client):
+    """Re-ingesting a document embeds new chunks and tombstones removed ones."""
+    store = VectorStore(vector_dimension=4)
+    calls = []
+    embed = _embedder(calls)
+
+    v1 = ["intro", "body", "outro"]
+    result = await store.upsert_document("doc", v1, [_hash(c) for c in v1], embed)
+    assert result == {"version": 1, "added": 3, "unchanged": 0, "removed": 0}
+
+    v2 = ["intro", "body edited", "outro"]
+    result = await store.upsert_document("doc", v2, [_hash(c) for c in v2], embed)
+    assert result == {"version": 2, "added": 1, "unchanged": 2, "removed": 1}
+    assert calls[-1] == ["body edited"]
+    assert store.get_document_version("doc") == 2
+
+    # Unchanged re-ingest makes no embedding call
+    result = await store.upsert_document("doc", v2, [_hash(c) for c in v2], embed)
+    assert result["added"] == 0 and len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_search_skips_tombstones_and_compact(mock_ml_client):
+    """Tombstoned chunks are hidden from search and dropped by compact."""
+    import numpy as np
+    store = VectorStore(vector_dimension=4)
+    store.compact_ratio = 0
+    embed = _embedder([])
+
+    await store.upsert_document("doc", ["old"], [_hash("old")], embed)
+    await store.upsert_document("doc", ["new"], [_hash("new")], embed)
+
+    query = (await embed(["old"]))[0].astype("float32")
+    results = await store.search(query, k=5)
+    assert [r["content"] for r in results] == ["new"]
+
+    assert await store.compact() == 1
+    assert store.documents == ["new"] and store.index.ntotal == 1
+    assert store.doc_versions["doc"]["chunks"] == {_hash("new"): 0}
+
+    assert await store.delete_document("doc") == 1
+    assert await store.search(query, k=5) == []
+
+@pytest.mark.asyncio
+async def test_generation_bumps_and_filters(mock_ml_client):
+    """Every content change bumps the generation; filters match metadata."""
+    store = VectorStore(vector_dimension=4)
+    store.compact_ratio = 0
+    embed = _embedder([])
+    assert store.generation == 0
+
+    await store.upsert_document("a", ["alpha"], [_hash("alpha")], embed, {"lang": "en"})
+    await store.upsert_document("b", ["beta"], [_hash("beta")], embed, {"lang": "de"})
+    generation = store.generation
+    assert generation == 2
+
+    query = (await embed(["alpha"]))[0]
+    results = await store.search(query, k=5, filters={"lang": "de"})
+    assert [r["content"] for r in results] == ["beta"]
+
+    await store.delete_document("a")
+    assert store.generation == generation + 1
+
+@pytest.mark.asyncio
+async def test_search_batch_matches_single_searches(mock_ml_client):
+    """One multi-query search returns the same results as separate searches."""
+    import numpy as np
+    store = VectorStore(vector_dimension=4)
+    embed = _embedder([])
+    texts = ["alpha", "beta", "gamma"]
+    for text in texts:
+        await store.upsert_document(text, [text], [_hash(text)], embed)
+
+    queries = np.asarray(await embed(texts), dtype="float32")
+    batched = await store.search_batch(queries, k=2)
+
+    assert len(batched) == 3
+    for query, results in zip(queries, batched):
+        assert results == await store.search(query, k=2)
+
+@pytest.mark.asyncio
+async def test_upsert_does_not_hold_lock_while_embedding(mock_ml_client):
+    """Slow embedding of one upsert does not block others; racing upserts converge."""
+    import asyncio
+    store = VectorStore(vector_dimension=4)
+    embed = _embedder([])
+    release = asyncio.Event()
+    calls = []
+
+    async def slow_embed(texts):
+        calls.append(list(texts))
+        await release.wait()
+        return await embed(texts)
+
+    await store.upsert_document("doc", ["intro"], [_hash("intro")], embed)
+    slow = asyncio.create_task(
+        store.upsert_document("doc", ["intro", "slow"], [_hash("intro"), _hash("slow")], slow_embed)
+    )
+    await asyncio.sleep(0)
+    # The unchanged chunk kept its old metadata while the new one embeds
+    assert store.metadata[0]["version"] == 1
+
+    other = await store.upsert_document("other", ["fast"], [_hash("fast")], embed)
+    assert other["version"] == 1
+
+    # A concurrent version lands while the slow upsert is embedding
+    await store.upsert_document("doc", ["fresh"], [_hash("fresh")], embed)
+    release.set()
+    result = await slow
+
+    # "intro" was dropped by the concurrent version, so it is embedded again
+    assert calls == [["slow"], ["intro"]]
+    assert result == {"version": 3, "added": 2, "unchanged": 0, "removed": 1}
+    chunks = store.doc_versions["doc"]["chunks"]
+    assert sorted(store.documents[i] for i in chunks.values()) == ["intro", "slow"]
+
+@pytest.mark.asyncio
+async def test_repeated_upserts_compact_automatically(mock_ml_client):
+    """Tombstones from re-ingests are compacted away instead of piling up."""
+    store = VectorStore(vector_dimension=4)
+    store.compact_ratio = 0.5
+    embed = _embedder([])
+    body = [f"paragraph {i}" for i in range(10)]
+
+    for version in range(50):
+        chunks = body + [f"edited {version}"]
+        await store.upsert_document("doc", chunks, [_hash(c) for c in chunks], embed)
+        assert len(store.tombstones) <= 0.5 * len(store.documents)
+        assert store.index.ntotal == len(store.documents) <= 2 * len(chunks)
+
+    live = [store.documents[i] for i in store.doc_versions["doc"]["chunks"].values()]
+    assert sorted(live) == sorted(chunks)
+    assert await store.delete_document("doc") == len(chunks)
+    assert store.index.ntotal == 0 and not store.tombstones